@@ -24,7 +24,7 @@ class Board(GeneralGameState):
         board = [[]] * self.config.num_reels
         for i in range(self.config.num_reels):
             board[i] = [0] * self.config.num_rows[i]
-        reel_positions = [random.randrange(0, len(self.reelstrip[reel])) for reel in range(self.config.num_reels)]
+        reel_positions = self.draw_reel_positions()
         padding_positions = [0] * self.config.num_reels
         first_scatter_reel = -1
         for reel in range(self.config.num_reels):
@@ -75,6 +75,14 @@ class Board(GeneralGameState):
             self.top_symbols = top_symbols
             self.bottom_symbols = bottom_symbols
 
+    def draw_reel_positions(self) -> List[int]:
+        """Uniform stops on the current reelstrip, unless the current criteria's sampler proposes them."""
+        if self.criteria_sampler is None or not self.criteria_sampler.applies_to(self):
+            return [random.randrange(0, len(self.reelstrip[reel])) for reel in range(self.config.num_reels)]
+        reel_positions = self.criteria_sampler.propose(self, self.reelstrip_id)
+        self.sampled_boards[self.gametype] = (self.reelstrip_id, reel_positions)
+        return reel_positions
+
     def force_board_from_reelstrips(self, reelstrip_id: str, force_stop_positions: List[List]) -> None:
         """Creates a gameboard from specified stopping positions."""
         if self.config.include_padding:
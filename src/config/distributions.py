@@ -18,11 +18,13 @@ class Distribution:
             "reel_weights",
         ],
         default_distribution_conditions: dict = {"force_wincap": False, "force_freegame": False},
+        sampler: object = None,
     ):
 
         if fixed_amt is None:
             assert quota > 0, "non-zero quota value must be assigned"
         assert sum([quota is None, fixed_amt is None]) == 1, "must define either quota or fixed simulation amount"
+        assert sampler is None or win_criteria is not None, "criteria samplers require a fixed win_criteria payout"
 
         self._quota = quota
         self._criteria = criteria
@@ -30,6 +32,7 @@ class Distribution:
         self._required_distribution_conditions = required_distribution_conditions
         self._default_distribution_conditions = default_distribution_conditions
         self._win_criteria = win_criteria
+        self._sampler = sampler
         self.verify_and_set_conditions(conditions)
 
     def verify_and_set_conditions(self, conditions):
@@ -60,6 +63,10 @@ class Distribution:
         """Return what win conditions must be specified."""
         return self._required_distribution_conditions
 
+    def get_sampler(self):
+        """Return the criteria sampler proposing reel stops for this distribution, or None."""
+        return self._sampler
+
     def get_fixed_amt(self):
         """Return fixed simulation amount for distribtuion"""
         return self._fixed_amt
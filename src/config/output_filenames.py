@@ -17,8 +17,7 @@ class OutputFiles:
 
     def check_folder_exists(self, folder_path: str) -> None:
         """Check if target folder exists, and create if it does not."""
-        if not os.path.exists(folder_path):
-            os.makedirs(folder_path)
+        os.makedirs(folder_path, exist_ok=True)
 
     def setup_output_directories(self):
         """Entrypoint for saving all output files."""
@@ -119,30 +118,118 @@ class OutputFiles:
                 },
             }
 
-    def get_temp_multi_thread_name(self, betmode: str, thread_index: int, repeat_count: int, compress: bool):
+    def get_temp_multi_thread_name(self, betmode: str, chunk_index: int, compress: bool):
         """Naming convention for temp book files."""
         if compress:
-            filename = f"books_{betmode}_{thread_index}_{repeat_count}.jsonl.zst"
+            filename = f"books_{betmode}_{chunk_index}.jsonl.zst"
         elif not (compress) and self.game_config.output_regular_json:
-            filename = f"books_{betmode}_{thread_index}_{repeat_count}.json"
+            filename = f"books_{betmode}_{chunk_index}.json"
         elif not (compress) and not (self.game_config.output_regular_json):
-            filename = f"books_{betmode}_{thread_index}_{repeat_count}.jsonl"
+            filename = f"books_{betmode}_{chunk_index}.jsonl"
         else:
             raise RuntimeError("Error in logic generating book name")
 
         return os.path.join(self.temp_path, filename)
 
-    def get_temp_lookup_name(self, betmode: str, thread_index: int, repeat_count: int):
+    def get_temp_book_output_name(self, betmode: str):
+        """Uncompressed books of a bet-mode while they are merged, bet-modes may be merged concurrently."""
+        return os.path.join(self.book_path, f"temp_book_output_{betmode}.json")
+
+    def get_temp_lookup_name(self, betmode: str, chunk_index: int):
         """Naming convention for temp lookup files."""
-        return os.path.join(self.temp_path, f"lookUpTable_{betmode}_{thread_index}_{repeat_count}")
+        return os.path.join(self.temp_path, f"lookUpTable_{betmode}_{chunk_index}")
 
-    def get_temp_segmented_name(self, betmode: str, thread_index: int, repeat_count: int):
+    def get_temp_segmented_name(self, betmode: str, chunk_index: int):
         """Naming convention for temp segmented lookup files."""
-        return os.path.join(self.temp_path, f"lookUpTableSegmented_{betmode}_{thread_index}_{repeat_count}")
+        return os.path.join(self.temp_path, f"lookUpTableSegmented_{betmode}_{chunk_index}")
 
-    def get_temp_force_name(self, betmode: str, thread_index: int, repeat_count: int):
+    def get_temp_force_name(self, betmode: str, chunk_index: int):
         """Naming convention for temp force files."""
-        return os.path.join(self.temp_path, f"force_{betmode}_{thread_index}_{repeat_count}.json")
+        return os.path.join(self.temp_path, f"force_{betmode}_{chunk_index}.json")
+
+    def get_temp_events_name(self, betmode: str, chunk_index: int):
+        """Naming convention for temp unique-event example files."""
+        return os.path.join(self.temp_path, f"events_{betmode}_{chunk_index}.json")
+
+    def get_temp_harvest_name(self, betmode: str, chunk_index: int):
+        """Naming convention for reel stops harvested by a single chunk."""
+        return os.path.join(self.temp_path, f"harvest_{betmode}_{chunk_index}.json")
+
+    def get_temp_chunk_names(
+        self,
+        betmode: str,
+        chunk_index: int,
+        compress: bool,
+        write_event_list: bool,
+        write_books: bool = True,
+    ):
+        """All temp files written by a single simulation chunk, stats-only runs do not write books."""
+        chunk_names = [
+            self.get_temp_force_name(betmode, chunk_index),
+            self.get_temp_lookup_name(betmode, chunk_index),
+            self.get_temp_segmented_name(betmode, chunk_index),
+        ]
+        if write_books:
+            chunk_names.insert(0, self.get_temp_multi_thread_name(betmode, chunk_index, compress))
+        if write_event_list:
+            chunk_names.append(self.get_temp_events_name(betmode, chunk_index))
+        return chunk_names
+
+    def get_temp_acceptance_name(self, betmode: str, chunk_index: int):
+        """Naming convention for accepted attempts recorded by a single chunk."""
+        return os.path.join(self.temp_path, f"acceptance_{betmode}_{chunk_index}.json")
+
+    def get_shard_temp_path(self, shard_index: int, shard_count: int):
+        """Temp directory for a single shard of a multi-node run."""
+        return os.path.join(self.library_path, "temp_multi_threaded_files", f"shard_{shard_index}_of_{shard_count}")
+
+    def get_simulation_metrics_name(self, shard_index: int = 0, shard_count: int = 1):
+        """Throughput and progress metrics recorded by create_books."""
+        if shard_count > 1:
+            return os.path.join(self.library_path, f"simulation_metrics_shard_{shard_index}_of_{shard_count}.json")
+        return os.path.join(self.library_path, "simulation_metrics.json")
+
+    def get_temp_profile_name(self, betmode: str, process_name: str):
+        """cProfile output of a single process (parent or worker) for one bet-mode."""
+        return os.path.join(self.temp_path, f"profile_{betmode}_{process_name}.prof")
+
+    def get_profile_name(self, betmode: str, extension: str, shard_index: int = 0, shard_count: int = 1):
+        """Merged simulation profile (.prof) or text report (.txt), saved in the game directory."""
+        shard_name = f"_shard_{shard_index}_of_{shard_count}" if shard_count > 1 else ""
+        return os.path.join(
+            PATH_TO_GAMES, str(self.game_config.game_id), f"simulationProfile_{betmode}{shard_name}{extension}"
+        )
+
+    def get_rejection_stats_name(self, betmode: str, shard_index: int = 0, shard_count: int = 1):
+        """Per-criteria repeat-loop statistics, saved alongside the books."""
+        shard_name = f"_shard_{shard_index}_of_{shard_count}" if shard_count > 1 else ""
+        return os.path.join(self.book_path, f"rejection_stats_{betmode}{shard_name}.json")
+
+    def get_slow_sims_name(self, betmode: str, shard_index: int = 0, shard_count: int = 1):
+        """Simulation wall time histogram and slowest simulations, saved alongside the books."""
+        shard_name = f"_shard_{shard_index}_of_{shard_count}" if shard_count > 1 else ""
+        return os.path.join(self.book_path, f"slow_sims_{betmode}{shard_name}.json")
+
+    def get_acceptance_cache_name(self, betmode: str, shard_index: int = 0, shard_count: int = 1):
+        """Persistent acceptance cache of a bet-mode, kept between runs."""
+        shard_name = f"_shard_{shard_index}_of_{shard_count}" if shard_count > 1 else ""
+        return os.path.join(self.library_path, "acceptance_cache", f"acceptance_{betmode}{shard_name}.json")
+
+    def get_stop_harvest_name(self, betmode: str):
+        """Reel stops harvested from accepted books of sampled criteria, kept between runs and shared by all shards."""
+        return os.path.join(self.library_path, "criteria_samplers", f"harvest_{betmode}.json")
+
+    def get_simulation_plan_name(self):
+        """Projected simulation time and suggested criteria sizes written by plan_simulations."""
+        return os.path.join(self.library_path, "simulation_plan.json")
+
+    def get_build_cache_name(self):
+        """Fingerprints of built outputs, used by incremental runs."""
+        return os.path.join(self.library_path, "build_cache.json")
+
+    def get_run_manifest_name(self):
+        """Record of completed simulation chunks, kept alongside the temp files."""
+        return os.path.join(self.temp_path, "run_manifest.json")
 
     def get_final_book_name(self, betmode: str, compress: bool):
         """Returns final simulation books output name."""
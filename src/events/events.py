@@ -17,6 +17,8 @@ def json_ready_sym(symbol: object, special_attributes: list = None):
 
 def reveal_event(gamestate):
     """Display the initial board drawn from reelstrips."""
+    if not gamestate.book.record_events:
+        return
     board_client = []
     special_attributes = list(gamestate.config.special_symbols.keys())
     for reel, _ in enumerate(gamestate.board):
@@ -79,6 +81,8 @@ def fs_trigger_event(
 
 def set_win_event(gamestate, winlevel_key: str = "standard"):
     """Used for updating cumulative win ticker (for a single outcome)."""
+    if not gamestate.book.record_events:
+        return
     if not gamestate.wincap_triggered:
         event = {
             "index": len(gamestate.book.events),
@@ -96,6 +100,8 @@ def set_win_event(gamestate, winlevel_key: str = "standard"):
 
 def set_total_event(gamestate):
     """Updates win amount for a betting round (including cumulative wins across multiple freespin wins)."""
+    if not gamestate.book.record_events:
+        return
     event = {
         "index": len(gamestate.book.events),
         "type": EventConstants.SET_TOTAL_WIN.value,
@@ -111,6 +117,8 @@ def set_total_event(gamestate):
 
 def set_tumble_event(gamestate):
     """Update banner indicating wins from successive tumbles."""
+    if not gamestate.book.record_events:
+        return
     event = {
         "index": len(gamestate.book.events),
         "type": EventConstants.SET_TUMBLE_WIN.value,
@@ -121,6 +129,8 @@ def set_tumble_event(gamestate):
 
 def wincap_event(gamestate):
     """Emit to indicate end of spin actions."""
+    if not gamestate.book.record_events:
+        return
     event = {
         "index": len(gamestate.book.events),
         "type": EventConstants.WINCAP.value,
@@ -138,6 +148,8 @@ def win_info_event(gamestate, include_padding_index=True):
     """
     include_padding_index: starts winning-symbol positions at row=1, to account for top/bottom symbol inclusion in board
     """
+    if not gamestate.book.record_events:
+        return
     win_data_copy = {}
     win_data_copy["wins"] = deepcopy(gamestate.win_data["wins"])
     for idx, w in enumerate(win_data_copy["wins"]):
@@ -175,6 +187,8 @@ def win_info_event(gamestate, include_padding_index=True):
 
 def update_tumble_win_event(gamestate):
     """Update a banner to record successive tumble wins."""
+    if not gamestate.book.record_events:
+        return
     event = {
         "index": len(gamestate.book.events),
         "type": EventConstants.UPDATE_TUMBLE_WIN.value,
@@ -185,6 +199,8 @@ def update_tumble_win_event(gamestate):
 
 def update_freespin_event(gamestate):
     """Update the current spin number and total freegame"""
+    if not gamestate.book.record_events:
+        return
     event = {
         "index": len(gamestate.book.events),
         "type": EventConstants.UPDATE_FS.value,
@@ -196,6 +212,8 @@ def update_freespin_event(gamestate):
 
 def freespin_end_event(gamestate, winlevel_key="endFeature"):
     """End of feature trigger."""
+    if not gamestate.book.record_events:
+        return
     event = {
         "index": len(gamestate.book.events),
         "type": EventConstants.FREE_SPIN_END.value,
@@ -207,6 +225,8 @@ def freespin_end_event(gamestate, winlevel_key="endFeature"):
 
 def final_win_event(gamestate):
     """Assigns final payout multiplier for a simulation."""
+    if not gamestate.book.record_events:
+        return
     event = {
         "index": len(gamestate.book.events),
         "type": EventConstants.FINAL_WIN.value,
@@ -217,6 +237,8 @@ def final_win_event(gamestate):
 
 def update_global_mult_event(gamestate):
     """Increment global multiplier value."""
+    if not gamestate.book.record_events:
+        return
     event = {
         "index": len(gamestate.book.events),
         "type": EventConstants.UPDATE_GLOBAL_MULT.value,
@@ -228,6 +250,8 @@ def update_global_mult_event(gamestate):
 
 def tumble_board_event(gamestate):
     """States the symbol positions removed from a board during tumble, and which new symbols should take their place."""
+    if not gamestate.book.record_events:
+        return
     special_attributes = list(gamestate.config.special_symbols.keys())
 
     exploding = []
@@ -256,6 +280,8 @@ def tumble_board_event(gamestate):
 
 def enter_bonus_event(gamestate) -> None:
     "Indicate feature game entry explicitly."
+    if not gamestate.book.record_events:
+        return
     event = {
         "index": len(gamestate.book.events),
         "type": EventConstants.ENTER_BONUS.value,
@@ -0,0 +1,83 @@
+"""Persistent record of accepted spin attempts, used to skip rejected attempts when re-simulating a bet-mode."""
+
+import os
+import json
+import base64
+import struct
+from typing import List
+
+MT_STATE_FORMAT = "<625I"
+
+
+def encode_rng_state(rng_state: tuple) -> list:
+    """Compact JSON form of random.getstate(): version, packed Mersenne Twister words and gauss_next."""
+    version, internal_state, gauss_next = rng_state
+    return [version, base64.b64encode(struct.pack(MT_STATE_FORMAT, *internal_state)).decode("ascii"), gauss_next]
+
+
+def decode_rng_state(encoded_state: list) -> tuple:
+    """Inverse of encode_rng_state(), the result can be passed to random.setstate()."""
+    version, packed_state, gauss_next = encoded_state
+    return (version, struct.unpack(MT_STATE_FORMAT, base64.b64decode(packed_state)), gauss_next)
+
+
+class AcceptanceCache:
+    """
+    Per bet-mode memo of the attempt accepted for each (criteria, seed): the number of rejected attempts before it,
+    the RNG state at the start of the accepted attempt and its payout.
+    A re-run restores the RNG state and continues straight from the accepted attempt, producing the same book.
+    Entries are only valid for an identical game code and configuration fingerprint, a cache file with a
+    different fingerprint is discarded on load. Only simulations rejected at least min_repeats times are recorded.
+    """
+
+    def __init__(self, filename: str, fingerprint: str, min_repeats: int = 10):
+        self.filename = filename
+        self.fingerprint = fingerprint
+        self.min_repeats = max(int(min_repeats), 1)
+        self.entries = {}
+        self.new_entries = {}
+
+    @staticmethod
+    def get_key(criteria: str, seed: int) -> str:
+        return f"{criteria}:{seed}"
+
+    def load(self) -> None:
+        """Read cached entries, ignoring the file if game code or configuration changed since it was written."""
+        if not os.path.isfile(self.filename):
+            return
+        with open(self.filename, "r", encoding="UTF-8") as f:
+            cache = json.load(f)
+        if cache.get("fingerprint") != self.fingerprint:
+            print(f"Acceptance cache {os.path.basename(self.filename)} is out of date, game code or config changed.")
+            return
+        self.entries = cache["entries"]
+        print(f"Loaded {len(self.entries)} cached accepted attempts from {os.path.basename(self.filename)}.")
+
+    def save(self) -> None:
+        """Atomically write all entries, keyed by the current fingerprint."""
+        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+        temp_filename = self.filename + ".tmp"
+        with open(temp_filename, "w", encoding="UTF-8") as f:
+            json.dump({"fingerprint": self.fingerprint, "entries": dict(sorted(self.entries.items()))}, f)
+        os.replace(temp_filename, self.filename)
+
+    def lookup(self, criteria: str, seed: int) -> list:
+        """Cached [rejected_attempts, rng_state, payout] of a simulation, or None."""
+        return self.entries.get(self.get_key(criteria, seed))
+
+    def record(self, criteria: str, seed: int, rejected_attempts: int, rng_state: tuple, payout: int) -> None:
+        """Store the accepted attempt of a simulation simulated in this process."""
+        self.new_entries[self.get_key(criteria, seed)] = [rejected_attempts, encode_rng_state(rng_state), payout]
+
+    def write_temp(self, filename: str) -> None:
+        """Hand entries recorded while simulating a chunk to the parent process."""
+        with open(filename, "w", encoding="UTF-8") as f:
+            json.dump(self.new_entries, f)
+        self.new_entries = {}
+
+    def merge_temp(self, filenames: List[str]) -> None:
+        """Add entries written by every chunk, chunks skipped on resume may not have a file."""
+        for filename in filenames:
+            if os.path.isfile(filename):
+                with open(filename, "r", encoding="UTF-8") as f:
+                    self.entries.update(json.load(f))
@@ -0,0 +1,133 @@
+"""Book streams which compress and write books as simulations finish, in the worker or in dedicated writer processes."""
+
+import json
+import traceback
+from multiprocessing import Queue
+import zstandard as zstd
+
+BOOK_SEGMENT_SIZE = 64
+BOOK_QUEUE_SIZE = 64
+
+
+class BookStream:
+    """
+    Worker-side buffer of JSON-encoded books for one simulation chunk.
+    Every segment_size books are sent to the chunk's writer, blocking while the writer's queue is full.
+    bytes_written counts bytes written by the worker itself, writer processes report theirs in the chunk's ack.
+    """
+
+    def __init__(self, book_queue: Queue, task_id: int, segment_size: int = None):
+        self.book_queue = book_queue
+        self.task_id = task_id
+        self.segment_size = segment_size or BOOK_SEGMENT_SIZE
+        self.filename = None
+        self.regular_json = False
+        self.segment = []
+        self.num_books = 0
+        self.bytes_written = 0
+
+    def open(self, filename: str, regular_json: bool = False) -> None:
+        """Start streaming books into filename, as a single JSON list if regular_json, otherwise as JSON lines."""
+        self.filename = filename
+        self.regular_json = regular_json
+        self.segment = []
+        self.num_books = 0
+        self.bytes_written = 0
+
+    def add(self, book: dict) -> None:
+        """Encode a finished book, sending the segment once it is full."""
+        self.segment.append(json.dumps(book))
+        self.num_books += 1
+        if len(self.segment) >= self.segment_size:
+            self.send_segment()
+
+    def send_segment(self) -> None:
+        if len(self.segment) == 0:
+            return
+        if self.regular_json:
+            first_book = self.num_books == len(self.segment)
+            data = ("[" if first_book else ", ") + ", ".join(self.segment)
+        else:
+            data = "\n".join(self.segment) + "\n"
+        self.send("books", data)
+        self.segment = []
+
+    def close(self) -> None:
+        """Send the remaining books and finish the file, the writer acknowledges once it is on disk."""
+        if self.filename is not None:
+            self.send_segment()
+            if self.regular_json:
+                self.send("books", "]" if self.num_books > 0 else "[]")
+            elif self.num_books == 0:
+                self.send("books", "\n")
+        self.send("close", None)
+        self.filename = None
+
+    def send(self, kind: str, data: str) -> None:
+        self.book_queue.put((kind, self.task_id, self.filename, data))
+
+
+class LocalBookStream(BookStream):
+    """
+    Book stream of a worker without writer processes: each segment is compressed and written by the worker itself,
+    so only the segment being filled is held in memory.
+    """
+
+    def __init__(self, segment_size: int = None):
+        super().__init__(None, None, segment_size)
+        self.open_file = None
+
+    def send(self, kind: str, data: str) -> None:
+        if kind == "books":
+            if self.open_file is None:
+                self.open_file = OpenBookFile(self.filename)
+            self.open_file.write(data)
+        elif self.open_file is not None:
+            self.bytes_written = self.open_file.close()
+            self.open_file = None
+
+
+class OpenBookFile:
+    """Output file of one chunk, compressed incrementally if it is a .zst file."""
+
+    def __init__(self, filename: str):
+        self.file = open(filename, "wb")  # pylint: disable=consider-using-with
+        self.compressor = zstd.ZstdCompressor().compressobj() if filename.endswith(".zst") else None
+        self.bytes_written = 0
+
+    def write(self, data: str) -> None:
+        encoded = data.encode("UTF-8")
+        self.bytes_written += self.file.write(encoded if self.compressor is None else self.compressor.compress(encoded))
+
+    def close(self) -> int:
+        """Finish the file, returning the number of bytes written to it."""
+        if self.compressor is not None:
+            self.bytes_written += self.file.write(self.compressor.flush())
+        self.file.close()
+        return self.bytes_written
+
+
+def book_writer_loop(writer_index: int, book_queue: Queue, result_queue: Queue) -> None:
+    """
+    Write streamed books until the stop signal (None) is received.
+    Each finished chunk is acknowledged on the result queue as ("written", writer_index, task_id, bytes written).
+    """
+    open_files = {}
+    while True:
+        message = book_queue.get()
+        if message is None:
+            break
+        kind, task_id, filename, data = message
+        try:
+            if kind == "books":
+                if task_id not in open_files:
+                    open_files[task_id] = OpenBookFile(filename)
+                open_files[task_id].write(data)
+            elif kind == "close":
+                bytes_written = open_files.pop(task_id).close() if task_id in open_files else 0
+                result_queue.put(("written", writer_index, task_id, bytes_written))
+        except Exception:  # pylint: disable=broad-except
+            open_files.pop(task_id, None)
+            result_queue.put(("write_error", writer_index, task_id, traceback.format_exc()))
+    for open_file in open_files.values():
+        open_file.close()
@@ -1,14 +1,26 @@
 "Handles independent simulation events and details."
 
 from copy import deepcopy
+from typing import NamedTuple
+
+
+class BookSummary(NamedTuple):
+    "Fields of a finished book needed for lookup tables, kept once the book itself has been written."
+
+    id: int
+    payout_multiplier: int
+    criteria: str
+    basegame_wins: float
+    freegame_wins: float
 
 
 class Book:
     "Stores simulation information."
 
-    def __init__(self, book_id: int, criteria: str):
-        "Initialize simulation book"
+    def __init__(self, book_id: int, criteria: str, record_events: bool = True):
+        "Initialize simulation book, events are discarded if record_events is False (stats-only runs)."
         self.id = book_id
+        self.record_events = record_events
         self.payout_multiplier = 0.0
         self.events = []
         self.criteria = criteria
@@ -17,10 +29,13 @@ class Book:
 
     def add_event(self, event: dict):
         "Append event to book."
-        self.events.append(deepcopy(event))
+        if self.record_events:
+            self.events.append(deepcopy(event))
 
     def append_book_items(self, event_id: int, appended_info: dict):
         "Modify an existing book event at position 'event_id'"
+        if not self.record_events:
+            return
         for k, v in appended_info.items():
             self.events[event_id][k] = v
 
@@ -35,3 +50,13 @@ class Book:
             "freeGameWins": self.freegame_wins,
         }
         return json_book
+
+    def to_summary(self) -> BookSummary:
+        "Return the lookup table fields of the book."
+        return BookSummary(
+            self.id,
+            int(round(self.payout_multiplier * 100, 0)),
+            self.criteria,
+            self.basegame_wins,
+            self.freegame_wins,
+        )
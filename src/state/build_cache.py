@@ -0,0 +1,95 @@
+"""Fingerprints of previously built outputs, used to skip bet-modes, configs and analysis which are unchanged."""
+
+import os
+import json
+import hashlib
+from warnings import warn
+from typing import List
+
+from src.write_data.write_data import get_sha_256
+
+BUILD_CACHE_VERSION = 1
+
+
+class BuildCache:
+    """
+    JSON record stored in the game library.
+    Each entry maps a build step (e.g. 'books/base', 'configs') to the fingerprint of its inputs and the size and
+    modification time of every output file. A step is current if the fingerprint matches and no output was touched.
+    File hashes are cached by size and modification time, so unchanged large files are only hashed once.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.root = os.path.dirname(path)
+        self.entries = {}
+        self.file_hashes = {}
+
+    def load(self) -> None:
+        """Read an existing cache, an unreadable or outdated cache is treated as empty."""
+        if not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="UTF-8") as f:
+                data = json.load(f)
+        except json.JSONDecodeError:
+            warn(f"Could not decode {self.path}, all outputs will be rebuilt.")
+            return
+        if data.get("version") == BUILD_CACHE_VERSION:
+            self.entries = data["entries"]
+            self.file_hashes = data["file_hashes"]
+
+    def save(self) -> None:
+        """Atomically replace the cache file."""
+        temp_name = self.path + ".tmp"
+        with open(temp_name, "w", encoding="UTF-8") as f:
+            json.dump({"version": BUILD_CACHE_VERSION, "entries": self.entries, "file_hashes": self.file_hashes}, f)
+        os.replace(temp_name, self.path)
+
+    def get_file_stat(self, filename: str) -> list:
+        """[size, mtime_ns] of a file, None if it does not exist."""
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def get_file_hash(self, filename: str) -> str:
+        """sha256 of a file, reused while its size and modification time are unchanged. Missing files hash to ''."""
+        stat = self.get_file_stat(filename)
+        if stat is None:
+            return ""
+        key = os.path.relpath(filename, self.root)
+        cached = self.file_hashes.get(key)
+        if cached is None or cached["stat"] != stat:
+            cached = {"stat": stat, "sha256": get_sha_256(filename)}
+            self.file_hashes[key] = cached
+        return cached["sha256"]
+
+    def get_inputs_fingerprint(self, fingerprint: str, filenames: List[str]) -> str:
+        """Combine a configuration fingerprint with the content of input files."""
+        inputs_hash = hashlib.sha256(fingerprint.encode("UTF-8"))
+        for filename in sorted(filenames):
+            inputs_hash.update(f"{os.path.relpath(filename, self.root)}:{self.get_file_hash(filename)}".encode("UTF-8"))
+        return inputs_hash.hexdigest()
+
+    def is_current(self, step: str, fingerprint: str) -> bool:
+        """The step was built from the same fingerprint and all of its outputs are unchanged since."""
+        entry = self.entries.get(step)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return False
+        return all(
+            self.get_file_stat(os.path.join(self.root, filename)) == stat for filename, stat in entry["outputs"].items()
+        )
+
+    def record(self, step: str, fingerprint: str, output_filenames: List[str], details: dict = None) -> None:
+        """Store the fingerprint and current state of every output of a finished step."""
+        self.entries[step] = {
+            "fingerprint": fingerprint,
+            "outputs": {os.path.relpath(f, self.root): self.get_file_stat(f) for f in output_filenames},
+            "details": details or {},
+        }
+
+    def get_details(self, step: str) -> dict:
+        """Extra values stored with a step, such as force options of a bet-mode."""
+        return self.entries[step]["details"]
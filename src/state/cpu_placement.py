@@ -0,0 +1,112 @@
+"""Pinning of simulation workers and the parent process to CPU cores (Linux only)."""
+
+import os
+import glob
+from warnings import warn
+from typing import Dict, List, Union
+
+
+def parse_cpu_list(cpu_list: str) -> List[int]:
+    """Expand a kernel cpulist string such as '0-3,8,10-11'."""
+    cpus = []
+    for part in cpu_list.strip().split(","):
+        if "-" in part:
+            start, end = part.split("-")
+            cpus += list(range(int(start), int(end) + 1))
+        elif part != "":
+            cpus.append(int(part))
+    return cpus
+
+
+def get_available_cpus() -> List[int]:
+    """CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def get_numa_nodes(node_path: str = "/sys/devices/system/node") -> Dict[int, List[int]]:
+    """CPUs of each NUMA node, all CPUs are treated as a single node where the topology is unavailable."""
+    nodes = {}
+    for node_dir in glob.glob(os.path.join(node_path, "node[0-9]*")):
+        try:
+            with open(os.path.join(node_dir, "cpulist"), "r", encoding="UTF-8") as f:
+                nodes[int(os.path.basename(node_dir)[len("node") :])] = parse_cpu_list(f.read())
+        except (OSError, ValueError):
+            continue
+    if len(nodes) == 0:
+        nodes[0] = get_available_cpus()
+    return dict(sorted(nodes.items()))
+
+
+def plan_worker_placement(
+    threads: int,
+    cpu_affinity: Union[str, List[int]] = "round_robin",
+    reserve_parent_cpu: bool = False,
+    max_workers_per_numa_node: int = None,
+    available_cpus: List[int] = None,
+    numa_nodes: Dict[int, List[int]] = None,
+) -> dict:
+    """
+    Assign one CPU to each worker.
+    cpu_affinity="round_robin" cycles through the available CPUs, NUMA node by NUMA node; a list of CPU ids is
+    cycled through in the given order. reserve_parent_cpu keeps the first available CPU for the parent process,
+    which also runs the merge. max_workers_per_numa_node caps the number of workers placed on any one node.
+    """
+    if available_cpus is None:
+        available_cpus = get_available_cpus()
+    if numa_nodes is None:
+        numa_nodes = get_numa_nodes()
+    cpu_node = {cpu: node for node, cpus in numa_nodes.items() for cpu in cpus}
+
+    parent_cpus = None
+    if reserve_parent_cpu:
+        parent_cpus = [available_cpus[0]]
+        available_cpus = available_cpus[1:]
+
+    if cpu_affinity == "round_robin":
+        candidates = [cpu for node in numa_nodes for cpu in numa_nodes[node] if cpu in available_cpus]
+        candidates += [cpu for cpu in available_cpus if cpu not in cpu_node]
+    elif isinstance(cpu_affinity, (list, tuple)):
+        unavailable = [cpu for cpu in cpu_affinity if cpu not in available_cpus]
+        if len(unavailable) > 0:
+            raise ValueError(f"CPUs {unavailable} are not available to simulation workers.")
+        candidates = list(cpu_affinity)
+    else:
+        raise ValueError(f"cpu_affinity must be 'round_robin' or a list of CPU ids, got {cpu_affinity}")
+    if len(candidates) == 0:
+        raise ValueError("No CPUs are left for simulation workers.")
+
+    if max_workers_per_numa_node is not None:
+        node_capacity = {}
+        for cpu in candidates:
+            node_capacity.setdefault(cpu_node.get(cpu), set()).add(cpu)
+        capacity = sum(min(len(cpus), max_workers_per_numa_node) for cpus in node_capacity.values())
+        if threads > capacity:
+            raise ValueError(
+                f"{threads} workers do not fit on {len(node_capacity)} NUMA nodes "
+                f"with at most {max_workers_per_numa_node} workers per node."
+            )
+        node_workers, capped_candidates = {}, []
+        for cpu in candidates:
+            node = cpu_node.get(cpu)
+            if cpu not in capped_candidates and node_workers.get(node, 0) < max_workers_per_numa_node:
+                node_workers[node] = node_workers.get(node, 0) + 1
+                capped_candidates.append(cpu)
+        candidates = capped_candidates
+
+    worker_cpus = [[candidates[worker_index % len(candidates)]] for worker_index in range(threads)]
+    return {
+        "parent": parent_cpus,
+        "workers": worker_cpus,
+        "worker_numa_nodes": [cpu_node.get(cpus[0]) for cpus in worker_cpus],
+    }
+
+
+def set_cpu_affinity(cpus: List[int]) -> bool:
+    """Pin the calling process to cpus, returns False where affinity is not supported."""
+    if not hasattr(os, "sched_setaffinity"):
+        warn("CPU affinity is only supported on Linux, workers are not pinned.")
+        return False
+    os.sched_setaffinity(0, cpus)
+    return True
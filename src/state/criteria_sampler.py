@@ -0,0 +1,172 @@
+"""Criteria samplers which bias reel stops toward boards likely to satisfy a distribution's criteria."""
+
+import os
+import json
+import random
+import hashlib
+from warnings import warn
+from typing import Dict, List
+
+from src.state.fingerprint import get_code_fingerprint, get_betmode_fingerprint
+
+
+class CriteriaSampler:
+    """
+    Optional hook of a Distribution, proposing the reel stops of boards drawn for its criteria instead of uniform stops.
+    Only fixed-payout criteria (a win_criteria) may be sampled, the bias is not corrected for in any output.
+    """
+
+    def __init__(self, gametypes: List[str] = None):
+        self.gametypes = gametypes
+
+    def applies_to(self, gamestate: object) -> bool:
+        """Whether boards of the current gametype (default: the base game) are drawn by this sampler."""
+        if self.gametypes is None:
+            return gamestate.gametype == gamestate.config.basegame_type
+        return gamestate.gametype in self.gametypes
+
+    def propose(self, gamestate: object, reelstrip_id: str) -> List[int]:
+        """Reel stops of the next board, uniform by default."""
+        reelstrip = gamestate.config.reels[reelstrip_id]
+        return [random.randrange(0, len(reelstrip[reel])) for reel in range(gamestate.config.num_reels)]
+
+
+class HarvestedStopSampler(CriteriaSampler):
+    """Re-use reel stops harvested from accepted books of earlier runs, uniform stops with probability explore."""
+
+    def __init__(self, explore: float = 0.1, max_windows: int = 1000, gametypes: List[str] = None):
+        super().__init__(gametypes)
+        if not 0 < explore <= 1:
+            raise ValueError(f"explore must be within (0, 1], got {explore}")
+        self.explore = explore
+        self.max_windows = max_windows
+
+    def propose(self, gamestate: object, reelstrip_id: str) -> List[int]:
+        windows = []
+        if gamestate.stop_harvest is not None:
+            windows = gamestate.stop_harvest.get_windows(gamestate.criteria, gamestate.gametype, reelstrip_id)
+        if len(windows) == 0 or random.random() < self.explore:
+            return super().propose(gamestate, reelstrip_id)
+        return list(random.choice(windows))
+
+
+def get_criteria_samplers(betmode: object) -> Dict[str, CriteriaSampler]:
+    """Samplers of a bet-mode's distributions, by criteria."""
+    return {
+        distribution.get_criteria(): distribution.get_sampler()
+        for distribution in betmode.get_distributions()
+        if distribution.get_sampler() is not None
+    }
+
+
+class StopHarvest:
+    """
+    Per bet-mode reel stops of accepted books, by criteria, gametype and reelstrip.
+    Runs only propose windows harvested by earlier runs, so books do not depend on the number of threads.
+    """
+
+    def __init__(self, filename: str, fingerprint: str, max_windows: dict):
+        self.filename = filename
+        self.fingerprint = fingerprint
+        self.max_windows = max_windows
+        self.windows = {}
+        self.window_sets = {}
+        self.loaded_sizes = {}
+        self.new_windows = []
+
+    @staticmethod
+    def get_key(criteria: str, gametype: str, reelstrip_id: str) -> str:
+        return f"{criteria}:{gametype}:{reelstrip_id}"
+
+    def load(self) -> None:
+        """Read harvested windows, ignoring the file if game code or configuration changed since it was written."""
+        if not os.path.isfile(self.filename):
+            return
+        with open(self.filename, "r", encoding="UTF-8") as f:
+            harvest = json.load(f)
+        if harvest.get("fingerprint") != self.fingerprint:
+            print(f"Stop harvest {os.path.basename(self.filename)} is out of date, game code or config changed.")
+            return
+        self.windows = {key: [tuple(window) for window in windows] for key, windows in harvest["windows"].items()}
+        self.window_sets = {key: set(windows) for key, windows in self.windows.items()}
+        self.loaded_sizes = {key: len(windows) for key, windows in self.windows.items()}
+        print(
+            f"Loaded {sum(len(windows) for windows in self.windows.values())} harvested reel stop windows",
+            f"from {os.path.basename(self.filename)}.",
+        )
+
+    def save(self) -> None:
+        """Atomically write all windows, keyed by the current fingerprint."""
+        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+        temp_filename = self.filename + ".tmp"
+        with open(temp_filename, "w", encoding="UTF-8") as f:
+            json.dump({"fingerprint": self.fingerprint, "windows": dict(sorted(self.windows.items()))}, f)
+        os.replace(temp_filename, self.filename)
+
+    def restrict(self, sizes: dict) -> None:
+        """
+        Keep only the first sizes[key] windows of each key, the harvest as loaded by an earlier run. Windows are only
+        ever appended, so this restores what that run proposed unless the harvest was discarded since.
+        """
+        if any(len(self.windows.get(key, [])) < size for key, size in sizes.items()):
+            warn(f"{os.path.basename(self.filename)} no longer holds the harvest of the run, the replay may differ.")
+        self.windows = {key: windows[: sizes.get(key, 0)] for key, windows in self.windows.items()}
+        self.window_sets = {key: set(windows) for key, windows in self.windows.items()}
+
+    def get_digest(self) -> str:
+        """Hash of the loaded windows, books simulated with a sampler depend on it."""
+        return hashlib.sha256(json.dumps(sorted(self.windows.items())).encode("UTF-8")).hexdigest()
+
+    def get_windows(self, criteria: str, gametype: str, reelstrip_id: str) -> list:
+        return self.windows.get(self.get_key(criteria, gametype, reelstrip_id), [])
+
+    def record(self, criteria: str, sampled_boards: dict) -> None:
+        """Store the last sampled board of each gametype of a book accepted in this process."""
+        if criteria not in self.max_windows:
+            return
+        for gametype, (reelstrip_id, reel_positions) in sampled_boards.items():
+            self.new_windows.append([self.get_key(criteria, gametype, reelstrip_id), list(reel_positions)])
+
+    def write_temp(self, filename: str) -> None:
+        """Hand windows harvested while simulating a chunk to the parent process."""
+        with open(filename, "w", encoding="UTF-8") as f:
+            json.dump(self.new_windows, f)
+        self.new_windows = []
+
+    def merge_temp(self, filenames: List[str]) -> None:
+        """Add new windows of every chunk in chunk order, chunks skipped on resume may not have a file."""
+        for filename in filenames:
+            if not os.path.isfile(filename):
+                continue
+            with open(filename, "r", encoding="UTF-8") as f:
+                for key, reel_positions in json.load(f):
+                    window = tuple(reel_positions)
+                    windows = self.windows.setdefault(key, [])
+                    window_set = self.window_sets.setdefault(key, set())
+                    if window not in window_set and len(windows) < self.max_windows.get(key.rsplit(":", 2)[0], 0):
+                        windows.append(window)
+                        window_set.add(window)
+
+
+def load_stop_harvests(gamestate: object, num_sim_args: dict) -> None:
+    """
+    Load the reel stop harvest of every simulated bet-mode with a HarvestedStopSampler before workers are forked.
+    Accepted attempts cached for a bet-mode depend on its harvest, see load_acceptance_caches().
+    """
+    code_fingerprint = None
+    for betmode, num_sims in num_sim_args.items():
+        max_windows = {
+            criteria: sampler.max_windows
+            for criteria, sampler in get_criteria_samplers(gamestate.get_betmode(betmode)).items()
+            if isinstance(sampler, HarvestedStopSampler)
+        }
+        if num_sims > 0 and len(max_windows) > 0:
+            if code_fingerprint is None:
+                code_fingerprint = get_code_fingerprint(gamestate)
+            harvest = StopHarvest(
+                gamestate.output_files.get_stop_harvest_name(betmode),
+                get_betmode_fingerprint(gamestate, betmode, code_fingerprint),
+                max_windows,
+            )
+            harvest.load()
+            gamestate.stop_harvests[betmode] = harvest
@@ -0,0 +1,103 @@
+"""Content fingerprints of game configuration and code, used to invalidate cached simulation results."""
+
+import os
+import hashlib
+import inspect
+
+from src.config.paths import PROJECT_PATH
+
+ENGINE_SOURCE_PATH = os.path.join(PROJECT_PATH, "src")
+UTILS_SOURCE_PATH = os.path.join(PROJECT_PATH, "utils")
+IGNORED_CONFIG_KEYS = {"_force_keys"}
+SIMULATION_IGNORED_KEYS = {"opt_params"}  # optimization parameters never change simulated outcomes
+IGNORED_DIRECTORIES = {"library", "__pycache__"}
+
+
+def canonical(value: object) -> str:
+    """Deterministic text representation of nested config values, independent of object ids and dict ordering."""
+    if isinstance(value, dict):
+        items = sorted((canonical(k), canonical(v)) for k, v in value.items() if k not in IGNORED_CONFIG_KEYS)
+        return "{" + ",".join(f"{k}:{v}" for k, v in items) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(canonical(v) for v in value) + "]"
+    if isinstance(value, (set, frozenset)):
+        return "{" + ",".join(sorted(canonical(v) for v in value)) + "}"
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return repr(value)
+    if hasattr(value, "tolist"):
+        return canonical(value.tolist())
+    if hasattr(value, "__dict__"):
+        return type(value).__name__ + canonical(vars(value))
+    return repr(value)
+
+
+def get_config_fingerprint(config: object, betmode: str = None, ignored_keys: set = None) -> str:
+    """
+    Hash of every game configuration value (reels, paytable, win levels, bet-modes ...), excluding output paths
+    and any ignored_keys. If betmode is given, other bet-modes are excluded so editing one mode does not invalidate
+    the others.
+    """
+    ignored_keys = ignored_keys or set()
+    values = {
+        key: value for key, value in vars(config).items() if "path" not in key.lower() and key not in ignored_keys
+    }
+    if betmode is not None:
+        values["bet_modes"] = [bm for bm in config.bet_modes if bm.get_name() == betmode]
+    return hashlib.sha256(canonical(values).encode("UTF-8")).hexdigest()
+
+
+def get_source_files(source_path: str) -> list:
+    """All python source files below source_path, excluding generated library output."""
+    source_files = []
+    for root, dirs, files in os.walk(source_path):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRECTORIES)
+        source_files += [os.path.join(root, f) for f in sorted(files) if f.endswith(".py")]
+    return source_files
+
+
+def get_code_fingerprint(gamestate: object, source_paths: list = None) -> str:
+    """
+    Hash of the game directory source files (where the GameState class is defined) and the engine source.
+    source_paths replaces the engine source, e.g. to also cover utils used by config generation and analysis.
+    """
+    game_path = os.path.dirname(os.path.abspath(inspect.getfile(type(gamestate))))
+    code_hash = hashlib.sha256()
+    for source_path in [game_path] + (source_paths or [ENGINE_SOURCE_PATH]):
+        for filename in get_source_files(source_path):
+            code_hash.update(os.path.relpath(filename, source_path).encode("UTF-8"))
+            with open(filename, "rb") as f:
+                code_hash.update(hashlib.sha256(f.read()).digest())
+    return code_hash.hexdigest()
+
+
+def get_betmode_fingerprint(gamestate: object, betmode: str, code_fingerprint: str = None) -> str:
+    """Combined code and configuration fingerprint of a single bet-mode."""
+    if code_fingerprint is None:
+        code_fingerprint = get_code_fingerprint(gamestate)
+    config_fingerprint = get_config_fingerprint(gamestate.config, betmode, SIMULATION_IGNORED_KEYS)
+    return hashlib.sha256(f"{code_fingerprint}:{config_fingerprint}:{betmode}".encode("UTF-8")).hexdigest()
+
+
+def get_reel_files_fingerprint(config: object) -> str:
+    """Hash of every file in the game's reels directory, which may also be read outside of config.reels."""
+    reel_hash = hashlib.sha256()
+    reels_path = getattr(config, "reels_path", None)
+    if reels_path is not None and os.path.isdir(reels_path):
+        for filename in sorted(os.listdir(reels_path)):
+            path = os.path.join(reels_path, filename)
+            if os.path.isfile(path):
+                with open(path, "rb") as f:
+                    reel_hash.update(filename.encode("UTF-8") + hashlib.sha256(f.read()).digest())
+    return reel_hash.hexdigest()
+
+
+def get_books_fingerprint(gamestate: object, betmode: str, run_params: dict, code_fingerprint: str = None) -> str:
+    """
+    Fingerprint of everything a bet-mode's books, lookup tables and force files depend on: game code, configuration
+    (reels, paytable, distributions), reel files and run parameters such as the number of simulations and seeds.
+    """
+    betmode_fingerprint = get_betmode_fingerprint(gamestate, betmode, code_fingerprint)
+    reel_fingerprint = get_reel_files_fingerprint(gamestate.config)
+    return hashlib.sha256(
+        f"{betmode_fingerprint}:{reel_fingerprint}:{canonical(run_params)}".encode("UTF-8")
+    ).hexdigest()
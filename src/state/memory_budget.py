@@ -0,0 +1,77 @@
+"""Batch sizes derived from a memory budget, measured with a short calibration run of each bet-mode."""
+
+import os
+import gc
+import math
+import tracemalloc
+
+from src.wins.win_manager import WinManager
+from src.state.prefork import get_process_memory
+
+CALIBRATION_SIMS = 200
+
+
+def measure_book_bytes(gamestate: object, betmode: str, sim_allocation: object, num_sims: int) -> float:
+    """
+    Simulate the first num_sims simulations of a bet-mode in this process, without writing any output,
+    and return the mean number of bytes each book keeps alive in book_summaries and recorded_events.
+    These simulations are part of the run, so any force keys they record would be found by the run itself.
+    """
+    gamestate.win_manager = WinManager(
+        gamestate.config.basegame_type, gamestate.config.freegame_type, gamestate.get_betmode(betmode).get_wincap()
+    )
+    gamestate.book_summaries = {}
+    gamestate.recorded_events = {}
+    gamestate.betmode = betmode
+    gamestate.num_sims = num_sims
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        for sim in range(num_sims):
+            gamestate.criteria = sim_allocation.get_criteria(sim)
+            gamestate.run_spin(sim, sim_allocation.get_seed(sim))
+        gc.collect()
+        book_bytes = (tracemalloc.get_traced_memory()[0] - baseline) / max(len(gamestate.book_summaries), 1)
+    finally:
+        tracemalloc.stop()
+        gamestate.book_summaries = {}
+        gamestate.finished_book = None
+        gamestate.recorded_events = {}
+        if gamestate.phase_timers is not None:
+            gamestate.phase_timers.collect()
+    return book_bytes
+
+
+def get_budget_batch_size(memory_budget_mb: float, threads: int, book_bytes: float, baseline_bytes: int = 0) -> int:
+    """Largest number of books per chunk for which every worker's chunk fits within the budget."""
+    worker_bytes = (memory_budget_mb * 1e6 - baseline_bytes) / max(threads, 1)
+    batch_size = math.floor(worker_bytes / max(book_bytes, 1.0))
+    if batch_size < 1:
+        raise ValueError(
+            f"A memory budget of {memory_budget_mb} MB cannot hold one book "
+            f"({round(book_bytes / 1e3, 1)} KB) per worker for {threads} workers."
+        )
+    return batch_size
+
+
+def calibrate_batch_size(
+    gamestate: object,
+    betmode: str,
+    sim_allocation: object,
+    memory_budget_mb: float,
+    threads: int,
+    max_batch_size: int = None,
+) -> int:
+    """Measure the bet-mode's memory per book and return the largest batch size fitting the budget."""
+    num_sims = min(CALIBRATION_SIMS, len(sim_allocation))
+    book_bytes = measure_book_bytes(gamestate, betmode, sim_allocation, num_sims)
+    baseline_bytes = get_process_memory(os.getpid()).get("rss", 0)
+    batch_size = get_budget_batch_size(memory_budget_mb, threads, book_bytes, baseline_bytes)
+    if max_batch_size is not None:
+        batch_size = min(batch_size, max_batch_size)
+    print(
+        f"Calibrated {betmode}: {round(book_bytes / 1e3, 2)} KB per book over {num_sims} simulations,",
+        f"batch size {batch_size} for a {memory_budget_mb} MB budget.",
+    )
+    return batch_size
@@ -0,0 +1,128 @@
+"""Opt-in wall-time and call-count instrumentation of the spin lifecycle."""
+
+import sys
+import time
+from functools import wraps
+from typing import Callable, Dict, List, Tuple
+
+from src.calculations.board import Board
+from src.calculations.cluster import Cluster
+from src.calculations.lines import Lines
+from src.calculations.scatter import Scatter
+from src.calculations.tumble import Tumble
+from src.calculations.ways import Ways
+from src.events import events
+from src.state.books import Book
+from src.state.state import GeneralGameState
+
+PHASE_METHODS = [
+    (Board, "create_board_reelstrips"),
+    (Board, "draw_board"),
+    (Tumble, "tumble_board"),
+    (Lines, "get_lines"),
+    (Lines, "record_lines_wins"),
+    (Lines, "emit_linewin_events"),
+    (Ways, "get_ways_data"),
+    (Ways, "record_ways_wins"),
+    (Ways, "emit_wayswin_events"),
+    (Cluster, "get_cluster_data"),
+    (Cluster, "record_cluster_wins"),
+    (Scatter, "get_scatterpay_wins"),
+    (Scatter, "record_scatter_wins"),
+    (Book, "add_event"),
+    (GeneralGameState, "imprint_wins"),
+]
+
+
+class PhaseTimers:
+    """
+    Accumulates calls, inclusive and exclusive (self) wall time per phase.
+    Nothing is wrapped until install() is called, so disabled timers add no overhead to the hot path.
+    Phases nest: time spent in an inner phase is removed from the self time of the enclosing phase.
+    """
+
+    def __init__(self):
+        self.installed = False
+        self.patches: List[Tuple[object, str, object]] = []
+        self.reset()
+
+    def reset(self) -> None:
+        self.phases: Dict[str, List] = {}
+        self.child_time: List[float] = []
+        self.active: Dict[str, int] = {}
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """Return func wrapped with a timer recording into phase name."""
+        perf_counter = time.perf_counter
+
+        @wraps(func)
+        def timed(*args, **kwargs):
+            child_time = self.child_time
+            active = self.active
+            active[name] = active.get(name, 0) + 1
+            child_time.append(0.0)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                record = self.phases.setdefault(name, [0, 0.0, 0.0])
+                record[0] += 1
+                record[2] += elapsed - child_time.pop()
+                active[name] -= 1
+                if active[name] == 0:
+                    record[1] += elapsed
+                if child_time:
+                    child_time[-1] += elapsed
+
+        return timed
+
+    def patch(self, owner: object, attr: str, replacement: object) -> None:
+        self.patches.append((owner, attr, owner.__dict__[attr] if isinstance(owner, type) else getattr(owner, attr)))
+        setattr(owner, attr, replacement)
+
+    def install(self, phase_methods: list = None) -> None:
+        """Wrap lifecycle methods and every event function, including names imported into other modules."""
+        if self.installed:
+            return
+        for owner, attr in phase_methods or PHASE_METHODS:
+            raw = owner.__dict__[attr]
+            name = f"{owner.__name__}.{attr}"
+            if isinstance(raw, staticmethod):
+                self.patch(owner, attr, staticmethod(self.wrap(name, raw.__func__)))
+            else:
+                self.patch(owner, attr, self.wrap(name, raw))
+
+        event_functions = {
+            id(func): self.wrap(f"events.{attr}", func)
+            for attr, func in vars(events).items()
+            if callable(func) and getattr(func, "__module__", None) == events.__name__
+        }
+        for module in list(sys.modules.values()):
+            module_vars = getattr(module, "__dict__", None)
+            if module_vars is None:
+                continue
+            for attr, value in list(module_vars.items()):
+                if id(value) in event_functions and callable(value):
+                    self.patch(module, attr, event_functions[id(value)])
+        self.installed = True
+        self.reset()
+
+    def uninstall(self) -> None:
+        """Restore every original method and function."""
+        for owner, attr, original in reversed(self.patches):
+            setattr(owner, attr, original)
+        self.patches = []
+        self.installed = False
+
+    def collect(self) -> Dict[str, dict]:
+        """Return and reset accumulated phase totals."""
+        phases = {
+            name: {"calls": calls, "total_seconds": total, "self_seconds": self_time}
+            for name, (calls, total, self_time) in self.phases.items()
+        }
+        self.phases = {}
+        return phases
+
+
+PHASE_TIMERS = PhaseTimers()
@@ -0,0 +1,63 @@
+"""Pre-fork preparation of read-only game data, and per-process memory reporting."""
+
+import gc
+import sys
+
+
+def freeze_reelstrips(reels: dict, memo: dict = None) -> dict:
+    """
+    Convert reelstrips to tuples of interned symbol names.
+    Each csv cell is otherwise a separate string object, so reading a reel writes refcounts across every page of it.
+    Reelstrips referenced more than once (e.g. padding reels) map to the same tuple through memo.
+    """
+    if memo is None:
+        memo = {}
+    frozen = {}
+    for reel_id, reelstrip in reels.items():
+        if id(reelstrip) not in memo:
+            memo[id(reelstrip)] = tuple(
+                tuple(sys.intern(sym) if isinstance(sym, str) else sym for sym in reel) for reel in reelstrip
+            )
+        frozen[reel_id] = memo[id(reelstrip)]
+    return frozen
+
+
+def prepare_for_fork(gamestate: object) -> dict:
+    """
+    Build read-only config structures and move every live object into the permanent GC generation.
+    Frozen objects are never traversed by the cyclic GC in forked workers, so their pages stay shared.
+    Returns the original reelstrips, pass them to restore_after_fork() once all workers are started.
+    """
+    originals = {"reels": gamestate.config.reels, "padding_reels": gamestate.config.padding_reels}
+    memo = {}
+    gamestate.config.reels = freeze_reelstrips(gamestate.config.reels, memo)
+    gamestate.config.padding_reels = freeze_reelstrips(gamestate.config.padding_reels, memo)
+    gc.collect()
+    gc.freeze()
+    return originals
+
+
+def restore_after_fork(gamestate: object, originals: dict) -> None:
+    """Release frozen objects and give the parent back its original reelstrips, workers keep the frozen ones."""
+    gc.unfreeze()
+    gamestate.config.reels = originals["reels"]
+    gamestate.config.padding_reels = originals["padding_reels"]
+
+
+def get_process_memory(pid: int) -> dict:
+    """Resident, proportional, shared and private memory of a process in bytes, empty where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r", encoding="UTF-8") as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    except OSError:
+        return {}
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
@@ -0,0 +1,145 @@
+"""Merge per-process cProfile output into one profile and report per bet-mode, or profile a single simulation."""
+
+import io
+import glob
+import json
+import time
+import pstats
+import cProfile
+import subprocess
+from warnings import warn
+from typing import List
+
+from src.wins.win_manager import WinManager
+from src.state.criteria_sampler import load_stop_harvests
+
+
+def merge_profiles(profile_names: List[str], output_name: str) -> pstats.Stats:
+    """Combine .prof files from the parent and every worker process."""
+    stats = pstats.Stats(profile_names[0])
+    for profile_name in profile_names[1:]:
+        stats.add(profile_name)
+    stats.dump_stats(output_name)
+    return stats
+
+
+def write_profile_report(stats: pstats.Stats, report_name: str, title: str, top_n: int = 40) -> None:
+    """Write the top_n functions by cumulative and by internal time."""
+    with open(report_name, "w", encoding="UTF-8") as f:
+        f.write(title + "\n\n")
+        for sort_key, label in [("cumulative", "cumulative time"), ("tottime", "internal time")]:
+            stream = io.StringIO()
+            stats.stream = stream
+            stats.sort_stats(sort_key).print_stats(top_n)
+            f.write(f"=== Top {top_n} functions by {label} ===\n")
+            f.write(stream.getvalue())
+            f.write("\n")
+
+
+def open_profile_viewer(profile_name: str) -> None:
+    """Open the profile in snakeviz (served on localhost) without blocking the simulation."""
+    try:
+        subprocess.Popen(["snakeviz", profile_name])  # pylint: disable=consider-using-with
+    except FileNotFoundError:
+        warn(f"snakeviz not found, profile saved to {profile_name}")
+
+
+def output_betmode_profiles(
+    gamestate: object,
+    betmodes: List[str],
+    headless: bool = False,
+    top_n: int = 40,
+    shard_index: int = 0,
+    shard_count: int = 1,
+) -> None:
+    """Merge parent and worker profiles of each bet-mode, write reports and optionally open the viewer."""
+    for betmode in betmodes:
+        worker_names = sorted(glob.glob(gamestate.output_files.get_temp_profile_name(betmode, "worker*")))
+        profile_names = [gamestate.output_files.get_temp_profile_name(betmode, "parent")]
+        profile_names += worker_names
+        output_name = gamestate.output_files.get_profile_name(betmode, ".prof", shard_index, shard_count)
+        stats = merge_profiles(profile_names, output_name)
+        report_name = gamestate.output_files.get_profile_name(betmode, ".txt", shard_index, shard_count)
+        title = f"{betmode}: merged profile of the parent and {len(worker_names)} worker processes"
+        write_profile_report(stats, report_name, title, top_n)
+        print("Saved profile for", betmode, "to", output_name, "and", report_name)
+        if not headless:
+            open_profile_viewer(output_name)
+
+
+def profile_single_sim(
+    gamestate: object,
+    betmode: str,
+    sim: int,
+    seed: int,
+    criteria: str,
+    headless: bool = True,
+    top_n: int = 40,
+    harvest_sizes: dict = None,
+) -> pstats.Stats:
+    """
+    Re-run one simulation in this process under cProfile, with the criteria and seed it was simulated with.
+    The acceptance cache is not used, so every rejected attempt is repeated. Criteria samplers propose from the stop
+    harvest, restricted to harvest_sizes (recorded in the slow simulation report) as loaded by the simulating run.
+    The profile and report are saved as simulationProfile_<betmode>_sim_<sim> in the game directory.
+    """
+    gamestate.win_manager = WinManager(
+        gamestate.config.basegame_type, gamestate.config.freegame_type, gamestate.get_betmode(betmode).get_wincap()
+    )
+    gamestate.book_summaries = {}
+    gamestate.recorded_events = {}
+    gamestate.betmode = betmode
+    gamestate.num_sims = 1
+    gamestate.criteria = criteria
+    gamestate.criteria_sampler = gamestate.get_current_betmode_distributions().get_sampler()
+    gamestate.acceptance_cache = None
+    if gamestate.criteria_sampler is not None:
+        load_stop_harvests(gamestate, {betmode: 1})
+        gamestate.stop_harvest = gamestate.stop_harvests.get(betmode)
+        if gamestate.stop_harvest is not None and harvest_sizes is not None:
+            gamestate.stop_harvest.restrict(harvest_sizes)
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        gamestate.run_spin(sim, seed)
+    finally:
+        profiler.disable()
+        gamestate.criteria_sampler = None
+        gamestate.stop_harvest = None
+        gamestate.stop_harvests = {}
+    seconds = time.perf_counter() - start
+
+    output_name = gamestate.output_files.get_profile_name(f"{betmode}_sim_{sim}", ".prof")
+    profiler.dump_stats(output_name)
+    stats = pstats.Stats(output_name)
+    report_name = gamestate.output_files.get_profile_name(f"{betmode}_sim_{sim}", ".txt")
+    title = (
+        f"{betmode} simulation {sim} (seed {seed}, criteria {criteria}): "
+        f"{max(gamestate.repeat_count, 1)} attempts in {round(seconds, 4)}s"
+    )
+    write_profile_report(stats, report_name, title, top_n)
+    print(title)
+    print("Saved profile to", output_name, "and", report_name)
+    if not headless:
+        open_profile_viewer(output_name)
+    return stats
+
+
+def profile_slow_sim(
+    gamestate: object, betmode: str, rank: int = 0, headless: bool = True, top_n: int = 40
+) -> pstats.Stats:
+    """Profile the rank-th slowest simulation recorded by create_books(..., RunOptions(slow_sims=k))."""
+    with open(gamestate.output_files.get_slow_sims_name(betmode), "r", encoding="UTF-8") as f:
+        report = json.load(f)
+    slow_sim = report["slowest"][rank]
+    return profile_single_sim(
+        gamestate,
+        betmode,
+        slow_sim["sim"],
+        slow_sim["seed"],
+        slow_sim["criteria"],
+        headless,
+        top_n,
+        report.get("harvest_sizes"),
+    )
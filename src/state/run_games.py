@@ -0,0 +1,240 @@
+"""Simulate several games on one shared worker pool, overlapping merge, config and analysis stages across games."""
+
+import os
+import sys
+import json
+import time
+import shutil
+import importlib
+import threading
+import traceback
+from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config.paths import PATH_TO_GAMES
+from src.state.worker_pool import SimulationPool
+from src.state.run_manifest import RunManifest
+from src.state.telemetry import ProgressTracker
+from src.state.run_sims import get_betmode_args, merge_betmode_outputs, run_pooled_games
+from src.write_data.write_data import write_force_options
+
+
+def load_game(game_id: str, load_optimization: bool = False) -> object:
+    """
+    Import a game's modules from games/<game_id> and return a new gamestate.
+    Games use the same top-level module names, so modules of a previously loaded game are removed from sys.modules
+    first; classes which were already imported keep referring to their own game's modules.
+    load_optimization also applies the game's OptimizationSetup to its config.
+    """
+    games_path = os.path.abspath(PATH_TO_GAMES)
+    game_path = os.path.join(games_path, game_id)
+    if not os.path.isfile(os.path.join(game_path, "gamestate.py")):
+        raise FileNotFoundError(f"{game_path} does not contain a gamestate.py")
+    for name, module in list(sys.modules.items()):
+        module_file = getattr(module, "__file__", None)
+        if "." not in name and module_file is not None and os.path.dirname(os.path.dirname(module_file)) == games_path:
+            del sys.modules[name]
+    sys.path.insert(0, game_path)
+    try:
+        config = importlib.import_module("game_config").GameConfig()
+        gamestate = importlib.import_module("gamestate").GameState(config)
+        if load_optimization:
+            importlib.import_module("game_optimization").OptimizationSetup(config)
+    finally:
+        sys.path.remove(game_path)
+    return gamestate
+
+
+def get_stage_timing(start: float, end: float, run_start: float) -> dict:
+    """Stage start and end in seconds since the start of the run."""
+    return {"start": round(start - run_start, 3), "end": round(end - run_start, 3), "seconds": round(end - start, 3)}
+
+
+def run_games(
+    gamestates: List[object],
+    num_sim_args: Dict[str, dict],
+    batch_size: int,
+    cores: int,
+    compress: bool = True,
+    post_workers: int = 2,
+    run_configs: bool = True,
+    run_optimization: bool = False,
+    rust_threads: int = None,
+    run_analysis: bool = False,
+    custom_keys: Dict[str, list] = None,
+    run_format_checks: bool = False,
+    report_name: str = None,
+) -> dict:
+    """
+    Simulate the bet-modes of every game through one worker pool within a global budget of cores.
+    One core is kept for the parent, which queues chunks and runs the post-simulation stages on post_workers threads:
+    each bet-mode is merged as soon as its last chunk returns, and once all of a game's bet-modes are merged its
+    configs, optional optimization (one game at a time, with rust_threads), analysis and format checks run while
+    later games are still simulating.
+    num_sim_args maps each game_id to its {betmode: num_sims}, custom_keys maps a game_id to its analysis keys.
+    Stage timings of every game are written to report_name (default games/run_games_report.json) and returned.
+    """
+    run_start = time.time()
+    threads = max(cores - 1, 1)
+    report = {
+        "cores": cores,
+        "threads": threads,
+        "post_workers": post_workers,
+        "batch_size": batch_size,
+        "compress": compress,
+        "games": {},
+    }
+    optimization_lock = threading.Lock()
+    post_executor = ThreadPoolExecutor(max_workers=post_workers)
+    game_runs, progress_trackers, post_stages, unsimulated_games = [], {}, {}, []
+
+    def finish_game(gamestate: object, merges: dict) -> None:
+        game_id = gamestate.config.game_id
+        game_report = report["games"][game_id]
+        for betmode, merge in merges.items():
+            write_force_options(gamestate, betmode, merge.result())
+        shutil.rmtree(gamestate.output_files.temp_path, ignore_errors=True)
+        progress_trackers[game_id].write_metrics(
+            gamestate.output_files.get_simulation_metrics_name(),
+            {"game_id": game_id, "threads": threads, "batch_size": batch_size, "compress": compress},
+        )
+        if run_configs:
+            # pylint: disable=import-outside-toplevel
+            from src.write_data.write_configs import generate_configs
+
+            start = time.time()
+            generate_configs(gamestate)
+            game_report["stages"]["configs"] = get_stage_timing(start, time.time(), run_start)
+        if run_optimization:
+            with optimization_lock:
+                # pylint: disable=import-outside-toplevel
+                from optimization_program.run_script import OptimizationExecution
+                from src.write_data.write_configs import generate_configs
+
+                start = time.time()
+                OptimizationExecution().run_all_modes(gamestate.config, list(merges), rust_threads or cores)
+                generate_configs(gamestate)
+                game_report["stages"]["optimization"] = get_stage_timing(start, time.time(), run_start)
+        if run_analysis:
+            # pylint: disable=import-outside-toplevel
+            from utils.game_analytics.run_analysis import create_stat_sheet
+
+            start = time.time()
+            create_stat_sheet(gamestate, custom_keys=(custom_keys or {}).get(game_id))
+            game_report["stages"]["analysis"] = get_stage_timing(start, time.time(), run_start)
+        if run_format_checks:
+            # pylint: disable=import-outside-toplevel
+            from utils.rgs_verification import execute_all_tests
+
+            start = time.time()
+            execute_all_tests(gamestate.config)
+            game_report["stages"]["format_checks"] = get_stage_timing(start, time.time(), run_start)
+
+    def timed_merge(gamestate: object, betmode: str, sim_chunks: list) -> dict:
+        start = time.time()
+        force_options = merge_betmode_outputs(gamestate.config.game_id, betmode, gamestate, sim_chunks, compress)
+        merge_timing = get_stage_timing(start, time.time(), run_start)
+        report["games"][gamestate.config.game_id]["betmodes"][betmode]["merge"] = merge_timing
+        return force_options
+
+    def get_on_betmode_done(gamestate: object, betmodes: List[str]):
+        game_id = gamestate.config.game_id
+        merges = {}
+
+        def on_betmode_done(betmode: str, sim_chunks: list) -> None:
+            progress = progress_trackers[game_id].modes[betmode]
+            report["games"][game_id]["betmodes"][betmode] = {
+                "num_sims": sim_chunks[-1][1],
+                "simulation": get_stage_timing(progress["start_time"], progress["end_time"], run_start),
+                "busy_seconds": round(progress["busy_seconds"], 3),
+            }
+            merges[betmode] = post_executor.submit(timed_merge, gamestate, betmode, sim_chunks)
+            if len(merges) == len(betmodes):
+                merges_in_order = {name: merges[name] for name in betmodes}
+                post_stages[game_id] = post_executor.submit(finish_game, gamestate, merges_in_order)
+
+        return on_betmode_done
+
+    for gamestate in gamestates:
+        game_id = gamestate.config.game_id
+        progress_trackers[game_id] = ProgressTracker()
+        manifest = RunManifest(gamestate.output_files.get_run_manifest_name())
+        game_sim_args = {betmode: int(num_sims) for betmode, num_sims in num_sim_args[game_id].items()}
+        betmode_args, _ = get_betmode_args(
+            gamestate,
+            gamestate.config,
+            game_sim_args,
+            batch_size,
+            threads,
+            compress,
+            manifest,
+            progress=progress_trackers[game_id],
+        )
+        report["games"][game_id] = {"betmodes": {}, "stages": {}}
+        betmodes = [run_args["betmode"] for run_args in betmode_args]
+        if len(betmodes) == 0:
+            unsimulated_games.append(gamestate)
+            continue
+        game_runs.append(
+            {
+                "gamestate": gamestate,
+                "betmode_args": betmode_args,
+                "on_betmode_done": get_on_betmode_done(gamestate, betmodes),
+            }
+        )
+
+    pool = SimulationPool(gamestates, threads, progress_tracker=progress_trackers)
+    sim_start = time.time()
+    try:
+        pool.start()
+        for gamestate in unsimulated_games:
+            post_stages[gamestate.config.game_id] = post_executor.submit(finish_game, gamestate, {})
+        run_pooled_games(pool, game_runs)
+    finally:
+        pool.shutdown()
+        post_executor.shutdown(wait=True)
+    sim_end = time.time()
+
+    failed = {}
+    for game_id, post_stage in post_stages.items():
+        try:
+            post_stage.result()
+        except Exception:  # pylint: disable=broad-except
+            failed[game_id] = traceback.format_exc()
+            report["games"][game_id]["error"] = failed[game_id]
+
+    worker_busy_seconds = sum(
+        betmode["busy_seconds"] for game in report["games"].values() for betmode in game["betmodes"].values()
+    )
+    post_stages_timing = [
+        stage
+        for game in report["games"].values()
+        for stage in list(game["stages"].values())
+        + [betmode["merge"] for betmode in game["betmodes"].values() if "merge" in betmode]
+    ]
+    sim_window = (sim_start - run_start, sim_end - run_start)
+    report["simulation_seconds"] = round(sim_end - sim_start, 3)
+    report["worker_utilisation"] = round(worker_busy_seconds / (threads * (sim_end - sim_start)), 4)
+    report["post_stage_seconds"] = round(sum(stage["seconds"] for stage in post_stages_timing), 3)
+    report["post_stage_overlap_seconds"] = round(
+        sum(
+            max(min(stage["end"], sim_window[1]) - max(stage["start"], sim_window[0]), 0)
+            for stage in post_stages_timing
+        ),
+        3,
+    )
+    report["wall_seconds"] = round(time.time() - run_start, 3)
+
+    if report_name is None:
+        report_name = os.path.join(PATH_TO_GAMES, "run_games_report.json")
+    with open(report_name, "w", encoding="UTF-8") as f:
+        json.dump(report, f, indent=4)
+    print(
+        f"\nFinished {len(gamestates)} games in {report['wall_seconds']} seconds",
+        f"({round(100 * report['worker_utilisation'], 1)}% worker utilisation,",
+        f"{report['post_stage_overlap_seconds']} of {report['post_stage_seconds']} post-simulation seconds overlapped",
+        f"with simulation). Timing report written to {report_name}\n",
+    )
+    if len(failed) > 0:
+        raise RuntimeError(f"Post-simulation stages failed for {list(failed)}:\n" + "\n".join(failed.values()))
+    return report
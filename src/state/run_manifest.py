@@ -0,0 +1,72 @@
+"""Record of completed simulation chunks, used to resume interrupted create_books runs."""
+
+import os
+import json
+from warnings import warn
+from typing import List, Set
+
+from src.write_data.write_data import get_sha_256
+
+MANIFEST_VERSION = 1
+
+
+class RunManifest:
+    """
+    JSON manifest stored within temp_multi_threaded_files.
+    Each bet-mode entry holds the run parameters it was simulated with and the sha256 checksum of every temp file
+    written by a completed chunk. On resume, a chunk is only reused if the parameters match and all checksums agree.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.temp_path = os.path.dirname(path)
+        self.modes = {}
+
+    def load(self) -> None:
+        """Read an existing manifest, an unreadable or outdated manifest is treated as empty."""
+        if not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="UTF-8") as f:
+                data = json.load(f)
+        except json.JSONDecodeError:
+            warn(f"Could not decode {self.path}, all chunks will be simulated.")
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.modes = data["modes"]
+
+    def save(self) -> None:
+        """Atomically replace the manifest, so an interrupted write never leaves a partial file."""
+        temp_name = self.path + ".tmp"
+        with open(temp_name, "w", encoding="UTF-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "modes": self.modes}, f)
+        os.replace(temp_name, self.path)
+
+    def chunk_is_valid(self, checksums: dict) -> bool:
+        """All temp files of a chunk still exist and are unchanged."""
+        for filename, checksum in checksums.items():
+            path = os.path.join(self.temp_path, filename)
+            if not os.path.isfile(path) or get_sha_256(path) != checksum:
+                return False
+        return True
+
+    def start_mode(self, betmode: str, run_params: dict, resume: bool) -> Set[int]:
+        """Register bet-mode run parameters, returning the chunk indices which do not need to be simulated again."""
+        run_params = json.loads(json.dumps(run_params))
+        previous = self.modes.get(betmode)
+        chunks = {}
+        if resume and previous is not None:
+            if previous["params"] == run_params:
+                chunks = {idx: sums for idx, sums in previous["chunks"].items() if self.chunk_is_valid(sums)}
+            else:
+                warn(f"Run parameters for {betmode} changed since the last run, all chunks will be simulated.")
+        self.modes[betmode] = {"params": run_params, "chunks": chunks}
+        self.save()
+        return {int(chunk_index) for chunk_index in chunks}
+
+    def complete_chunk(self, betmode: str, chunk_index: int, filenames: List[str]) -> None:
+        """Record checksums of every file written by a finished chunk."""
+        self.modes[betmode]["chunks"][str(chunk_index)] = {
+            os.path.relpath(filename, self.temp_path): get_sha_256(filename) for filename in filenames
+        }
+        self.save()
@@ -0,0 +1,32 @@
+"""Optional features of a create_books() run."""
+
+from typing import List, NamedTuple, Union
+
+
+class RunOptions(NamedTuple):
+    """Options of create_books() beyond the game, simulation counts and threads, the defaults give a plain run."""
+
+    # Outputs
+    mode: str = "books"  # "stats" writes lookup tables and force records only, no events or books
+    resume: bool = False  # skip chunks recorded in the run manifest by an interrupted run
+    incremental: bool = False  # skip bet-modes unchanged since the last run (library/build_cache.json)
+    shard_index: int = 0  # simulate one of shard_count slices, combined afterwards with merge_shards()
+    shard_count: int = 1
+
+    # Profiling and telemetry
+    profile_headless: bool = False  # write profiles without opening snakeviz
+    profile_top_n: int = 40
+    phase_timing: bool = False  # time each stage of the spin lifecycle
+    slow_sims: int = 0  # record the slow_sims slowest simulations of each bet-mode
+
+    # Rejection caching
+    acceptance_cache: bool = False  # jump straight to the accepted attempt of often rejected simulations
+    acceptance_min_repeats: int = 10
+
+    # Workers (threads > 1)
+    prefork_freeze: bool = False  # freeze reelstrips and gc.freeze() before forking workers
+    cpu_affinity: Union[str, List[int]] = None  # "round_robin" or a list of CPU ids (Linux only)
+    reserve_parent_cpu: bool = False
+    max_workers_per_numa_node: int = None
+    memory_budget_mb: float = None  # pick each bet-mode's batch size to fit the books of all workers
+    book_writers: int = 0  # number of processes compressing and writing books streamed by the workers
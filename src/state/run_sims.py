@@ -1,15 +1,34 @@
+import os
+import gc
+import json
+import glob
 import time
 import math
 import random
-import hashlib
-from multiprocessing import Process, Manager
 import cProfile
 from warnings import warn
 import shutil
-import asyncio
-from typing import Dict
+from typing import Callable, Dict, List, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
 
-from src.write_data.write_data import output_lookup_and_force_files
+from src.write_data.write_data import output_lookup_and_force_files, write_force_options
+from src.state.worker_pool import SimulationPool
+from src.state.prefork import prepare_for_fork, restore_after_fork
+from src.state.memory_budget import calibrate_batch_size
+from src.state.cpu_placement import get_available_cpus, plan_worker_placement, set_cpu_affinity
+from src.state.sim_allocation import SimAllocation
+from src.state.run_manifest import RunManifest
+from src.state.run_options import RunOptions
+from src.state.telemetry import ProgressTracker
+from src.state.profiling import output_betmode_profiles
+from src.state.phase_timers import PHASE_TIMERS
+from src.state.acceptance_cache import AcceptanceCache
+from src.state.criteria_sampler import load_stop_harvests
+from src.state.fingerprint import get_code_fingerprint, get_betmode_fingerprint, get_books_fingerprint
+from src.state.build_cache import BuildCache
+
+MIN_CHUNK_SIZE = 100
+TARGET_NUM_CHUNKS = 1024
 
 
 def create_books(
@@ -20,61 +39,493 @@ def create_books(
     threads: int,
     compress: bool,
     profiling: bool,
+    options: RunOptions = None,
 ):
-    """Main run-function for simulating game outcomes and outputting all files."""
+    """Main run-function for simulating game outcomes and outputting all files, optional features are set by options."""
+    options = options or RunOptions()
     for key, ns in num_sim_args.items():
-        if all([ns > 0, ns > batch_size * batch_size]):
-            assert (
-                ns % (threads * batch_size) == 0
-            ), "mode-sims/(batch * threads) must be divisible with no remainder"
         num_sim_args[key] = int(ns)
 
     if not compress and sum(num_sim_args.values()) > 1e4:
         warn("Generating large number of uncompressed books!")
 
-    if profiling and threads > 1:
-        raise RuntimeError("Multithread profiling not supported, threads must = 1 with profiling enabled")
+    if options.mode not in ("books", "stats"):
+        raise ValueError(f"mode must be 'books' or 'stats', got {options.mode}")
+    if options.memory_budget_mb is not None and options.shard_count > 1:
+        raise ValueError("memory_budget_mb cannot be used with shards, all shards must share the same batch_size.")
+    if not 0 <= options.shard_index < options.shard_count:
+        raise ValueError(f"shard_index must be within [0, {options.shard_count}), got {options.shard_index}")
+    if options.shard_count > 1:
+        gamestate.output_files.temp_path = gamestate.output_files.get_shard_temp_path(
+            options.shard_index, options.shard_count
+        )
+        gamestate.output_files.check_folder_exists(gamestate.output_files.temp_path)
 
     startTime = time.time()
     print("\nCreating books...")
+    build_cache, fingerprints, cached_force_options = None, {}, {}
+    if options.incremental and options.shard_count == 1:
+        build_cache = BuildCache(gamestate.output_files.get_build_cache_name())
+        build_cache.load()
+        fingerprints = get_books_fingerprints(gamestate, config, num_sim_args, compress, options.mode)
+        for betmode, fingerprint in fingerprints.items():
+            if build_cache.is_current(f"books/{betmode}", fingerprint):
+                print("Skipping", betmode, "- fingerprint and outputs are unchanged.")
+                cached_force_options[betmode] = build_cache.get_details(f"books/{betmode}")["force_options"]
+        num_sim_args = {betmode: 0 if betmode in cached_force_options else ns for betmode, ns in num_sim_args.items()}
+    manifest = RunManifest(gamestate.output_files.get_run_manifest_name())
+    if options.resume:
+        manifest.load()
+    progress = ProgressTracker(slow_sims=options.slow_sims)
+    if options.phase_timing:
+        PHASE_TIMERS.install()
+        gamestate.phase_timers = PHASE_TIMERS
+    load_stop_harvests(gamestate, num_sim_args)
+    if options.acceptance_cache:
+        load_acceptance_caches(
+            gamestate, num_sim_args, options.acceptance_min_repeats, options.shard_index, options.shard_count
+        )
+    gamestate.stats_only = options.mode == "stats"
+    gamestate.slow_sims = options.slow_sims
+    pool = None
+    worker_memory = {}
+    placement = None
+    parent_cpus = get_available_cpus()
+    if threads == 1 and (options.reserve_parent_cpu or options.max_workers_per_numa_node is not None):
+        warn("reserve_parent_cpu and max_workers_per_numa_node are ignored with threads=1.")
+    if threads == 1 and options.cpu_affinity is not None:
+        placement = plan_worker_placement(1, options.cpu_affinity)
+        set_cpu_affinity(placement["workers"][0])
+        print("Pinning the simulation process to CPU", placement["workers"][0][0])
+    elif threads > 1 and (
+        options.cpu_affinity is not None or options.reserve_parent_cpu or options.max_workers_per_numa_node is not None
+    ):
+        placement = plan_worker_placement(
+            threads,
+            options.cpu_affinity or "round_robin",
+            options.reserve_parent_cpu,
+            options.max_workers_per_numa_node,
+        )
+        if placement["parent"] is not None:
+            set_cpu_affinity(placement["parent"])
+        print("Pinning workers to CPUs", [cpus[0] for cpus in placement["workers"]])
+    if threads > 1:
+        pool = SimulationPool(
+            gamestate,
+            threads,
+            progress_tracker=progress,
+            profile=profiling,
+            worker_cpus=None if placement is None else placement["workers"],
+            book_writers=0 if options.mode == "stats" else options.book_writers,
+        )
+        if options.prefork_freeze:
+            originals = prepare_for_fork(gamestate)
+            print("Froze", gc.get_freeze_count(), "objects before starting workers.")
+        try:
+            pool.start()
+        finally:
+            if options.prefork_freeze:
+                restore_after_fork(gamestate, originals)
+    else:
+        gamestate.publish_progress = lambda counters: progress.update(0, counters)
+    try:
+        batch_sizes = run_all_betmodes(
+            gamestate,
+            config,
+            num_sim_args,
+            batch_size,
+            threads,
+            compress,
+            profiling,
+            pool,
+            manifest,
+            options.resume,
+            shard=(options.shard_index, options.shard_count),
+            progress=progress,
+            memory_budget_mb=options.memory_budget_mb,
+            cached_force_options=cached_force_options,
+        )
+        if pool is not None:
+            worker_memory = pool.get_worker_memory()
+            report_worker_memory(worker_memory)
+    finally:
+        gamestate.publish_progress = None
+        if pool is not None:
+            pool.shutdown()
+        if options.phase_timing:
+            PHASE_TIMERS.uninstall()
+            gamestate.phase_timers = None
+        gamestate.acceptance_caches = {}
+        gamestate.stop_harvests = {}
+        gamestate.stats_only = False
+        gamestate.slow_sims = 0
+        if placement is not None and (threads == 1 or placement["parent"] is not None):
+            set_cpu_affinity(parent_cpus)
+    if profiling:
+        output_betmode_profiles(
+            gamestate,
+            [betmode for betmode, num_sims in num_sim_args.items() if num_sims > 0],
+            options.profile_headless,
+            options.profile_top_n,
+            options.shard_index,
+            options.shard_count,
+        )
+    progress.write_metrics(
+        gamestate.output_files.get_simulation_metrics_name(options.shard_index, options.shard_count),
+        {
+            "game_id": config.game_id,
+            "threads": threads,
+            "batch_size": batch_size,
+            "memory_budget_mb": options.memory_budget_mb,
+            "batch_sizes": batch_sizes,
+            "compress": compress,
+            "shard_index": options.shard_index,
+            "shard_count": options.shard_count,
+            "book_writers": options.book_writers,
+            "skipped_betmodes": list(cached_force_options),
+            "prefork_freeze": options.prefork_freeze,
+            "placement": placement,
+            "worker_memory": {str(worker_index): memory for worker_index, memory in worker_memory.items()},
+            "elapsed_seconds": round(time.time() - startTime, 3),
+        },
+    )
+    if options.shard_count > 1:
+        shard = f"{options.shard_index} of {options.shard_count}"
+        print("\nFinished shard", shard, "in", time.time() - startTime, "seconds.")
+        print("Temp files kept in", gamestate.output_files.temp_path, "- combine all shards with merge_shards().\n")
+        return
+    shutil.rmtree(gamestate.output_files.temp_path)
+    if build_cache is not None:
+        record_built_betmodes(
+            gamestate, build_cache, {betmode: fingerprints[betmode] for betmode in batch_sizes}, compress, options.mode
+        )
+    print("\nFinished creating books in", time.time() - startTime, "seconds.\n")
+
+
+def get_fixed_sim_count(config: object, betmode_name: str) -> int:
+    """Number of simulations required by the fixed-amount distributions of a bet-mode."""
+    sim_counter = 0
+    for bm in config.bet_modes:
+        if bm.get_name() == betmode_name:
+            for d in bm.get_distributions():
+                if d.get_fixed_amt() is not None:
+                    sim_counter += d.get_fixed_amt()
+    return sim_counter
+
+
+def get_books_fingerprints(gamestate: object, config: object, num_sim_args: dict, compress: bool, mode: str) -> dict:
+    """Build fingerprint of each requested bet-mode, covering its simulation count and criteria assignment."""
+    code_fingerprint = get_code_fingerprint(gamestate)
+    fingerprints = {}
+    for betmode, num_sims in num_sim_args.items():
+        if num_sims > 0:
+            sim_counter = get_fixed_sim_count(config, betmode)
+            nsims = max(num_sims, sim_counter)
+            sim_allocation = assign_sim_criteria(gamestate, nsims, betmode, sim_counter > 0)
+            run_params = {
+                "num_sims": nsims,
+                "compress": compress,
+                "mode": mode,
+                "criteria_counts": sim_allocation.get_criteria_counts(),
+                "shuffle_seed": sim_allocation.shuffle_seed,
+                "criteria_seeds": sim_allocation.criteria_seeds,
+            }
+            fingerprints[betmode] = get_books_fingerprint(gamestate, betmode, run_params, code_fingerprint)
+    return fingerprints
+
+
+def record_built_betmodes(
+    gamestate: object, build_cache: BuildCache, fingerprints: dict, compress: bool, mode: str
+) -> None:
+    """Store the fingerprint, output files and force options of each bet-mode simulated by this run."""
+    with open(os.path.join(gamestate.output_files.force_path, "force.json"), "r", encoding="UTF-8") as f:
+        force_options = json.load(f)
+    for betmode, fingerprint in fingerprints.items():
+        output_files = [
+            gamestate.output_files.get_final_lookup_name(betmode),
+            gamestate.output_files.get_final_segmented_name(betmode),
+            os.path.join(gamestate.output_files.force_path, f"force_record_{betmode}.json"),
+        ]
+        if mode == "books":
+            output_files.append(gamestate.output_files.get_final_book_name(betmode, compress))
+            if gamestate.config.write_event_list:
+                output_files.append(os.path.join(gamestate.output_files.config_path, f"event_config_{betmode}.json"))
+        build_cache.record(f"books/{betmode}", fingerprint, output_files, {"force_options": force_options[betmode]})
+    build_cache.save()
+
+
+def report_worker_memory(worker_memory: dict) -> None:
+    """Print the mean private and shared memory of the simulation workers."""
+    reported = [memory for memory in worker_memory.values() if len(memory) > 0]
+    if len(reported) == 0:
+        return
+    private = sum(memory["private"] for memory in reported) / len(reported)
+    shared = sum(memory["shared"] for memory in reported) / len(reported)
+    print(
+        f"Worker memory: {round(private / 1e6, 1)} MB private, {round(shared / 1e6, 1)} MB shared",
+        f"(mean of {len(reported)} workers)",
+    )
+
+
+def run_all_betmodes(
+    gamestate: object,
+    config: object,
+    num_sim_args: dict,
+    batch_size: int,
+    threads: int,
+    compress: bool,
+    profiling: bool,
+    pool: SimulationPool = None,
+    manifest: RunManifest = None,
+    resume: bool = False,
+    shard: Tuple[int, int] = (0, 1),
+    progress: ProgressTracker = None,
+    memory_budget_mb: float = None,
+    cached_force_options: dict = None,
+) -> Dict[str, int]:
+    """
+    Simulate every requested bet-mode, pooled chunks of all bet-modes are queued as one stream.
+    Finished bet-modes are merged in the background, returns the batch size used for each simulated bet-mode.
+    """
+    betmode_args, batch_sizes = get_betmode_args(
+        gamestate,
+        config,
+        num_sim_args,
+        batch_size,
+        threads,
+        compress,
+        manifest,
+        resume,
+        shard,
+        progress,
+        memory_budget_mb,
+    )
+
+    profiler = cProfile.Profile() if profiling else None
+    merger = ThreadPoolExecutor(max_workers=1)
+    merges = {}
+
+    def submit_merge(*merge_args) -> Future:
+        if not profiling:
+            return merger.submit(merge_betmode_outputs, *merge_args)
+        merge = Future()
+        merge.set_result(merge_betmode_outputs(*merge_args))
+        return merge
+
+    def on_betmode_done(betmode_name: str, sim_chunks: List[Tuple[int, int]]) -> None:
+        nonlocal profiler
+        if shard[1] == 1:
+            merges[betmode_name] = submit_merge(config.game_id, betmode_name, gamestate, sim_chunks, compress)
+        acceptance_cache = gamestate.acceptance_caches.get(betmode_name)
+        if acceptance_cache is not None:
+            acceptance_cache.merge_temp(
+                [gamestate.output_files.get_temp_acceptance_name(betmode_name, idx) for idx in range(len(sim_chunks))]
+            )
+            acceptance_cache.save()
+        stop_harvest = gamestate.stop_harvests.get(betmode_name)
+        if stop_harvest is not None and shard[1] == 1:
+            stop_harvest.merge_temp(
+                [gamestate.output_files.get_temp_harvest_name(betmode_name, idx) for idx in range(len(sim_chunks))]
+            )
+            stop_harvest.save()
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(gamestate.output_files.get_temp_profile_name(betmode_name, "parent"))
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+    if profiler is not None:
+        profiler.enable()
+    try:
+        if pool is None:
+            for run_args in betmode_args:
+                sim_chunks = run_multi_process_sims(threads, gamestate=gamestate, **run_args)
+                on_betmode_done(run_args["betmode"], sim_chunks)
+        else:
+            run_pooled_betmodes(gamestate, pool, betmode_args, on_betmode_done)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        merger.shutdown(wait=True)
     for betmode_name in num_sim_args:
-        sim_counter = 0
-        for bm in config.bet_modes:
-            if bm.get_name() == betmode_name:
-                for d in bm.get_distributions():
-                    if d.get_fixed_amt() is not None:
-                        sim_counter += d.get_fixed_amt()
-        set_sim_amount = False
-        if sim_counter > 0:
-            set_sim_amount = True
+        if betmode_name in merges:
+            write_force_options(gamestate, betmode_name, merges[betmode_name].result())
+        elif cached_force_options and betmode_name in cached_force_options:
+            write_force_options(gamestate, betmode_name, cached_force_options[betmode_name])
+    return batch_sizes
+
 
+def get_betmode_args(
+    gamestate: object,
+    config: object,
+    num_sim_args: dict,
+    batch_size: int,
+    threads: int,
+    compress: bool,
+    manifest: RunManifest = None,
+    resume: bool = False,
+    shard: Tuple[int, int] = (0, 1),
+    progress: ProgressTracker = None,
+    memory_budget_mb: float = None,
+) -> Tuple[List[dict], Dict[str, int]]:
+    """
+    Simulation arguments and batch size of every bet-mode with simulations requested.
+    With a memory budget, each bet-mode's batch size is calibrated (or taken from the resumed run).
+    """
+    betmode_args = []
+    batch_sizes = {}
+    for betmode_name in num_sim_args:
+        sim_counter = get_fixed_sim_count(config, betmode_name)
         if num_sim_args[betmode_name] > 0:
-            gamestate.betmode = betmode_name
             nsims = max(num_sim_args[betmode_name], sim_counter)
-            run_multi_process_sims(
-                threads,
-                batch_size,
-                config.game_id,
-                betmode_name,
-                gamestate,
-                num_sims=nsims,
-                compress=compress,
-                write_event_list=config.write_event_list,
-                profiling=profiling,
-                set_sim_amount=set_sim_amount,
+            batch_sizes[betmode_name] = batch_size
+            sim_chunks = get_sim_chunks(nsims, batch_size)
+            previous = manifest.modes.get(betmode_name) if manifest is not None and resume else None
+            if previous is not None and previous["params"]["sim_chunks"][-1][1] != nsims:
+                previous = None
+            if memory_budget_mb is not None and previous is not None:
+                sim_chunks = [tuple(chunk) for chunk in previous["params"]["sim_chunks"]]
+                batch_sizes[betmode_name] = max(end - start for start, end in sim_chunks)
+            elif memory_budget_mb is not None:
+                batch_sizes[betmode_name] = calibrate_batch_size(
+                    gamestate,
+                    betmode_name,
+                    assign_sim_criteria(gamestate, nsims, betmode_name, sim_counter > 0),
+                    memory_budget_mb,
+                    threads,
+                    batch_size,
+                )
+                sim_chunks = get_sim_chunks(nsims, batch_sizes[betmode_name])
+            betmode_args.append(
+                {
+                    "batching_size": batch_sizes[betmode_name],
+                    "game_id": config.game_id,
+                    "betmode": betmode_name,
+                    "num_sims": nsims,
+                    "compress": compress,
+                    "write_event_list": config.write_event_list and not gamestate.stats_only,
+                    "set_sim_amount": sim_counter > 0,
+                    "sim_chunks": sim_chunks,
+                    "manifest": manifest,
+                    "resume": resume,
+                    "shard": shard,
+                    "progress": progress,
+                }
             )
+    return betmode_args, batch_sizes
+
+
+def merge_betmode_outputs(
+    game_id: str,
+    betmode: str,
+    gamestate: object,
+    sim_chunks: List[Tuple[int, int]],
+    compress: bool,
+) -> dict:
+    """Combine a bet-mode's temp files, returning its force options. Runs on the background merge thread."""
+    return output_lookup_and_force_files(
+        game_id,
+        betmode,
+        gamestate,
+        num_chunks=len(sim_chunks),
+        num_sims=sim_chunks[-1][1],
+        compress=compress,
+        write_books=not gamestate.stats_only,
+        update_force_json=False,
+    )
+
+
+def run_pooled_betmodes(
+    gamestate: object, pool: SimulationPool, betmode_args: List[dict], on_betmode_done: Callable = None
+) -> None:
+    """
+    Queue the chunks of every bet-mode through the worker pool as a single stream.
+    A bet-mode is prepared when its first chunk is queued and finished once its last chunk returns,
+    on_betmode_done(betmode, sim_chunks) is then called in the parent while later bet-modes keep running.
+    """
+    run_pooled_games(pool, [{"gamestate": gamestate, "betmode_args": betmode_args, "on_betmode_done": on_betmode_done}])
+
+
+def run_pooled_games(pool: SimulationPool, game_runs: List[dict]) -> None:
+    """
+    Queue the bet-mode chunks of several games through one worker pool, game after game.
+    Each game run gives its gamestate, betmode_args and optional on_betmode_done(betmode, sim_chunks) callback,
+    the pool must have been started with all of the gamestates.
+    """
+    betmode_runs = {}
 
-            output_lookup_and_force_files(
-                threads,
-                batch_size,
-                config.game_id,
-                betmode_name,
-                gamestate,
-                num_sims=nsims,
-                compress=compress,
+    def finish(game_id: str, betmode: str) -> None:
+        betmode_run = betmode_runs[(game_id, betmode)]
+        gamestate = betmode_run["gamestate"]
+        all_betmode_configs = []
+        for chunk_index in sorted(betmode_run["results"]):
+            all_betmode_configs.extend(betmode_run["results"][chunk_index])
+        print("All chunks finished for", betmode if len(game_runs) == 1 else f"{game_id} {betmode}")
+        gamestate.combine(all_betmode_configs, betmode)
+        finish_betmode_sims(gamestate, betmode, betmode_run["progress"], betmode_run["shard"])
+        if betmode_run["on_betmode_done"] is not None:
+            betmode_run["on_betmode_done"](betmode, betmode_run["sim_chunks"])
+
+    def chunk_tasks():
+        for game_run in game_runs:
+            gamestate = game_run["gamestate"]
+            game_id = gamestate.config.game_id
+            for run_args in game_run["betmode_args"]:
+                betmode = run_args["betmode"]
+                sim_chunks, sim_allocation, pending_chunks, on_chunk_done = start_betmode_sims(gamestate, **run_args)
+                betmode_runs[(game_id, betmode)] = {
+                    "gamestate": gamestate,
+                    "sim_chunks": sim_chunks,
+                    "remaining": len(pending_chunks),
+                    "results": {},
+                    "on_chunk_done": on_chunk_done,
+                    "on_betmode_done": game_run.get("on_betmode_done"),
+                    "progress": run_args["progress"],
+                    "shard": run_args["shard"],
+                }
+                if len(pending_chunks) == 0:
+                    finish(game_id, betmode)
+                for chunk_index, (sim_start, sim_end) in pending_chunks:
+                    yield {
+                        "game_id": game_id,
+                        "betmode": betmode,
+                        "sim_allocation": sim_allocation,
+                        "sim_start": sim_start,
+                        "sim_end": sim_end,
+                        "chunk_index": chunk_index,
+                        "compress": run_args["compress"],
+                        "write_event_list": run_args["write_event_list"],
+                    }
+
+    def on_result(task_args, worker_betmodes):
+        betmode_run = betmode_runs[(task_args["game_id"], task_args["betmode"])]
+        betmode_run["results"][task_args["chunk_index"]] = worker_betmodes
+        if betmode_run["on_chunk_done"] is not None:
+            betmode_run["on_chunk_done"](task_args["chunk_index"])
+        betmode_run["remaining"] -= 1
+        if betmode_run["remaining"] == 0:
+            finish(task_args["game_id"], task_args["betmode"])
+
+    pool.run_tasks(chunk_tasks(), on_result=on_result)
+
+
+def load_acceptance_caches(
+    gamestate: object, num_sim_args: dict, min_repeats: int, shard_index: int = 0, shard_count: int = 1
+) -> None:
+    """Load the acceptance cache of every simulated bet-mode before workers are forked, so all workers share it."""
+    code_fingerprint = get_code_fingerprint(gamestate)
+    for betmode, num_sims in num_sim_args.items():
+        if num_sims > 0:
+            fingerprint = get_betmode_fingerprint(gamestate, betmode, code_fingerprint)
+            if betmode in gamestate.stop_harvests:
+                fingerprint += ":" + gamestate.stop_harvests[betmode].get_digest()
+            cache = AcceptanceCache(
+                gamestate.output_files.get_acceptance_cache_name(betmode, shard_index, shard_count),
+                fingerprint,
+                min_repeats,
             )
-    shutil.rmtree(gamestate.output_files.temp_path)
-    print("\nFinished creating books in", time.time() - startTime, "seconds.\n")
+            cache.load()
+            gamestate.acceptance_caches[betmode] = cache
 
 
 def get_sim_splits(gamestate: object, num_sims: int, betmode_name: str) -> Dict[str, int]:
@@ -85,9 +536,9 @@ def get_sim_splits(gamestate: object, num_sims: int, betmode_name: str) -> Dict[
     reduce_sims = total_sims > num_sims
     listedCriteria = [d._criteria for d in betmode_distributions]
     criteria_weights = [d._quota for d in betmode_distributions]
-    random.seed(0)
+    rng = random.Random(0)
     while sum(num_sims_criteria.values()) != num_sims:
-        c = random.choices(listedCriteria, criteria_weights)[0]
+        c = rng.choices(listedCriteria, criteria_weights)[0]
         if reduce_sims and num_sims_criteria[c] > 1:
             num_sims_criteria[c] -= 1
         elif not reduce_sims:
@@ -96,42 +547,147 @@ def get_sim_splits(gamestate: object, num_sims: int, betmode_name: str) -> Dict[
     return num_sims_criteria
 
 
-def assign_sim_criteria(num_sims_criteria: Dict[str, int], sims: int) -> Dict[int, str]:
-    """Assign criteria randomly to simulations based on quota defined in config."""
-    sim_allocation = [criteria for criteria, count in num_sims_criteria.items() for _ in range(count)]
-    random.shuffle(sim_allocation)
-    return {i: sim_allocation[i] for i in range(min(sims, len(sim_allocation)))}
+def get_fixed_sim_splits(gamestate: object, num_sims: int, betmode_name: str) -> Dict[str, int]:
+    """Populate fixed-amount distributions first, remaining simulations are assigned by quota."""
+    dists = gamestate.get_betmode(betmode_name).get_distributions()
+    num_sims_criteria = {}
+    total_quota = 0.0
+    for d in dists:
+        if d.get_fixed_amt() is not None:
+            num_sims_criteria[str(d.get_criteria())] = d.get_fixed_amt()
+        else:
+            total_quota += d.get_quota()
+
+    remaining_sims = num_sims - sum(num_sims_criteria.values())
+    if remaining_sims > 0:
+        quota_assignment, quota_probs = [], []
+        for d in dists:
+            if d.get_quota() is not None:
+                quota_assignment.append(d.get_criteria())
+                quota_probs.append(d.get_quota())
+                ncriteria = math.floor(max(1, (d.get_quota() / total_quota) * remaining_sims))
+                ncriteria = min(ncriteria, num_sims - sum(num_sims_criteria.values()))
+                num_sims_criteria[d.get_criteria()] = ncriteria
+        rng = random.Random(0)
+        while sum(num_sims_criteria.values()) < num_sims:
+            num_sims_criteria[rng.choices(quota_assignment, quota_probs, k=1)[0]] += 1
+
+    return num_sims_criteria
 
 
-def string_to_int(s: str) -> int:
-    "Convert criteria name to large integer value"
-    h = hashlib.sha256(s.encode()).hexdigest()
-    return int(h[:12], 16)
+def assign_sim_criteria(gamestate: object, num_sims: int, betmode: str, set_sim_amount: bool) -> SimAllocation:
+    """
+    Assign criteria to simulations based on quota (or fixed amounts) defined in config.
+    Only per-criteria counts are stored, the criteria of each simulation is given by a seeded permutation.
+    """
+    if not set_sim_amount:
+        return SimAllocation(get_sim_splits(gamestate, num_sims, betmode))
+    return SimAllocation(get_fixed_sim_splits(gamestate, num_sims, betmode), criteria_seeds=True)
 
 
-async def profile_and_visualize(
-    game_id,
+def run_sim_chunks(
     gamestate,
     all_betmode_configs,
     betmode,
     sim_allocation,
-    threads,
-    num_repeats,
-    sims_per_thread,
-    repeat,
+    sim_chunks,
     compress,
     write_event_list,
-    simulation_seeds,
+    on_chunk_done=None,
 ):
-    """Create flame-graph, automatically opens output on localhost."""
-    output_string = f"games/{game_id}/simulationProfile_{betmode}.prof"
-    cProfile.runctx(
-        "gamestate.run_sims(all_betmode_configs, betmode, sim_allocation, threads, num_repeats, sims_per_thread, 0, repeat, compress, write_event_list, simulation_seeds)",
-        globals(),
-        locals(),
-        output_string,
-    )
-    await asyncio.create_subprocess_exec("snakeviz", output_string)
+    """Run (chunk_index, (sim_start, sim_end)) simulation chunks sequentially within the current process."""
+    for chunk_index, (sim_start, sim_end) in sim_chunks:
+        gamestate.run_sims(
+            betmode_copy_list=all_betmode_configs,
+            betmode=betmode,
+            sim_allocation=sim_allocation,
+            sim_start=sim_start,
+            sim_end=sim_end,
+            chunk_index=chunk_index,
+            compress=compress,
+            write_event_list=write_event_list,
+        )
+        if on_chunk_done is not None:
+            on_chunk_done(chunk_index)
+
+
+def get_chunk_size(num_sims: int, batching_size: int) -> int:
+    """Small work items balance load across workers, batching_size caps the number of books held per worker."""
+    return max(1, min(batching_size, max(MIN_CHUNK_SIZE, math.ceil(num_sims / TARGET_NUM_CHUNKS))))
+
+
+def get_sim_chunks(num_sims: int, batching_size: int) -> List[Tuple[int, int]]:
+    """
+    Split simulation numbers into contiguous [start, end) chunks, independent of the number of threads.
+    Any number of simulations is accepted, the remainder is spread one simulation at a time over the last chunks.
+    """
+    chunk_size = get_chunk_size(num_sims, batching_size)
+    num_chunks = math.ceil(num_sims / chunk_size)
+    base_size, remainder = divmod(num_sims, num_chunks)
+    sim_chunks, start = [], 0
+    for chunk_index in range(num_chunks):
+        end = start + base_size + (chunk_index >= num_chunks - remainder)
+        sim_chunks.append((start, end))
+        start = end
+    return sim_chunks
+
+
+def get_shard_chunks(num_chunks: int, shard_index: int, shard_count: int) -> range:
+    """Contiguous range of chunk indices simulated by one shard, shard sizes differ by at most one chunk."""
+    return range(num_chunks * shard_index // shard_count, num_chunks * (shard_index + 1) // shard_count)
+
+
+def merge_shards(gamestate: object, shard_paths: List[str] = None) -> None:
+    """
+    Combine the temp directories of all shards into final books, lookup tables and force files.
+    Shard directories default to every shard_* folder in temp_multi_threaded_files; each must contain its run manifest.
+    """
+    startTime = time.time()
+    if shard_paths is None:
+        shard_paths = sorted(glob.glob(os.path.join(gamestate.output_files.temp_path, "shard_*")))
+    manifests = []
+    for shard_path in shard_paths:
+        manifest_name = os.path.basename(gamestate.output_files.get_run_manifest_name())
+        manifest = RunManifest(os.path.join(shard_path, manifest_name))
+        manifest.load()
+        if len(manifest.modes) == 0:
+            raise RuntimeError(f"No run manifest found in {shard_path}")
+        manifests.append(manifest)
+
+    betmodes = []
+    for manifest in manifests:
+        betmodes += [betmode for betmode in manifest.modes if betmode not in betmodes]
+
+    for betmode in betmodes:
+        run_params, chunk_paths = None, {}
+        for manifest in manifests:
+            if betmode not in manifest.modes:
+                continue
+            shard_params = dict(manifest.modes[betmode]["params"])
+            shard_params.pop("shard", None)
+            if run_params is None:
+                run_params = shard_params
+            elif shard_params != run_params:
+                raise RuntimeError(f"{manifest.temp_path} simulated {betmode} with different run parameters.")
+            for chunk_index, checksums in manifest.modes[betmode]["chunks"].items():
+                if int(chunk_index) not in chunk_paths and manifest.chunk_is_valid(checksums):
+                    chunk_paths[int(chunk_index)] = manifest.temp_path
+
+        num_chunks = len(run_params["sim_chunks"])
+        missing_chunks = [chunk_index for chunk_index in range(num_chunks) if chunk_index not in chunk_paths]
+        if len(missing_chunks) > 0:
+            raise RuntimeError(f"Cannot merge {betmode}, chunks {missing_chunks} are missing or incomplete.")
+        output_lookup_and_force_files(
+            run_params["game_id"],
+            betmode,
+            gamestate,
+            num_chunks=num_chunks,
+            num_sims=run_params["sim_chunks"][-1][1],
+            compress=run_params["compress"],
+            write_books=not run_params.get("stats_only", False),
+            chunk_paths=[chunk_paths[chunk_index] for chunk_index in range(num_chunks)],
+        )
+    print("\nFinished merging", len(shard_paths), "shards in", time.time() - startTime, "seconds.\n")
 
 
 def run_multi_process_sims(
@@ -143,126 +699,152 @@ def run_multi_process_sims(
     num_sims: int = 1000000,
     compress: bool = True,
     write_event_list: bool = False,
-    profiling: bool = False,
     set_sim_amount=False,
+    pool: SimulationPool = None,
+    sim_chunks: List[Tuple[int, int]] = None,
+    manifest: RunManifest = None,
+    resume: bool = False,
+    shard: Tuple[int, int] = (0, 1),
+    progress: ProgressTracker = None,
 ):
-    """Setup multiprocessing manager for running all game-mode simulations."""
-    print("\nCreating books for", game_id, "in", betmode)
-    num_repeats = max(int(round(num_sims / threads / batching_size, 0)), 1)
-    sims_per_thread = int(num_sims / threads / num_repeats)
-    if not set_sim_amount:
-        num_sims_criteria = get_sim_splits(gamestate, num_sims, betmode)
-        sim_criteria = assign_sim_criteria(num_sims_criteria, num_sims)
-        simulation_seeds = [i for i in range(len(sim_criteria))]
-        criteria_assignment = list(sim_criteria.values())
+    """Hand out small simulation chunks from a shared queue, idle workers pick up the next available chunk."""
+    sim_chunks, sim_allocation, pending_chunks, on_chunk_done = start_betmode_sims(
+        gamestate,
+        batching_size,
+        game_id,
+        betmode,
+        num_sims=num_sims,
+        compress=compress,
+        write_event_list=write_event_list,
+        set_sim_amount=set_sim_amount,
+        sim_chunks=sim_chunks,
+        manifest=manifest,
+        resume=resume,
+        shard=shard,
+        progress=progress,
+    )
+    all_betmode_configs = []
+    if pool is None:
+        run_sim_chunks(
+            gamestate,
+            all_betmode_configs,
+            betmode,
+            sim_allocation,
+            pending_chunks,
+            compress,
+            write_event_list,
+            on_chunk_done,
+        )
     else:
-        for bm in gamestate.config.bet_modes:
-            if bm.get_name() == betmode:
-                dists = bm.get_distributions()
-                criteria_assignment, simulation_seeds = [], []
-                total_quota = 0.0
-                # populate fixed amount first
-                for d in dists:
-                    dist_criteria = d.get_criteria()
-                    if d.get_fixed_amt() is not None:
-                        criteria_assignment.extend([str(dist_criteria) for _ in range(d.get_fixed_amt())])
-                    else:
-                        total_quota += d.get_quota()
-                # populate remaining with quota
-                if len(criteria_assignment) < num_sims:
-                    quota_assignment = []
-                    quota_probs = []
-                    for d in dists:
-                        dist_criteria = d.get_criteria()
-                        if d.get_quota() is not None:
-                            quota_assignment.append(dist_criteria)
-                            quota_probs.append(d.get_quota())
-                            ncriteria = math.floor(
-                                max(1, (d.get_quota() / total_quota) * (num_sims - len(criteria_assignment)))
-                            )
-                            counter = 0
-                            while (len(criteria_assignment) < num_sims) and (counter < ncriteria):
-                                criteria_assignment.append(dist_criteria)
-                                counter += 1
-                    while len(criteria_assignment) < num_sims:
-                        criteria_assignment.append(random.choices(quota_assignment, quota_probs, k=1)[0])
-
-                    random.shuffle(criteria_assignment)
-                break
-
-        unique_criteria = set(criteria_assignment)
-        criteria_offset = {}
-        criteria_counter = {}
-        for c in unique_criteria:
-            criteria_offset[c] = string_to_int(c)
-            criteria_counter[c] = 0
-        simulation_seeds = []
-        for c in criteria_assignment:
-            offset_val = criteria_offset[c] + criteria_counter[c]
-            criteria_counter[c] += 1
-            simulation_seeds.append(offset_val)
-
-    for repeat in range(num_repeats):
-        print("Batch", repeat + 1, "of", num_repeats)
-        processes = []
-        manager = Manager()
-        all_betmode_configs = manager.list()
-        if profiling:
-            asyncio.run(
-                profile_and_visualize(
-                    game_id=game_id,
-                    gamestate=gamestate,
-                    all_betmode_configs=all_betmode_configs,
-                    betmode=betmode,
-                    sim_allocation=criteria_assignment,
-                    threads=threads,
-                    num_repeats=num_repeats,
-                    sims_per_thread=sims_per_thread,
-                    repeat=repeat,
-                    compress=compress,
-                    write_event_list=write_event_list,
-                    simulation_seeds=simulation_seeds,
-                )
+        chunk_tasks = (
+            {
+                "game_id": game_id,
+                "betmode": betmode,
+                "sim_allocation": sim_allocation,
+                "sim_start": sim_start,
+                "sim_end": sim_end,
+                "chunk_index": chunk_index,
+                "compress": compress,
+                "write_event_list": write_event_list,
+            }
+            for chunk_index, (sim_start, sim_end) in pending_chunks
+        )
+        on_result = None
+        if on_chunk_done is not None:
+
+            def on_result(run_args, _):
+                on_chunk_done(run_args["chunk_index"])
+
+        for worker_betmodes in pool.run_tasks(chunk_tasks, on_result=on_result):
+            all_betmode_configs.extend(worker_betmodes)
+        print("All chunks finished.")
+        gamestate.combine(all_betmode_configs, betmode)
+    finish_betmode_sims(gamestate, betmode, progress, shard)
+
+    return sim_chunks
+
+
+def start_betmode_sims(
+    gamestate: object,
+    batching_size: int,
+    game_id: str,
+    betmode: str,
+    num_sims: int = 1000000,
+    compress: bool = True,
+    write_event_list: bool = False,
+    set_sim_amount=False,
+    sim_chunks: List[Tuple[int, int]] = None,
+    manifest: RunManifest = None,
+    resume: bool = False,
+    shard: Tuple[int, int] = (0, 1),
+    progress: ProgressTracker = None,
+) -> tuple:
+    """
+    Assign criteria, register the bet-mode in the run manifest and progress tracker and list this process's chunks.
+    Returns (sim_chunks, sim_allocation, pending_chunks, on_chunk_done).
+    """
+    print("\nCreating books for", game_id, "in", betmode)
+    gamestate.betmode = betmode
+    if sim_chunks is None:
+        sim_chunks = get_sim_chunks(num_sims, batching_size)
+    sim_allocation = assign_sim_criteria(gamestate, num_sims, betmode, set_sim_amount)
+
+    completed_chunks = set()
+    on_chunk_done = None
+    if manifest is not None:
+        run_params = {
+            "game_id": game_id,
+            "sim_chunks": sim_chunks,
+            "compress": compress,
+            "write_event_list": write_event_list,
+            "criteria_counts": sim_allocation.get_criteria_counts(),
+            "shuffle_seed": sim_allocation.shuffle_seed,
+            "criteria_seeds": sim_allocation.criteria_seeds,
+            "stats_only": gamestate.stats_only,
+            "shard": list(shard),
+        }
+        completed_chunks = manifest.start_mode(betmode, run_params, resume)
+
+        def on_chunk_done(chunk_index):
+            manifest.complete_chunk(
+                betmode,
+                chunk_index,
+                gamestate.output_files.get_temp_chunk_names(
+                    betmode,
+                    chunk_index,
+                    compress,
+                    write_event_list,
+                    write_books=not gamestate.stats_only,
+                ),
             )
-        elif threads == 1:
-            gamestate.run_sims(
-                betmode_copy_list=all_betmode_configs,
-                betmode=betmode,
-                sim_to_criteria=criteria_assignment,
-                total_threads=threads,
-                total_repeats=num_repeats,
-                num_sims=sims_per_thread,
-                thread_index=0,
-                repeat_count=repeat,
-                compress=compress,
-                write_event_list=write_event_list,
-                simulation_seeds=simulation_seeds,
+
+    if len(completed_chunks) > 0:
+        print("Resuming with", len(completed_chunks), "of", len(sim_chunks), "chunks already complete.")
+    shard_chunks = get_shard_chunks(len(sim_chunks), *shard)
+    pending_chunks = [(idx, sim_chunks[idx]) for idx in shard_chunks if idx not in completed_chunks]
+    if shard[1] > 1:
+        print("Shard", shard[0], "of", shard[1], "owns chunks", shard_chunks.start, "to", shard_chunks.stop - 1)
+    print("Running", len(pending_chunks), "chunks of up to", sim_chunks[0][1] - sim_chunks[0][0], "simulations.")
+    if progress is not None:
+        progress.start_mode(betmode, num_sims, sim_allocation.get_criteria_counts())
+        progress.skip_sims(num_sims - sum(end - start for _, (start, end) in pending_chunks))
+    return sim_chunks, sim_allocation, pending_chunks, on_chunk_done
+
+
+def finish_betmode_sims(
+    gamestate: object, betmode: str, progress: ProgressTracker = None, shard: Tuple[int, int] = (0, 1)
+) -> None:
+    """Report bet-mode progress, rejection and slow simulation statistics, then finalize its force keys."""
+    if progress is not None:
+        progress.finish_mode(betmode)
+        progress.render(betmode)
+        progress.render_phases(betmode)
+        progress.write_rejection_report(betmode, gamestate.output_files.get_rejection_stats_name(betmode, *shard))
+        if progress.slow_sims > 0:
+            stop_harvest = gamestate.stop_harvests.get(betmode)
+            progress.write_slow_sims_report(
+                betmode,
+                gamestate.output_files.get_slow_sims_name(betmode, *shard),
+                None if stop_harvest is None else stop_harvest.loaded_sizes,
             )
-        else:
-            for thread in range(threads):
-                process = Process(
-                    target=gamestate.run_sims,
-                    args=(
-                        all_betmode_configs,
-                        betmode,
-                        criteria_assignment,
-                        threads,
-                        num_repeats,
-                        sims_per_thread,
-                        thread,
-                        repeat,
-                        compress,
-                        write_event_list,
-                        simulation_seeds,
-                    ),
-                )
-                print("Started thread", thread)
-                process.start()
-                processes += [process]
-            print("All threads are online.")
-            for process in processes:
-                process.join()
-            print("Finished joining threads.")
-            gamestate.combine(all_betmode_configs, betmode)
-            gamestate.get_betmode(betmode).lock_force_keys()
-            manager.shutdown()
+    gamestate.get_betmode(betmode).lock_force_keys()
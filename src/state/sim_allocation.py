@@ -0,0 +1,134 @@
+"""Lazy criteria and seed assignment for simulation numbers."""
+
+import hashlib
+from bisect import bisect_right
+from typing import Dict
+
+MASK_64 = (1 << 64) - 1
+
+
+def string_to_int(s: str) -> int:
+    "Convert criteria name to large integer value"
+    h = hashlib.sha256(s.encode()).hexdigest()
+    return int(h[:12], 16)
+
+
+def mix_64(x: int) -> int:
+    """SplitMix64 finaliser, used as the Feistel round function."""
+    x = (x + 0x9E3779B97F4A7C15) & MASK_64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return x ^ (x >> 31)
+
+
+class FeistelPermutation:
+    """
+    Deterministic bijection of [0, size) computed in O(1) per index.
+    A balanced Feistel network permutes the smallest even-bit domain >= size, values outside
+    of [0, size) are cycle-walked back into range (on average fewer than 4 steps).
+    """
+
+    rounds = 4
+
+    def __init__(self, size: int, seed: int = 0):
+        assert size > 0, "permutation size must be positive"
+        self.size = size
+        self.seed = seed
+        self.half_bits = max(1, ((size - 1).bit_length() + 1) // 2)
+        self.half_mask = (1 << self.half_bits) - 1
+        self.round_keys = [mix_64(seed * self.rounds + r + 1) for r in range(self.rounds)]
+
+    def encrypt(self, value: int) -> int:
+        """Single pass through the Feistel network."""
+        left, right = value >> self.half_bits, value & self.half_mask
+        for key in self.round_keys:
+            left, right = right, left ^ (mix_64(right ^ key) & self.half_mask)
+        return (left << self.half_bits) | right
+
+    def decrypt(self, value: int) -> int:
+        """Inverse of encrypt(), running the rounds backwards."""
+        left, right = value >> self.half_bits, value & self.half_mask
+        for key in reversed(self.round_keys):
+            left, right = right ^ (mix_64(left ^ key) & self.half_mask), left
+        return (left << self.half_bits) | right
+
+    def __getitem__(self, index: int) -> int:
+        if not 0 <= index < self.size:
+            raise IndexError(f"index {index} outside of permutation range [0, {self.size})")
+        value = self.encrypt(index)
+        while value >= self.size:
+            value = self.encrypt(value)
+        return value
+
+    def index(self, value: int) -> int:
+        """Inverse permutation, the index mapped to value (walking the cycle backwards)."""
+        if not 0 <= value < self.size:
+            raise IndexError(f"value {value} outside of permutation range [0, {self.size})")
+        index = self.decrypt(value)
+        while index >= self.size:
+            index = self.decrypt(index)
+        return index
+
+    def __len__(self):
+        return self.size
+
+
+class SimAllocation:
+    """
+    Stores only the number of simulations per criteria and a shuffle seed.
+    Simulations are laid out in contiguous criteria blocks, a seeded permutation maps each
+    simulation number to a position within these blocks. The criteria (and optional seed offset)
+    for any simulation number is therefore computed on demand, workers only require their range.
+    """
+
+    def __init__(self, criteria_counts: Dict[str, int], shuffle_seed: int = 0, criteria_seeds: bool = False):
+        self.criteria_table = [c for c, count in criteria_counts.items() if count > 0]
+        self.criteria_counts = [criteria_counts[c] for c in self.criteria_table]
+        self.num_sims = sum(self.criteria_counts)
+        self.shuffle_seed = shuffle_seed
+        self.criteria_seeds = criteria_seeds
+        self.block_starts = []
+        block_start = 0
+        for count in self.criteria_counts:
+            self.block_starts.append(block_start)
+            block_start += count
+        self.permutation = FeistelPermutation(self.num_sims, shuffle_seed)
+        self.seed_offsets = [string_to_int(c) for c in self.criteria_table] if criteria_seeds else None
+        self.last_located = (None, None)
+
+    def locate(self, sim: int) -> tuple:
+        """Return (criteria code, rank within criteria) of a simulation number."""
+        if self.last_located[0] == sim:
+            return self.last_located[1]
+        position = self.permutation[sim]
+        code = bisect_right(self.block_starts, position) - 1
+        self.last_located = (sim, (code, position - self.block_starts[code]))
+        return self.last_located[1]
+
+    def get_criteria(self, sim: int) -> str:
+        """Return criteria assigned to a simulation number."""
+        return self.criteria_table[self.locate(sim)[0]]
+
+    def get_seed(self, sim: int) -> int:
+        """
+        Return rng seed assigned to a simulation number.
+        Fixed-amount allocations offset the seed by criteria, so seeds are unique within each criteria.
+        """
+        if not self.criteria_seeds:
+            return sim
+        code, rank = self.locate(sim)
+        return self.seed_offsets[code] + rank
+
+    def get_sim(self, criteria: str, rank: int) -> int:
+        """Return the simulation number at a rank within a criteria's block, the inverse of locate()."""
+        code = self.criteria_table.index(criteria)
+        if not 0 <= rank < self.criteria_counts[code]:
+            raise IndexError(f"rank {rank} outside of criteria {criteria} with {self.criteria_counts[code]} sims")
+        return self.permutation.index(self.block_starts[code] + rank)
+
+    def get_criteria_counts(self) -> Dict[str, int]:
+        """Return number of simulations assigned to each criteria."""
+        return dict(zip(self.criteria_table, self.criteria_counts))
+
+    def __len__(self):
+        return self.num_sims
@@ -0,0 +1,240 @@
+"""Projected simulation time per criteria, measured with a short pilot run, and precision-based criteria sizing."""
+
+import os
+import gc
+import json
+import math
+import time
+from typing import Dict, List
+
+from src.wins.win_manager import WinManager
+from src.state.criteria_sampler import get_criteria_samplers, load_stop_harvests
+from src.state.run_sims import get_fixed_sim_count, assign_sim_criteria
+
+PILOT_SIMS = 20
+MAX_PILOT_SECONDS = 30.0
+
+
+def get_criteria_pilot_sims(sim_allocation: object, pilot_sims: int) -> Dict[str, List[int]]:
+    """
+    The simulation numbers of the first pilot_sims ranks within each criteria block, in simulation order. These are
+    part of the planned run and are found through the inverse permutation, independent of the number of simulations.
+    """
+    return {
+        criteria: sorted(sim_allocation.get_sim(criteria, rank) for rank in range(min(pilot_sims, count)))
+        for criteria, count in sim_allocation.get_criteria_counts().items()
+    }
+
+
+def get_criteria_cost(seconds: List[float], attempts: List[int], payouts: List[float]) -> dict:
+    """Mean cost and payout statistics of the pilot books of one criteria."""
+    num_books = len(seconds)
+    mean_payout = sum(payouts) / num_books
+    payout_std = 0.0
+    if num_books > 1:
+        payout_std = math.sqrt(sum((payout - mean_payout) ** 2 for payout in payouts) / (num_books - 1))
+    return {
+        "pilot_sims": num_books,
+        "seconds_per_book": sum(seconds) / num_books,
+        "max_seconds": max(seconds),
+        "attempts_per_book": sum(attempts) / num_books,
+        "mean_payout": mean_payout,
+        "payout_std": payout_std,
+    }
+
+
+def measure_criteria_costs(
+    gamestate: object,
+    betmode: str,
+    sim_allocation: object,
+    pilot_sims: int = PILOT_SIMS,
+    max_seconds: float = MAX_PILOT_SECONDS,
+) -> Dict[str, dict]:
+    """Wall time, attempts and payout statistics per accepted book from a pilot run of every criteria."""
+    gamestate.win_manager = WinManager(
+        gamestate.config.basegame_type, gamestate.config.freegame_type, gamestate.get_betmode(betmode).get_wincap()
+    )
+    gamestate.book_summaries = {}
+    gamestate.recorded_events = {}
+    gamestate.betmode = betmode
+    gamestate.num_sims = len(sim_allocation)
+    gamestate.stop_harvest = gamestate.stop_harvests.get(betmode)
+    criteria_samplers = get_criteria_samplers(gamestate.get_betmode(betmode))
+    costs = {}
+    gc.collect()
+    try:
+        for criteria, sims in get_criteria_pilot_sims(sim_allocation, pilot_sims).items():
+            gamestate.criteria = criteria
+            gamestate.criteria_sampler = criteria_samplers.get(criteria)
+            seconds, attempts, payouts = [], [], []
+            for sim in sims:
+                start = time.perf_counter()
+                gamestate.run_spin(sim, sim_allocation.get_seed(sim))
+                seconds.append(time.perf_counter() - start)
+                attempts.append(gamestate.repeat_count)
+                payouts.append(gamestate.book_summaries[sim + 1].payout_multiplier / 100)
+                if sum(seconds) >= max_seconds:
+                    break
+            costs[criteria] = get_criteria_cost(seconds, attempts, payouts)
+    finally:
+        gamestate.book_summaries = {}
+        gamestate.finished_book = None
+        gamestate.recorded_events = {}
+        gamestate.criteria_sampler = None
+        gamestate.stop_harvest = None
+        if gamestate.phase_timers is not None:
+            gamestate.phase_timers.collect()
+    return costs
+
+
+def get_relative_precision(cost: dict, num_books: int) -> float:
+    """Relative standard error of a criteria's mean payout over num_books books, None for a zero mean payout."""
+    if cost["mean_payout"] <= 0:
+        return None
+    return cost["payout_std"] / cost["mean_payout"] / math.sqrt(max(num_books, 1))
+
+
+def get_required_books(cost: dict, target_precision: float) -> int:
+    """Books needed for the relative standard error of the criteria's mean payout to reach target_precision."""
+    if cost["mean_payout"] <= 0 or cost["payout_std"] == 0:
+        return 1
+    return math.ceil((cost["payout_std"] / cost["mean_payout"] / target_precision) ** 2)
+
+
+def plan_simulations(
+    gamestate: object,
+    num_sim_args: dict,
+    threads: int,
+    pilot_sims: int = PILOT_SIMS,
+    max_pilot_seconds: float = MAX_PILOT_SECONDS,
+    target_precision: float = None,
+    time_budget_seconds: float = None,
+    min_criteria_sims: int = 1,
+    report_name: str = None,
+) -> dict:
+    """
+    Project the simulation time of num_sim_args from a pilot run, suggesting the books each criteria needs for
+    target_precision within time_budget_seconds. The plan is written to report_name and returned.
+    """
+    load_stop_harvests(gamestate, num_sim_args)
+    plan = {
+        "threads": threads,
+        "pilot_sims": pilot_sims,
+        "target_precision": target_precision,
+        "time_budget_seconds": time_budget_seconds,
+        "min_criteria_sims": min_criteria_sims,
+        "betmodes": {},
+    }
+    try:
+        for betmode, num_sims in num_sim_args.items():
+            if int(num_sims) <= 0:
+                continue
+            sim_counter = get_fixed_sim_count(gamestate.config, betmode)
+            nsims = max(int(num_sims), sim_counter)
+            sim_allocation = assign_sim_criteria(gamestate, nsims, betmode, sim_counter > 0)
+            start = time.perf_counter()
+            costs = measure_criteria_costs(gamestate, betmode, sim_allocation, pilot_sims, max_pilot_seconds)
+            criteria_plans = {}
+            for criteria, count in sim_allocation.get_criteria_counts().items():
+                cost = costs[criteria]
+                criteria_plans[criteria] = {
+                    "sims": count,
+                    **{key: round(value, 6) for key, value in cost.items()},
+                    "projected_seconds": round(count * cost["seconds_per_book"] / threads, 3),
+                    "precision": get_relative_precision(cost, count),
+                }
+                if target_precision is not None:
+                    criteria_plans[criteria]["required_sims"] = max(
+                        get_required_books(cost, target_precision), min_criteria_sims
+                    )
+            projected_seconds = sum(criteria["projected_seconds"] for criteria in criteria_plans.values())
+            for criteria in criteria_plans.values():
+                criteria["time_share"] = round(criteria["projected_seconds"] / max(projected_seconds, 1e-9), 4)
+            plan["betmodes"][betmode] = {
+                "num_sims": nsims,
+                "pilot_seconds": round(time.perf_counter() - start, 3),
+                "projected_seconds": round(projected_seconds, 3),
+                "criteria": dict(
+                    sorted(criteria_plans.items(), key=lambda item: item[1]["projected_seconds"], reverse=True)
+                ),
+            }
+    finally:
+        gamestate.stop_harvests = {}
+    plan["projected_seconds"] = round(sum(mode["projected_seconds"] for mode in plan["betmodes"].values()), 3)
+    if target_precision is not None:
+        add_suggestions(plan)
+    elif time_budget_seconds is not None:
+        scale = time_budget_seconds / max(plan["projected_seconds"], 1e-9)
+        for mode in plan["betmodes"].values():
+            mode["budget_num_sims"] = max(math.floor(mode["num_sims"] * scale), 1)
+
+    if report_name is None:
+        report_name = gamestate.output_files.get_simulation_plan_name()
+    os.makedirs(os.path.dirname(report_name), exist_ok=True)
+    with open(report_name, "w", encoding="UTF-8") as f:
+        json.dump(plan, f, indent=4)
+    print_plan(plan)
+    print("Simulation plan written to", report_name)
+    return plan
+
+
+def add_suggestions(plan: dict) -> None:
+    """Suggested books per criteria for the target precision, scaled down uniformly to fit the time budget."""
+    required_seconds = sum(
+        criteria["required_sims"] * criteria["seconds_per_book"] / plan["threads"]
+        for mode in plan["betmodes"].values()
+        for criteria in mode["criteria"].values()
+    )
+    scale = 1.0
+    if plan["time_budget_seconds"] is not None and required_seconds > plan["time_budget_seconds"]:
+        scale = plan["time_budget_seconds"] / required_seconds
+    plan["required_seconds"] = round(required_seconds, 3)
+    plan["suggestion_scale"] = round(scale, 6)
+    suggested_seconds = 0.0
+    for mode in plan["betmodes"].values():
+        suggested = {
+            criteria: max(math.floor(details["required_sims"] * scale), plan["min_criteria_sims"], 1)
+            for criteria, details in mode["criteria"].items()
+        }
+        total = sum(suggested.values())
+        for criteria, details in mode["criteria"].items():
+            details["suggested_fixed_amt"] = suggested[criteria]
+            details["suggested_quota"] = round(suggested[criteria] / total, 6)
+            details["suggested_precision"] = get_relative_precision(details, suggested[criteria])
+            suggested_seconds += suggested[criteria] * details["seconds_per_book"] / plan["threads"]
+        mode["suggested_num_sims"] = total
+    plan["suggested_seconds"] = round(suggested_seconds, 3)
+
+
+def format_seconds(seconds: float) -> str:
+    hours, remainder = divmod(int(round(seconds)), 3600)
+    return f"{hours:02d}:{remainder // 60:02d}:{remainder % 60:02d}"
+
+
+def print_plan(plan: dict) -> None:
+    """Table of the projected time of every criteria, most expensive first."""
+    for betmode, mode in plan["betmodes"].items():
+        print(
+            f"\n{betmode}: {mode['num_sims']} sims, projected {format_seconds(mode['projected_seconds'])}",
+            f"on {plan['threads']} threads",
+        )
+        header = f"{'criteria':>12} {'sims':>10} {'ms/book':>10} {'attempts':>9} {'projected':>10} {'share':>7}"
+        if plan["target_precision"] is not None:
+            header += f" {'required':>9} {'suggested':>10}"
+        print(header)
+        for criteria, details in mode["criteria"].items():
+            row = (
+                f"{criteria:>12} {details['sims']:>10} {details['seconds_per_book'] * 1e3:>10.3f} "
+                f"{details['attempts_per_book']:>9.1f} {format_seconds(details['projected_seconds']):>10} "
+                f"{details['time_share'] * 100:>6.1f}%"
+            )
+            if plan["target_precision"] is not None:
+                row += f" {details['required_sims']:>9} {details['suggested_fixed_amt']:>10}"
+            print(row)
+    print(f"\nProjected total: {format_seconds(plan['projected_seconds'])}")
+    if "suggested_seconds" in plan:
+        print(
+            f"Suggested criteria sizes for {plan['target_precision']} relative precision:",
+            f"{format_seconds(plan['suggested_seconds'])}",
+            "" if plan["suggestion_scale"] == 1 else f"(scaled by {plan['suggestion_scale']} to fit the time budget)",
+        )
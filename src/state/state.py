@@ -2,18 +2,23 @@ from copy import copy, deepcopy
 from abc import ABC, abstractmethod
 from warnings import warn
 import random
+import time
 
 # from src.config.config import BetMode
 from src.wins.win_manager import WinManager
 from src.calculations.symbol import SymbolStorage
 from src.config.output_filenames import OutputFiles
 from src.state.books import Book
+from src.state.book_writer import LocalBookStream
+from src.state.telemetry import ProgressCounters
+from src.state.acceptance_cache import decode_rng_state
+from src.state.criteria_sampler import get_criteria_samplers
 from src.write_data.write_data import (
     print_recorded_wins,
     make_lookup_tables,
-    write_json,
     make_lookup_pay_split,
-    write_library_events,
+    get_library_events,
+    write_temp_library_events,
 )
 
 
@@ -24,10 +29,25 @@ class GeneralGameState(ABC):
         self.config = config
         self.output_files = OutputFiles(self.config)
         self.win_manager = WinManager(self.config.basegame_type, self.config.freegame_type, config.wincap)
-        self.library = {}
+        self.book_summaries = {}
+        self.finished_book = None
+        self.library_events = {}
         self.recorded_events = {}
         self.special_symbol_functions = {}
         self.temp_wins = []
+        self.publish_progress = None
+        self.book_stream = None
+        self.phase_timers = None
+        self.stats_only = False
+        self.slow_sims = 0
+        self.acceptance_caches = {}
+        self.acceptance_cache = None
+        self.replayed_attempt = None
+        self.attempt_rng_state = None
+        self.stop_harvests = {}
+        self.stop_harvest = None
+        self.criteria_sampler = None
+        self.sampled_boards = {}
         self.create_symbol_map()
         self.assign_special_sym_function()
         self.sim = 0
@@ -35,6 +55,7 @@ class GeneralGameState(ABC):
         self.book = Book(self.sim, self.criteria)
         self.repeat = True
         self.repeat_count = 0
+        self.first_attempt_start = self.attempt_start = 0.0
         self.win_data = {
             "totalWin": 0,
             "wins": [],
@@ -62,13 +83,24 @@ class GeneralGameState(ABC):
         warn("No special symbol functions are defined")
 
     def reset_book(self) -> None:
-        """Reset global simulation variables."""
+        """
+        Reset global simulation variables.
+        Any state carried from one attempt to the next must be reset here, cached attempts are replayed from this point.
+        """
+        if self.replayed_attempt is not None and self.repeat_count == 0:
+            self.repeat_count = self.replayed_attempt[0]
+            random.setstate(decode_rng_state(self.replayed_attempt[1]))
+        elif self.acceptance_cache is not None and self.repeat_count >= self.acceptance_cache.min_repeats:
+            self.attempt_rng_state = (self.repeat_count, random.getstate())
+        self.attempt_start = time.perf_counter()
+        if self.repeat_count == 0:
+            self.first_attempt_start = self.attempt_start
         self.temp_wins = []
         self.board = [[[] for _ in range(self.config.num_rows[x])] for x in range(self.config.num_reels)]
         self.top_symbols = None
         self.bottom_symbols = None
         self.book_id = self.sim
-        self.book = Book(self.book_id, self.criteria)
+        self.book = Book(self.book_id, self.criteria, record_events=not self.stats_only)
         self.win_data = {
             "totalWin": 0,
             "wins": [],
@@ -84,15 +116,18 @@ class GeneralGameState(ABC):
         self.gametype = self.config.basegame_type
         self.repeat = False
         self.anticipation = [0] * self.config.num_reels
+        self.sampled_boards = {}
 
     def reset_seed(self, sim: int = 0, seed_override=None) -> None:
         """Reset rng seed to simulation number for reproducibility."""
-        if seed_override is not None:
-            random.seed(seed_override + 1)
-        else:
-            random.seed(sim + 1)
+        self.rng_seed = seed_override + 1 if seed_override is not None else sim + 1
+        random.seed(self.rng_seed)
         self.sim = sim
         self.repeat_count = 0
+        self.attempt_rng_state = None
+        self.replayed_attempt = None
+        if self.acceptance_cache is not None:
+            self.replayed_attempt = self.acceptance_cache.lookup(self.criteria, self.rng_seed)
 
     def reset_fs_spin(self) -> None:
         """Use if using repeat during freespin games."""
@@ -167,7 +202,10 @@ class GeneralGameState(ABC):
                     self.get_betmode(betmode_name).add_force_key(key)  # type:ignore
 
     def imprint_wins(self) -> None:
-        """Record all events to library if criteria conditions are satisfied."""
+        """
+        Record the finished book if criteria conditions are satisfied.
+        Only its summary is kept for the lookup tables, run_sims streams the book itself to the chunk's book file.
+        """
         for temp_win_index in range(int(len(self.temp_wins) / 2)):
             description = tuple(sorted(self.temp_wins[2 * temp_win_index].items()))
             book_id = self.temp_wins[2 * temp_win_index + 1]
@@ -183,7 +221,8 @@ class GeneralGameState(ABC):
                     "bookIds": [book_id],
                 }
         self.temp_wins = []
-        self.library[self.sim + 1] = copy(self.book.to_json())
+        self.finished_book = copy(self.book.to_json())
+        self.book_summaries[self.sim + 1] = self.book.to_summary()
         self.win_manager.update_end_round_wins()
 
     def update_final_win(self) -> None:
@@ -223,6 +262,24 @@ class GeneralGameState(ABC):
         self.repeat_count += 1
         self.check_current_repeat_count()
 
+    def update_acceptance_cache(self) -> int:
+        """
+        Record the accepted attempt of the finished simulation, or verify a replayed attempt matches the cache.
+        Returns the number of rejected attempts skipped by replaying.
+        """
+        payout = self.book_summaries[self.sim + 1].payout_multiplier
+        if self.replayed_attempt is not None:
+            rejected_attempts, _, cached_payout = self.replayed_attempt
+            if self.repeat_count != rejected_attempts + 1 or payout != cached_payout:
+                raise RuntimeError(
+                    f"Replaying simulation {self.sim} ({self.criteria}) from the acceptance cache did not reproduce the "
+                    f"cached book. Some game state is not reset in reset_book(), delete {self.acceptance_cache.filename}."
+                )
+            return rejected_attempts
+        if self.attempt_rng_state is not None and self.attempt_rng_state[0] == self.repeat_count - 1:
+            self.acceptance_cache.record(self.criteria, self.rng_seed, *self.attempt_rng_state, payout)
+        return 0
+
     @abstractmethod
     def run_spin(self, sim, simulation_seed):
         """run_spin should be defined in gamestate."""
@@ -237,17 +294,14 @@ class GeneralGameState(ABC):
         self,
         betmode_copy_list,
         betmode,
-        sim_to_criteria,
-        total_threads,
-        total_repeats,
-        num_sims,
-        thread_index,
-        repeat_count,
+        sim_allocation,
+        sim_start,
+        sim_end,
+        chunk_index,
         compress=True,
         write_event_list=True,
-        simulation_seeds=[],
     ) -> None:
-        """Assigns criteria and runs individual simulations. Results are stored in temporary file to be combined when all threads are finished."""
+        """Assigns criteria and runs simulations [sim_start, sim_end). Results are stored in temporary files to be combined when all chunks are finished."""
         mode_max_win = None
         for bm in self.config.bet_modes:
             if bm._name.lower() == betmode.lower():
@@ -255,20 +309,57 @@ class GeneralGameState(ABC):
         assert mode_max_win is not None
 
         self.win_manager = WinManager(self.config.basegame_type, self.config.freegame_type, mode_max_win)
-        self.library = {}
+        self.book_summaries = {}
+        self.library_events = {}
         self.recorded_events = {}
         self.betmode = betmode
-        self.num_sims = num_sims
+        self.num_sims = num_sims = sim_end - sim_start
+        self.acceptance_cache = self.acceptance_caches.get(betmode)
+        self.stop_harvest = self.stop_harvests.get(betmode)
+        criteria_samplers = get_criteria_samplers(self.get_current_betmode())
 
         max_round_win = 0.0
         total_triggers = 0
         trigger_counts = {"fs3": 0, "fs4": 0, "fs5": 0, "other": 0}
-        for sim in range(
-            thread_index * num_sims + (total_threads * num_sims) * repeat_count,
-            (thread_index + 1) * num_sims + (total_threads * num_sims) * repeat_count,
-        ):
-            self.criteria = sim_to_criteria[sim]
-            self.run_spin(sim, simulation_seeds[sim])
+        progress = None
+        if self.publish_progress is not None:
+            progress = ProgressCounters(betmode, self.publish_progress, slow_sims=self.slow_sims)
+        book_stream = self.book_stream if self.book_stream is not None else LocalBookStream()
+        if not self.stats_only:
+            book_stream.open(
+                self.output_files.get_temp_multi_thread_name(betmode, chunk_index, compress),
+                regular_json=not compress and self.config.output_regular_json,
+            )
+        for sim in range(sim_start, sim_end):
+            self.criteria = sim_allocation.get_criteria(sim)
+            simulation_seed = sim_allocation.get_seed(sim)
+            self.criteria_sampler = criteria_samplers.get(self.criteria)
+            sim_started = self.first_attempt_start = self.attempt_start = time.perf_counter()
+            self.finished_book = None
+            self.run_spin(sim, simulation_seed)
+            sim_seconds = time.perf_counter() - sim_started
+            if self.finished_book is not None:
+                if not self.stats_only:
+                    book_stream.add(self.finished_book)
+                if write_event_list:
+                    get_library_events([self.finished_book], self.library_events)
+                if self.criteria_sampler is not None and self.stop_harvest is not None:
+                    self.stop_harvest.record(self.criteria, self.sampled_boards)
+                self.finished_book = None
+            skipped_attempts = 0
+            if self.acceptance_cache is not None:
+                skipped_attempts = self.update_acceptance_cache()
+            if progress is not None:
+                progress.record_sim(
+                    self.criteria,
+                    self.repeat_count,
+                    self.attempt_start - self.first_attempt_start,
+                    time.perf_counter() - self.attempt_start,
+                    skipped_attempts,
+                    sim,
+                    simulation_seed,
+                    sim_seconds,
+                )
 
             # --- Diagnostics (per-thread) ---
             # Max win = highest single betting-round win observed by this thread.
@@ -306,7 +397,7 @@ class GeneralGameState(ABC):
         )
 
         print(
-            "Thread " + str(thread_index),
+            "Chunk " + str(chunk_index),
             "finished with",
             round(self.win_manager.total_cumulative_wins / (num_sims * mode_cost), 3),
             "RTP.",
@@ -316,16 +407,33 @@ class GeneralGameState(ABC):
             flush=True,
         )
 
-        write_json(
-            self,
-            self.output_files.get_temp_multi_thread_name(
-                betmode, thread_index, repeat_count, (compress) * True + (not compress) * False
-            ),
-        )
-        print_recorded_wins(self, self.output_files.get_temp_force_name(betmode, thread_index, repeat_count))
-        make_lookup_tables(self, self.output_files.get_temp_lookup_name(betmode, thread_index, repeat_count))
-        make_lookup_pay_split(self, self.output_files.get_temp_segmented_name(betmode, thread_index, repeat_count))
+        book_stream.close()
+        print_recorded_wins(self, self.output_files.get_temp_force_name(betmode, chunk_index))
+        make_lookup_tables(self, self.output_files.get_temp_lookup_name(betmode, chunk_index))
+        make_lookup_pay_split(self, self.output_files.get_temp_segmented_name(betmode, chunk_index))
 
         if write_event_list:
-            write_library_events(self, list(self.library.values()), betmode)
+            write_temp_library_events(self, self.output_files.get_temp_events_name(betmode, chunk_index))
+        self.criteria_sampler = None
+        if self.stop_harvest is not None:
+            self.stop_harvest.write_temp(self.output_files.get_temp_harvest_name(betmode, chunk_index))
+            self.stop_harvest = None
+        if self.acceptance_cache is not None:
+            self.acceptance_cache.write_temp(self.output_files.get_temp_acceptance_name(betmode, chunk_index))
+            self.acceptance_cache = None
+        if progress is not None:
+            progress.record_output(
+                len(self.book_summaries),
+                self.output_files.get_temp_chunk_names(
+                    betmode,
+                    chunk_index,
+                    compress,
+                    write_event_list,
+                    write_books=False,
+                ),
+                book_stream.bytes_written,
+            )
+            if self.phase_timers is not None:
+                progress.record_phases(self.phase_timers.collect())
+            progress.flush()
         betmode_copy_list.append(self.config.bet_modes)
@@ -0,0 +1,381 @@
+"""Live simulation progress counters, published by workers and aggregated by the parent process."""
+
+import os
+import json
+import time
+import heapq
+from collections import defaultdict
+from typing import Callable, Dict
+
+
+def get_seconds_bucket(seconds: float) -> int:
+    """Power-of-two histogram bucket of a duration, bucket b holds durations in [2^b, 2^(b+1)) microseconds."""
+    return max(int(seconds * 1e6), 1).bit_length() - 1
+
+
+class ProgressCounters:
+    """Counters accumulated by a gamestate while simulating a chunk, only changes since the last publish are sent."""
+
+    def __init__(self, betmode: str, publish: Callable, publish_interval: float = 0.5, slow_sims: int = 0):
+        self.betmode = betmode
+        self.publish = publish
+        self.publish_interval = publish_interval
+        self.slow_sims = slow_sims
+        self.last_publish = self.last_busy = time.monotonic()
+        self.reset()
+        self.flush(force=True)
+
+    def reset(self) -> None:
+        self.sims = 0
+        self.attempts = 0
+        self.skipped_attempts = 0
+        self.books = 0
+        self.bytes = 0
+        self.criteria_sims = defaultdict(int)
+        self.criteria_attempts = defaultdict(int)
+        self.criteria_repeats = defaultdict(lambda: defaultdict(int))
+        self.criteria_rejected_seconds = defaultdict(float)
+        self.criteria_accepted_seconds = defaultdict(float)
+        self.sim_seconds = defaultdict(int)
+        self.slowest = []
+        self.phases = {}
+
+    def record_phases(self, phases: dict) -> None:
+        """Attach per-phase timer totals collected over the chunk."""
+        self.phases = phases
+
+    def record_sim(
+        self,
+        criteria: str,
+        attempts: int,
+        rejected_seconds: float = 0.0,
+        accepted_seconds: float = 0.0,
+        skipped_attempts: int = 0,
+        sim: int = None,
+        seed: int = None,
+        sim_seconds: float = None,
+    ) -> None:
+        """
+        Count a finished simulation, its attempts and time, publishing if the interval elapsed.
+        sim and seed identify the simulation if it is among the slowest.
+        """
+        attempts = max(attempts, 1)
+        self.sims += 1
+        self.attempts += attempts
+        self.skipped_attempts += skipped_attempts
+        self.criteria_sims[criteria] += 1
+        self.criteria_attempts[criteria] += attempts
+        self.criteria_repeats[criteria][attempts - 1] += 1
+        self.criteria_rejected_seconds[criteria] += rejected_seconds
+        self.criteria_accepted_seconds[criteria] += accepted_seconds
+        if self.slow_sims > 0:
+            seconds = rejected_seconds + accepted_seconds if sim_seconds is None else sim_seconds
+            self.sim_seconds[get_seconds_bucket(seconds)] += 1
+            slow_sim = (seconds, sim, seed, criteria, attempts)
+            if len(self.slowest) < self.slow_sims:
+                heapq.heappush(self.slowest, slow_sim)
+            elif seconds > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, slow_sim)
+        if time.monotonic() - self.last_publish >= self.publish_interval:
+            self.flush()
+
+    def record_output(self, num_books: int, filenames: list, book_bytes: int = 0) -> None:
+        """Count books, bytes written to the chunk temp files and book_bytes written to its book file."""
+        self.books += num_books
+        self.bytes += book_bytes + sum(os.path.getsize(f) for f in filenames if os.path.isfile(f))
+
+    def flush(self, force: bool = False) -> None:
+        """Publish counter deltas, an empty update still marks the worker as alive."""
+        if self.sims == 0 and self.books == 0 and not force:
+            return
+        now = time.monotonic()
+        self.publish(
+            {
+                "betmode": self.betmode,
+                "busy_seconds": now - self.last_busy,
+                "sims": self.sims,
+                "attempts": self.attempts,
+                "skipped_attempts": self.skipped_attempts,
+                "books": self.books,
+                "bytes": self.bytes,
+                "criteria_sims": dict(self.criteria_sims),
+                "criteria_attempts": dict(self.criteria_attempts),
+                "criteria_repeats": {criteria: dict(hist) for criteria, hist in self.criteria_repeats.items()},
+                "criteria_rejected_seconds": dict(self.criteria_rejected_seconds),
+                "criteria_accepted_seconds": dict(self.criteria_accepted_seconds),
+                "sim_seconds": dict(self.sim_seconds),
+                "slow_sims": [
+                    {"seconds": seconds, "sim": sim, "seed": seed, "criteria": criteria, "attempts": attempts}
+                    for seconds, sim, seed, criteria, attempts in self.slowest
+                ],
+                "phases": self.phases,
+            }
+        )
+        self.last_publish = self.last_busy = now
+        self.reset()
+
+
+class ProgressTracker:
+    """Parent-side aggregation of worker counters, rendering progress and recording metrics per bet-mode."""
+
+    def __init__(self, render_interval: float = 5.0, stall_timeout: float = 120.0, slow_sims: int = 0):
+        self.render_interval = render_interval
+        self.stall_timeout = stall_timeout
+        self.slow_sims = slow_sims
+        self.modes = {}
+        self.current_mode = None
+        self.last_render = time.monotonic()
+        self.worker_last_seen = {}
+        self.worker_sims = defaultdict(int)
+        self.stalled_workers = set()
+
+    def start_mode(self, betmode: str, num_sims: int, criteria_counts: Dict[str, int]) -> None:
+        """Register the number of simulations expected for a bet-mode."""
+        self.current_mode = betmode
+        self.modes[betmode] = {
+            "num_sims": num_sims,
+            "start_time": time.time(),
+            "end_time": None,
+            "sims": 0,
+            "attempts": 0,
+            "skipped_attempts": 0,
+            "books": 0,
+            "bytes": 0,
+            "criteria_target": dict(criteria_counts),
+            "criteria_sims": defaultdict(int),
+            "criteria_attempts": defaultdict(int),
+            "criteria_repeats": defaultdict(lambda: defaultdict(int)),
+            "criteria_rejected_seconds": defaultdict(float),
+            "criteria_accepted_seconds": defaultdict(float),
+            "busy_seconds": 0.0,
+            "sim_seconds": defaultdict(int),
+            "slow_sims": [],
+            "phases": {},
+        }
+        self.last_render = time.monotonic()
+
+    def skip_sims(self, num_sims: int) -> None:
+        """Remove simulations which are not run by this process (resumed or owned by another shard) from the ETA."""
+        self.modes[self.current_mode]["num_sims"] -= num_sims
+
+    def update(self, worker_index: int, counters: dict) -> None:
+        """Add counter deltas published by a worker."""
+        self.worker_last_seen[worker_index] = time.monotonic()
+        self.stalled_workers.discard(worker_index)
+        mode = self.modes.get(counters["betmode"])
+        if mode is not None:
+            for key in ["sims", "attempts", "skipped_attempts", "books", "bytes"]:
+                mode[key] += counters[key]
+            for criteria, count in counters["criteria_sims"].items():
+                mode["criteria_sims"][criteria] += count
+            for criteria, count in counters["criteria_attempts"].items():
+                mode["criteria_attempts"][criteria] += count
+            for criteria, histogram in counters["criteria_repeats"].items():
+                for repeats, count in histogram.items():
+                    mode["criteria_repeats"][criteria][repeats] += count
+            for key in ["criteria_rejected_seconds", "criteria_accepted_seconds"]:
+                for criteria, seconds in counters[key].items():
+                    mode[key][criteria] += seconds
+            mode["busy_seconds"] += counters["busy_seconds"]
+            for bucket, count in counters.get("sim_seconds", {}).items():
+                mode["sim_seconds"][bucket] += count
+            if len(counters.get("slow_sims", [])) > 0:
+                mode["slow_sims"] = heapq.nlargest(
+                    self.slow_sims, mode["slow_sims"] + counters["slow_sims"], key=lambda slow_sim: slow_sim["seconds"]
+                )
+            for phase, totals in counters["phases"].items():
+                mode_phase = mode["phases"].setdefault(phase, {key: 0 for key in totals})
+                for key, value in totals.items():
+                    mode_phase[key] += value
+        self.worker_sims[worker_index] += counters["sims"]
+        self.tick()
+
+    def add_bytes(self, betmode: str, num_bytes: int) -> None:
+        """Add bytes of a book file acknowledged by a book writer process."""
+        mode = self.modes.get(betmode)
+        if mode is not None:
+            mode["bytes"] += num_bytes
+        self.tick()
+
+    def task_finished(self, worker_index: int) -> None:
+        """An idle worker is not expected to report progress."""
+        self.worker_last_seen.pop(worker_index, None)
+        self.stalled_workers.discard(worker_index)
+
+    def tick(self) -> None:
+        """Render progress and check for stalled workers if the render interval has elapsed."""
+        now = time.monotonic()
+        if now - self.last_render < self.render_interval:
+            return
+        self.last_render = now
+        self.render()
+        for worker_index, last_seen in self.worker_last_seen.items():
+            if now - last_seen > self.stall_timeout and worker_index not in self.stalled_workers:
+                self.stalled_workers.add(worker_index)
+                print(f"Warning: worker {worker_index} has not reported progress for {round(now - last_seen)}s.")
+
+    def get_mode_summary(self, betmode: str) -> dict:
+        mode = self.modes[betmode]
+        elapsed = (mode["end_time"] or time.time()) - mode["start_time"]
+        sims_per_second = mode["sims"] / elapsed if elapsed > 0 else 0.0
+        remaining = max(mode["num_sims"] - mode["sims"], 0)
+        return {
+            "num_sims": mode["num_sims"],
+            "sims": mode["sims"],
+            "elapsed_seconds": round(elapsed, 3),
+            "sims_per_second": round(sims_per_second, 3),
+            "eta_seconds": round(remaining / sims_per_second, 1) if sims_per_second > 0 else None,
+            "attempts": mode["attempts"],
+            "attempts_per_sim": round(mode["attempts"] / mode["sims"], 4) if mode["sims"] > 0 else None,
+            "skipped_attempts": mode["skipped_attempts"],
+            "books": mode["books"],
+            "bytes_written": mode["bytes"],
+            "criteria": {
+                criteria: {
+                    "target": target,
+                    "sims": mode["criteria_sims"][criteria],
+                    "attempts": mode["criteria_attempts"][criteria],
+                }
+                for criteria, target in mode["criteria_target"].items()
+            },
+            "busy_seconds": round(mode["busy_seconds"], 3),
+            "phases": self.get_phase_summary(betmode),
+        }
+
+    def get_phase_summary(self, betmode: str) -> dict:
+        """Phase totals sorted by self time, untimed work is the remainder of worker busy time."""
+        mode = self.modes[betmode]
+        if len(mode["phases"]) == 0:
+            return {}
+        phases = sorted(mode["phases"].items(), key=lambda item: -item[1]["self_seconds"])
+        untimed = mode["busy_seconds"] - sum(totals["self_seconds"] for _, totals in phases)
+        phases.append(("untimed", {"calls": None, "total_seconds": untimed, "self_seconds": untimed}))
+        return {
+            phase: {
+                "calls": totals["calls"],
+                "total_seconds": round(totals["total_seconds"], 4),
+                "self_seconds": round(totals["self_seconds"], 4),
+                "self_share": round(totals["self_seconds"] / mode["busy_seconds"], 4) if mode["busy_seconds"] else None,
+            }
+            for phase, totals in phases
+        }
+
+    def render_phases(self, betmode: str = None) -> None:
+        """Print the phase breakdown of a bet-mode (default the current one), aggregated over all workers."""
+        betmode = betmode or self.current_mode
+        if betmode is None:
+            return
+        phases = self.get_phase_summary(betmode)
+        if len(phases) == 0:
+            return
+        print(f"[{betmode}] phase breakdown over {round(self.modes[betmode]['busy_seconds'], 2)}s:")
+        print(f"  {'phase':<40}{'calls':>12}{'self (s)':>12}{'self %':>9}{'total (s)':>12}")
+        for phase, totals in phases.items():
+            calls = "" if totals["calls"] is None else totals["calls"]
+            share = "" if totals["self_share"] is None else round(100 * totals["self_share"], 1)
+            print(
+                f"  {phase:<40}{calls:>12}{totals['self_seconds']:>12.3f}{share:>9}{totals['total_seconds']:>12.3f}"
+            )
+
+    def render(self, betmode: str = None) -> None:
+        """Print a single progress summary of a bet-mode, by default the most recently started one."""
+        betmode = betmode or self.current_mode
+        if betmode is None:
+            return
+        summary = self.get_mode_summary(betmode)
+        if summary["num_sims"] <= 0:
+            return
+        eta = "--" if summary["eta_seconds"] is None else time.strftime("%H:%M:%S", time.gmtime(summary["eta_seconds"]))
+        criteria_progress = ", ".join(
+            f"{criteria}: {round(100 * details['sims'] / details['target'])}%"
+            for criteria, details in summary["criteria"].items()
+            if details["target"] > 0
+        )
+        print(
+            f"[{betmode}] {summary['sims']}/{summary['num_sims']} sims",
+            f"({round(100 * summary['sims'] / summary['num_sims'], 1)}%)",
+            f"| {round(summary['sims_per_second'])} sims/s | ETA {eta}",
+            f"| {summary['attempts_per_sim']} spins/sim | {round(summary['bytes_written'] / 1e6, 1)} MB written",
+            f"| [{criteria_progress}]",
+            flush=True,
+        )
+
+    def finish_mode(self, betmode: str = None) -> None:
+        betmode = betmode or self.current_mode
+        if betmode is not None:
+            self.modes[betmode]["end_time"] = time.time()
+
+    def get_rejection_summary(self, betmode: str) -> dict:
+        """Acceptance statistics of each criteria's repeat loop."""
+        mode = self.modes[betmode]
+        summary = {}
+        for criteria in mode["criteria_target"]:
+            histogram = mode["criteria_repeats"][criteria]
+            sims = sum(histogram.values())
+            if sims == 0:
+                continue
+            repeats = sorted(histogram)
+            total_repeats = sum(r * histogram[r] for r in repeats)
+            p99, cumulative = repeats[-1], 0
+            for r in repeats:
+                cumulative += histogram[r]
+                if cumulative >= 0.99 * sims:
+                    p99 = r
+                    break
+            rejected_seconds = mode["criteria_rejected_seconds"][criteria]
+            accepted_seconds = mode["criteria_accepted_seconds"][criteria]
+            summary[criteria] = {
+                "accepted_sims": sims,
+                "total_attempts": sims + total_repeats,
+                "acceptance_rate": round(sims / (sims + total_repeats), 6),
+                "mean_repeats": round(total_repeats / sims, 4),
+                "p99_repeats": p99,
+                "max_repeats": repeats[-1],
+                "rejected_seconds": round(rejected_seconds, 4),
+                "accepted_seconds": round(accepted_seconds, 4),
+                "rejected_time_share": (
+                    round(rejected_seconds / (rejected_seconds + accepted_seconds), 4)
+                    if rejected_seconds + accepted_seconds > 0
+                    else None
+                ),
+                "repeat_histogram": {str(r): histogram[r] for r in repeats},
+            }
+        return dict(sorted(summary.items(), key=lambda item: -item[1]["rejected_seconds"]))
+
+    def write_rejection_report(self, betmode: str, filename: str) -> None:
+        """Write per-criteria repeat-loop statistics, criteria with the most time in rejected attempts first."""
+        with open(filename, "w", encoding="UTF-8") as f:
+            json.dump({"betmode": betmode, "criteria": self.get_rejection_summary(betmode)}, f, indent=4)
+
+    def get_slow_sims_summary(self, betmode: str) -> dict:
+        """Histogram of simulation wall times and the slowest simulations of a bet-mode."""
+        mode = self.modes[betmode]
+        return {
+            "betmode": betmode,
+            "sim_seconds": [
+                {"min_seconds": 2**bucket / 1e6, "max_seconds": 2 ** (bucket + 1) / 1e6, "sims": count}
+                for bucket, count in sorted(mode["sim_seconds"].items())
+            ],
+            "slowest": [
+                {"betmode": betmode, **slow_sim, "seconds": round(slow_sim["seconds"], 6)}
+                for slow_sim in mode["slow_sims"]
+            ],
+        }
+
+    def write_slow_sims_report(self, betmode: str, filename: str, harvest_sizes: dict = None) -> None:
+        """Write the wall time histogram and slowest simulations, harvest_sizes lets sampled simulations be replayed."""
+        summary = self.get_slow_sims_summary(betmode)
+        if harvest_sizes is not None:
+            summary["harvest_sizes"] = harvest_sizes
+        with open(filename, "w", encoding="UTF-8") as f:
+            json.dump(summary, f, indent=4)
+
+    def write_metrics(self, filename: str, run_details: dict = None) -> None:
+        """Write machine-readable metrics for every simulated bet-mode."""
+        metrics = {
+            "run": run_details or {},
+            "betmodes": {betmode: self.get_mode_summary(betmode) for betmode in self.modes},
+            "worker_sims": {str(worker_index): sims for worker_index, sims in sorted(self.worker_sims.items())},
+        }
+        with open(filename, "w", encoding="UTF-8") as f:
+            json.dump(metrics, f, indent=4)
@@ -0,0 +1,255 @@
+"""Long-lived simulation workers shared across batches and bet-modes."""
+
+import queue
+import cProfile
+import traceback
+from typing import Callable, Dict, List, Union
+from multiprocessing import Process, Queue
+
+from src.state.prefork import get_process_memory
+from src.state.cpu_placement import set_cpu_affinity
+from src.state.book_writer import BookStream, book_writer_loop, BOOK_QUEUE_SIZE
+
+
+def worker_loop(
+    gamestates: Dict[str, object],
+    worker_index: int,
+    task_queue: Queue,
+    result_queue: Queue,
+    profile: bool = False,
+    cpus: list = None,
+    book_queues: list = None,
+) -> None:
+    """
+    Run simulation tasks, each on the gamestate of its game_id, until the stop signal (None) is received.
+    Profiles are dumped before each task is reported done, books are streamed to book_queues if given.
+    """
+    if cpus is not None:
+        set_cpu_affinity(cpus)
+    profilers = {}
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        gamestate = gamestates[task["game_id"]]
+        gamestate.publish_progress = lambda counters, task_id=task["task_id"]: result_queue.put(
+            ("progress", worker_index, task_id, counters)
+        )
+        if book_queues:
+            gamestate.book_stream = BookStream(book_queues[task["task_id"] % len(book_queues)], task["task_id"])
+        try:
+            betmode_copy_list = []
+            if profile:
+                profiler = profilers.setdefault((task["game_id"], task["run_args"]["betmode"]), cProfile.Profile())
+                profiler.enable()
+            try:
+                gamestate.run_sims(betmode_copy_list=betmode_copy_list, **task["run_args"])
+            finally:
+                if profile:
+                    profiler.disable()
+            if profile:
+                profiler.dump_stats(
+                    gamestate.output_files.get_temp_profile_name(task["run_args"]["betmode"], f"worker{worker_index}")
+                )
+            result_queue.put(("done", worker_index, task["task_id"], betmode_copy_list))
+        except Exception:  # pylint: disable=broad-except
+            result_queue.put(("error", worker_index, task["task_id"], traceback.format_exc()))
+
+
+class SimulationPool:
+    """
+    Worker processes forked once per create_books call, each holding a warm copy of every game.
+    With book_writers > 0 a task only finishes once its writer has acknowledged the book file.
+    """
+
+    def __init__(
+        self,
+        gamestate: Union[object, List[object]],
+        threads: int,
+        poll_interval: float = 1.0,
+        progress_tracker: Union[object, Dict[str, object]] = None,
+        profile: bool = False,
+        worker_cpus: list = None,
+        book_writers: int = 0,
+    ):
+        self.gamestates = {gs.config.game_id: gs for gs in (gamestate if isinstance(gamestate, list) else [gamestate])}
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.task_queue = Queue()
+        self.result_queue = Queue()
+        self.processes = []
+        self.task_counter = 0
+        self.pending = set()
+        self.progress_tracker = progress_tracker
+        self.profile = profile
+        self.worker_cpus = worker_cpus
+        self.book_writers = book_writers
+        self.book_queues = []
+        self.writer_processes = []
+        self.unwritten = set()
+        self.finished = {}
+        self.task_games = {}
+        self.task_betmodes = {}
+
+    def start(self) -> None:
+        """Fork all writer and worker processes."""
+        for writer_index in range(self.book_writers):
+            book_queue = Queue(maxsize=BOOK_QUEUE_SIZE)
+            process = Process(target=book_writer_loop, args=(writer_index, book_queue, self.result_queue), daemon=True)
+            process.start()
+            self.book_queues.append(book_queue)
+            self.writer_processes.append(process)
+        for worker_index in range(self.threads):
+            process = Process(
+                target=worker_loop,
+                args=(
+                    self.gamestates,
+                    worker_index,
+                    self.task_queue,
+                    self.result_queue,
+                    self.profile,
+                    None if self.worker_cpus is None else self.worker_cpus[worker_index],
+                    self.book_queues,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+        print("Started", self.threads, "simulation workers and", self.book_writers, "book writers.")
+
+    def submit(self, run_args: dict) -> int:
+        """Queue a run_sims() call of the game given by run_args["game_id"], returns the task identifier."""
+        task_id = self.task_counter
+        self.task_counter += 1
+        self.pending.add(task_id)
+        if self.book_writers > 0:
+            self.unwritten.add(task_id)
+        sim_args = dict(run_args)
+        self.task_games[task_id] = sim_args.pop("game_id")
+        self.task_betmodes[task_id] = sim_args["betmode"]
+        self.task_queue.put({"task_id": task_id, "game_id": self.task_games[task_id], "run_args": sim_args})
+        return task_id
+
+    def get_progress_tracker(self, task_id: int) -> object:
+        """Progress tracker of the task's game, None if progress is not tracked."""
+        if isinstance(self.progress_tracker, dict):
+            return self.progress_tracker.get(self.task_games.get(task_id))
+        return self.progress_tracker
+
+    def get_progress_trackers(self) -> list:
+        """Trackers updated by worker progress, a single tracker or one per game when the pool is shared."""
+        if isinstance(self.progress_tracker, dict):
+            return list(self.progress_tracker.values())
+        return [] if self.progress_tracker is None else [self.progress_tracker]
+
+    def get_result(self) -> tuple:
+        """Block until a task finishes, raising if a worker failed or exited unexpectedly."""
+        while True:
+            try:
+                status, worker_index, task_id, payload = self.result_queue.get(timeout=self.poll_interval)
+            except queue.Empty:
+                for progress_tracker in self.get_progress_trackers():
+                    progress_tracker.tick()
+                for worker_index, process in enumerate(self.processes):
+                    if not process.is_alive():
+                        raise RuntimeError(
+                            f"Simulation worker {worker_index} exited unexpectedly (exitcode {process.exitcode})."
+                        )
+                for writer_index, process in enumerate(self.writer_processes):
+                    if not process.is_alive():
+                        raise RuntimeError(
+                            f"Book writer {writer_index} exited unexpectedly (exitcode {process.exitcode})."
+                        )
+                continue
+            if status == "progress":
+                progress_tracker = self.get_progress_tracker(task_id)
+                if progress_tracker is not None:
+                    progress_tracker.update(worker_index, payload)
+                continue
+            if status == "write_error":
+                raise RuntimeError(f"Book writer {worker_index} failed on task {task_id}:\n{payload}")
+            if status == "written":
+                progress_tracker = self.get_progress_tracker(task_id)
+                if progress_tracker is not None:
+                    progress_tracker.add_bytes(self.task_betmodes[task_id], payload)
+                self.unwritten.discard(task_id)
+                if task_id not in self.finished:
+                    continue
+                payload = self.finished.pop(task_id)
+            else:
+                progress_tracker = self.get_progress_tracker(task_id)
+                if progress_tracker is not None:
+                    progress_tracker.task_finished(worker_index)
+                if status == "error":
+                    self.pending.discard(task_id)
+                    raise RuntimeError(f"Simulation worker {worker_index} failed on task {task_id}:\n{payload}")
+                if task_id in self.unwritten:
+                    self.finished[task_id] = payload
+                    continue
+            self.pending.discard(task_id)
+            self.task_games.pop(task_id, None)
+            self.task_betmodes.pop(task_id, None)
+            return task_id, payload
+
+    def run_tasks(self, all_run_args: list, max_in_flight: int = None, on_result: Callable = None) -> list:
+        """
+        Dynamically schedule tasks, idle workers pull the next item from the shared queue.
+        At most max_in_flight tasks are queued at once; results are returned in submission order.
+        on_result(run_args, payload) is called in the parent as soon as each task finishes.
+        """
+        if max_in_flight is None:
+            max_in_flight = 2 * self.threads
+        results = {}
+        submitted = {}
+
+        def collect(task_id, payload):
+            results[task_id] = payload
+            if on_result is not None:
+                on_result(submitted[task_id], payload)
+
+        for run_args in all_run_args:
+            if len(self.pending) >= max_in_flight:
+                collect(*self.get_result())
+            submitted[self.submit(run_args)] = run_args
+        self.wait_all(on_result=collect)
+        return [results[task_id] for task_id in submitted]
+
+    def wait_all(self, on_result: Callable = None) -> dict:
+        """Collect results for every outstanding task, keyed by task identifier."""
+        results = {}
+        while len(self.pending) > 0:
+            task_id, payload = self.get_result()
+            results[task_id] = payload
+            if on_result is not None:
+                on_result(task_id, payload)
+        return results
+
+    def get_worker_memory(self) -> dict:
+        """Shared and private memory of each live worker process, keyed by worker index."""
+        return {worker_index: get_process_memory(process.pid) for worker_index, process in enumerate(self.processes)}
+
+    def shutdown(self) -> None:
+        """Stop all workers, terminating any which do not exit cleanly or still hold unfinished tasks."""
+        for _ in self.processes:
+            self.task_queue.put(None)
+        for process in self.processes:
+            if len(self.pending) == 0:
+                process.join(timeout=self.poll_interval * 10)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        for book_queue in self.book_queues:
+            book_queue.put(None)
+        for process in self.writer_processes:
+            if len(self.pending) == 0:
+                process.join(timeout=self.poll_interval * 10)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self.processes = []
+        self.writer_processes = []
+        self.task_queue.close()
+        self.result_queue.close()
+        for book_queue in self.book_queues:
+            book_queue.close()
+        self.book_queues = []
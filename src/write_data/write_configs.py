@@ -6,6 +6,8 @@ import shutil
 import warnings
 from collections import defaultdict
 from utils.get_file_hash import get_hash
+from src.state.build_cache import BuildCache
+from src.state.fingerprint import get_config_fingerprint, get_code_fingerprint, ENGINE_SOURCE_PATH, UTILS_SOURCE_PATH
 from utils.analysis.distribution_functions import (
     make_win_distribution,
     get_lookup_length,
@@ -20,8 +22,28 @@ def copy_and_rename_csv(filepath: str) -> None:
     shutil.copy(filepath, new_filepath)
 
 
-def generate_configs(gamestate: object, json_padding: bool = True, assign_properties: bool = True):
-    """Construct frontend, backend and optimization-required configuration files."""
+def generate_configs(
+    gamestate: object, json_padding: bool = True, assign_properties: bool = True, incremental: bool = False
+):
+    """
+    Construct frontend, backend and optimization-required configuration files.
+    incremental=True skips generation if the config, game and engine code (including utils) and every input file
+    (lookup tables, books and force files) are unchanged since the configs were last written.
+    """
+    build_cache, fingerprint = None, None
+    if incremental:
+        build_cache = BuildCache(gamestate.output_files.get_build_cache_name())
+        build_cache.load()
+        settings_fingerprint = (
+            get_code_fingerprint(gamestate, [ENGINE_SOURCE_PATH, UTILS_SOURCE_PATH])
+            + get_config_fingerprint(gamestate.config)
+            + str(json_padding)
+            + str(assign_properties)
+        )
+        fingerprint = build_cache.get_inputs_fingerprint(settings_fingerprint, get_config_input_files(gamestate))
+        if build_cache.is_current("configs", fingerprint):
+            print("Skipping config generation - inputs and outputs are unchanged.")
+            return
     make_fe_config(
         gamestate=gamestate,
         json_padding=json_padding,
@@ -31,6 +53,24 @@ def generate_configs(gamestate: object, json_padding: bool = True, assign_proper
     make_temp_math_config(gamestate)
     make_index_config(gamestate)
     # make_math_config(gamestate)
+    if build_cache is not None:
+        # lut_0 files are created by make_be_config if missing, so inputs are fingerprinted again once written
+        fingerprint = build_cache.get_inputs_fingerprint(settings_fingerprint, get_config_input_files(gamestate))
+        build_cache.record("configs", fingerprint, [path for path in gamestate.output_files.configs["paths"].values()])
+        build_cache.save()
+
+
+def get_config_input_files(gamestate: object) -> list:
+    """Simulation and optimization outputs read while generating the configs."""
+    input_files = [os.path.join(gamestate.output_files.force_path, "force.json")]
+    for bet in gamestate.config.bet_modes:
+        input_files += [
+            gamestate.output_files.lookups[bet.get_name()]["paths"]["optimized_lookup"],
+            gamestate.output_files.lookups[bet.get_name()]["paths"]["base_lookup"],
+            gamestate.output_files.books[bet.get_name()]["paths"]["books_compressed"],
+            gamestate.output_files.force[bet.get_name()]["paths"]["force_record"],
+        ]
+    return input_files
 
 
 def make_index_config(gamestate: object):
@@ -66,55 +66,76 @@ def make_force_json(gamestate: object):
 
 
 def get_force_options(force_results: dict):
-    """Return JSON ready force keys."""
+    """Return JSON ready force keys, values are sorted so the output does not depend on set ordering."""
     force_keys = defaultdict(set)
     for force in force_results.keys():
         for key, val in force:
             force_keys[str(key)].add(val)
-    return {key: list(val) for key, val in force_keys.items()}
+    return {key: sorted(val) for key, val in force_keys.items()}
 
 
 def make_lookup_tables(gamestate: object, name: str):
     """Write lookup tables for all simulations."""
     file = open(name, "w", encoding="UTF-8")
-    sims = list(gamestate.library.keys())
+    sims = list(gamestate.book_summaries.keys())
     sims.sort()
     for sim in sims:
-        file.write("{},1,{}\n".format(gamestate.library[sim]["id"], gamestate.library[sim]["payoutMultiplier"]))
+        summary = gamestate.book_summaries[sim]
+        file.write("{},1,{}\n".format(summary.id, summary.payout_multiplier))
     file.close()
 
 
 def make_lookup_pay_split(gamestate: object, name: str):
     """Record win values from basegame and freegame types."""
     file = open(name, "w", encoding="UTF-8")
-    sims = list(gamestate.library.keys())
+    sims = list(gamestate.book_summaries.keys())
     sims.sort()
     for sim in sims:
+        summary = gamestate.book_summaries[sim]
         file.write(
-            str(gamestate.library[sim]["id"])
+            str(summary.id)
             + ","
-            + str(gamestate.library[sim]["criteria"])
+            + str(summary.criteria)
             + ","
-            + str(round(gamestate.library[sim]["baseGameWins"], 2))
+            + str(round(summary.basegame_wins, 2))
             + ","
-            + str(round(gamestate.library[sim]["freeGameWins"], 2))
+            + str(round(summary.freegame_wins, 2))
             + "\n"
         )
     file.close()
 
 
-def write_library_events(gamestate: object, library: list, gametype: str):
-    """Write all unique events within a given mode - with one example application."""
-    unique_event = []
-    event_items = {}
+def get_library_events(library: list, event_items: dict = None) -> dict:
+    """Return the first example of each unique event type, in order of appearance."""
+    if event_items is None:
+        event_items = {}
     for event in library:
         for instance in event["events"]:
             lib_event = instance["type"]
-            if lib_event not in unique_event:
-                unique_event.append(lib_event)
-                item_keys = instance.keys()
-                dict_details = {key: instance[key] for key in item_keys if key != "index"}
-                event_items[lib_event] = dict_details
+            if lib_event not in event_items:
+                event_items[lib_event] = {key: instance[key] for key in instance.keys() if key != "index"}
+    return event_items
+
+
+def write_temp_library_events(gamestate: object, name: str):
+    """Unique events found within a single simulation chunk, collected by run_sims as each book finishes."""
+    with open(name, "w", encoding="UTF-8") as f:
+        f.write(json.dumps(gamestate.library_events))
+
+
+def merge_library_events(gamestate: object, filenames: list, gametype: str):
+    """Combine chunk event examples in chunk order, so the chosen examples do not depend on thread count."""
+    event_items = {}
+    for filename in filenames:
+        with open(filename, "r", encoding="UTF-8") as f:
+            for lib_event, dict_details in json.load(f).items():
+                if lib_event not in event_items:
+                    event_items[lib_event] = dict_details
+    write_event_items(gamestate, event_items, gametype)
+
+
+def write_event_items(gamestate: object, event_items: dict, gametype: str):
+    """Write event examples to the mode event-config file."""
     json_object = json.dumps(event_items, indent=4)
     with open(
         os.path.join(gamestate.output_files.config_path, f"event_config_{gametype}.json"),
@@ -125,30 +146,42 @@ def write_library_events(gamestate: object, library: list, gametype: str):
 
 
 def output_lookup_and_force_files(
-    threads: int,
-    batching_size: int,
     game_id: str,
     betmode: str,
     gamestate: object,
-    num_sims: int = 1000000,
+    num_chunks: int,
+    num_sims: int = None,
     compress: bool = True,
-):
-    """Combine temporary lookup tables and force files into a single output."""
-    print("Saving books for ", game_id, "in", betmode)
-    num_repeats = max(int(round(num_sims / threads / batching_size, 0)), 1)
+    write_books: bool = True,
+    chunk_paths: list = None,
+    update_force_json: bool = True,
+) -> dict:
+    """
+    Combine temporary books, lookup tables and force files into a single output, in simulation chunk order.
+    write_books=False (stats-only runs) skips books and event examples.
+    chunk_paths optionally gives the directory holding each chunk's temp files (e.g. separate shard directories).
+    Returns the bet-mode's force options; with update_force_json=False the shared force.json is left to the caller.
+    """
+
+    def chunk_file(filename: str, chunk_index: int) -> str:
+        if chunk_paths is None:
+            return filename
+        return os.path.join(chunk_paths[chunk_index], os.path.basename(filename))
+
     file_list = []
-    for repeat_index in range(num_repeats):
-        for thread in range(threads):
+    if write_books:
+        print("Saving books for ", game_id, "in", betmode)
+        for chunk_index in range(num_chunks):
             file_list.append(
-                gamestate.output_files.get_temp_multi_thread_name(betmode, thread, repeat_index, compress)
+                chunk_file(gamestate.output_files.get_temp_multi_thread_name(betmode, chunk_index, compress), chunk_index)
             )
 
-    if compress:
-        temp_book_output_path = os.path.join(gamestate.output_files.book_path, "temp_book_output.json")
+    if write_books and compress:
+        temp_book_output_path = gamestate.output_files.get_temp_book_output_name(betmode)
         with open(temp_book_output_path, "w", encoding="UTF-8") as outfile:
             for fname in file_list:
                 with open(fname, "rb") as infile:
-                    decompressed = zstd.ZstdDecompressor().decompress(infile.read())
+                    decompressed = zstd.ZstdDecompressor().decompressobj().decompress(infile.read())
                     outfile.write(decompressed.decode("UTF-8"))
 
         final_out = gamestate.output_files.get_final_book_name(betmode, True)
@@ -156,7 +189,7 @@ def output_lookup_and_force_files(
             f_out.write(zstd.ZstdCompressor().compress(f_in.read()))
 
         os.remove(temp_book_output_path)
-    else:
+    elif write_books:
         with open(
             gamestate.output_files.get_final_book_name(betmode, False),
             "w",
@@ -177,14 +210,21 @@ def output_lookup_and_force_files(
                         else:
                             outfile.write("," + file_data[1::])  # dont write first '[', write last ']'
 
+    if write_books and gamestate.config.write_event_list:
+        merge_library_events(
+            gamestate,
+            [
+                chunk_file(gamestate.output_files.get_temp_events_name(betmode, chunk_index), chunk_index)
+                for chunk_index in range(num_chunks)
+            ],
+            betmode,
+        )
+
     print("Saving force files for", game_id, "in", betmode)
     force_results_dict = {}
     file_list = []
-    for repeat_index in range(num_repeats):
-        for thread in range(threads):
-            file_list.append(
-                gamestate.output_files.get_temp_force_name(betmode, thread, repeat_index),
-            )
+    for chunk_index in range(num_chunks):
+        file_list.append(chunk_file(gamestate.output_files.get_temp_force_name(betmode, chunk_index), chunk_index))
 
     for filename in file_list:
         force_chunk = ast.literal_eval(json.load(open(filename, "r", encoding="UTF-8")))
@@ -213,29 +253,21 @@ def output_lookup_and_force_files(
         file.write(json_object_for_rob)
 
     forceResultKeys = get_force_options(force_results_dict)
-    json_file_path = os.path.join(gamestate.output_files.force_path, "force.json")
-    try:
-        with open(json_file_path, "r", encoding="UTF-8") as file:
-            data = json.load(file)
-    except FileNotFoundError:
-        data = {}
-    data[gamestate.get_current_betmode().get_name()] = forceResultKeys
-    json_object = json.dumps(data, indent=4)
-    with open(json_file_path, "w", encoding="UTF-8") as file:
-        file.write(json_object)
+    if update_force_json:
+        write_force_options(gamestate, betmode, forceResultKeys)
 
     weights_plus_wins_file_list = []
     segmented_lut_file_list = []
     print("Saving LUTs for", game_id, "in", betmode)
-    for repeat_index in range(num_repeats):
-        for thread in range(threads):
-            weights_plus_wins_file_list += [
-                gamestate.output_files.get_temp_lookup_name(betmode, thread, repeat_index)
-            ]
-            segmented_lut_file_list += [
-                gamestate.output_files.get_temp_segmented_name(betmode, thread, repeat_index)
-            ]
-
+    for chunk_index in range(num_chunks):
+        weights_plus_wins_file_list += [
+            chunk_file(gamestate.output_files.get_temp_lookup_name(betmode, chunk_index), chunk_index)
+        ]
+        segmented_lut_file_list += [
+            chunk_file(gamestate.output_files.get_temp_segmented_name(betmode, chunk_index), chunk_index)
+        ]
+
+    lookup_length = 0
     with open(
         gamestate.output_files.get_final_lookup_name(betmode),
         "w",
@@ -243,7 +275,11 @@ def output_lookup_and_force_files(
     ) as outfile:
         for filename in weights_plus_wins_file_list:
             with open(filename, "r", encoding="UTF-8") as infile:
-                outfile.write(infile.read())
+                file_data = infile.read()
+                lookup_length += file_data.count("\n")
+                outfile.write(file_data)
+    if num_sims is not None and lookup_length != num_sims:
+        raise RuntimeError(f"Lookup table for {betmode} has {lookup_length} simulations, expected {num_sims}.")
 
     # Write _0 file if it does not exist
     if not (os.path.exists(gamestate.output_files.get_optimized_lookup_name(betmode))):
@@ -260,24 +296,21 @@ def output_lookup_and_force_files(
             with open(filename, "r", encoding="UTF-8") as infile:
                 outfile.write(infile.read())
 
+    return forceResultKeys
 
-def write_json(gamestate, filename: str):
-    """Convert the list of dictionaries to a JSON-encoded string and compress it in chunks."""
-    json_objects = [json.dumps(item) for item in gamestate.library.values()]
-    combined_data = "\n".join(json_objects) + "\n"
 
-    if filename.endswith(".zst"):
-        compressor = zstd.ZstdCompressor()
-        compressed_data = compressor.compress(combined_data.encode("UTF-8"))
-        with open(filename, "wb") as f:
-            f.write(compressed_data)
-    else:
-        with open(filename, "w", encoding="UTF-8") as f:
-            if not (gamestate.config.output_regular_json):
-                f.write(combined_data)
-            else:
-                j_regular = [item for item in gamestate.library.values()]
-                f.write(json.dumps(j_regular))
+def write_force_options(gamestate: object, betmode: str, force_options: dict):
+    """Update a bet-mode's entry in the force.json file shared by all bet-modes."""
+    json_file_path = os.path.join(gamestate.output_files.force_path, "force.json")
+    try:
+        with open(json_file_path, "r", encoding="UTF-8") as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        data = {}
+    data[betmode] = force_options
+    json_object = json.dumps(data, indent=4)
+    with open(json_file_path, "w", encoding="UTF-8") as file:
+        file.write(json_object)
 
 
 def print_recorded_wins(gamestate: object, name: str = ""):
@@ -0,0 +1,135 @@
+"""Small lines game used to exercise the full create_books pipeline."""
+
+import random
+from src.config.config import Config
+from src.config.betmode import BetMode
+from src.config.distributions import Distribution
+from src.executables.executables import Executables
+from src.calculations.lines import Lines
+
+
+def make_reelstrip(seed: int, num_reels: int = 5, length: int = 40, scatter_spacing: int = 8) -> list:
+    """Randomly generated reelstrip, scatter symbols are spaced further apart than the board height (0 disables)."""
+    rng = random.Random(seed)
+    reelstrip = []
+    for _ in range(num_reels):
+        reel = [rng.choice(["H1", "H2", "L1", "L1", "L2", "L2", "W"]) for _ in range(length)]
+        if scatter_spacing > 0:
+            for pos in range(0, length, scatter_spacing):
+                reel[pos] = "S"
+        reelstrip.append(reel)
+    return reelstrip
+
+
+class SimTestConfig(Config):
+    """Five reel, three row lines game with a free-game feature."""
+
+    def __init__(self, game_id: str = "0_sim_test"):
+        super().__init__()
+        self.game_id = game_id
+        self.wincap = 1000.0
+        self.win_type = "lines"
+        self.num_reels = 5
+        self.num_rows = [3] * self.num_reels
+        self.output_regular_json = False
+        self.paytable = {
+            (5, "W"): 20,
+            (4, "W"): 10,
+            (3, "W"): 5,
+            (5, "H1"): 10,
+            (4, "H1"): 5,
+            (3, "H1"): 2,
+            (5, "H2"): 5,
+            (4, "H2"): 2,
+            (3, "H2"): 1,
+            (5, "L1"): 2,
+            (4, "L1"): 1,
+            (3, "L1"): 0.5,
+            (5, "L2"): 1,
+            (4, "L2"): 0.5,
+            (3, "L2"): 0.2,
+        }
+        self.paylines = {1: [0, 0, 0, 0, 0], 2: [1, 1, 1, 1, 1], 3: [2, 2, 2, 2, 2], 4: [0, 1, 2, 1, 0]}
+        self.include_padding = True
+        self.special_symbols = {"wild": ["W"], "scatter": ["S"], "multiplier": ["W"]}
+        self.freespin_triggers = {
+            self.basegame_type: {3: 5, 4: 8, 5: 10},
+            self.freegame_type: {2: 2, 3: 3, 4: 4, 5: 5},
+        }
+        self.anticipation_triggers = {
+            self.basegame_type: min(self.freespin_triggers[self.basegame_type].keys()) - 1,
+            self.freegame_type: min(self.freespin_triggers[self.freegame_type].keys()) - 1,
+        }
+        self.reels = {"BR0": make_reelstrip(1), "FR0": make_reelstrip(2, scatter_spacing=0)}
+
+        freegame_condition = {
+            "reel_weights": {self.basegame_type: {"BR0": 1}, self.freegame_type: {"FR0": 1}},
+            "scatter_triggers": {3: 10, 4: 3, 5: 1},
+            "force_freegame": True,
+        }
+        basegame_condition = {"reel_weights": {self.basegame_type: {"BR0": 1}}, "force_freegame": False}
+        self.bet_modes = [
+            BetMode(
+                name="base",
+                cost=1.0,
+                rtp=0.97,
+                max_win=self.wincap,
+                auto_close_disabled=False,
+                is_feature=True,
+                is_buybonus=False,
+                distributions=[
+                    Distribution(criteria="freegame", quota=0.1, conditions=dict(freegame_condition)),
+                    Distribution(criteria="0", quota=0.4, win_criteria=0.0, conditions=dict(basegame_condition)),
+                    Distribution(criteria="basegame", quota=0.5, conditions=dict(basegame_condition)),
+                ],
+            ),
+            BetMode(
+                name="bonus",
+                cost=50.0,
+                rtp=0.97,
+                max_win=self.wincap,
+                auto_close_disabled=False,
+                is_feature=False,
+                is_buybonus=True,
+                distributions=[Distribution(criteria="freegame", quota=1, conditions=dict(freegame_condition))],
+            ),
+        ]
+
+
+class SimTestGameState(Executables):
+    """Lines-pays game logic with free-spin retriggers."""
+
+    def assign_special_sym_function(self):
+        self.special_symbol_functions = {}
+
+    def evaluate_lines_board(self):
+        """Populate win-data, record wins, transmit events."""
+        self.win_data = Lines.get_lines(self.board, self.config, global_multiplier=self.global_multiplier)
+        Lines.record_lines_wins(self)
+        self.win_manager.update_spinwin(self.win_data["totalWin"])
+        Lines.emit_linewin_events(self)
+
+    def run_spin(self, sim, simulation_seed=None):
+        self.reset_seed(sim)
+        self.repeat = True
+        while self.repeat:
+            self.reset_book()
+            self.draw_board()
+            self.evaluate_lines_board()
+            self.win_manager.update_gametype_wins(self.gametype)
+            if self.check_fs_condition():
+                self.run_freespin_from_base()
+            self.evaluate_finalwin()
+            self.check_repeat()
+        self.imprint_wins()
+
+    def run_freespin(self):
+        self.reset_fs_spin()
+        while self.fs < self.tot_fs:
+            self.update_freespin()
+            self.draw_board()
+            self.evaluate_lines_board()
+            if self.check_fs_condition():
+                self.update_fs_retrigger_amt()
+            self.win_manager.update_gametype_wins(self.gametype)
+        self.end_freespin()
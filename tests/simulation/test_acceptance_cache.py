@@ -0,0 +1,54 @@
+"""Test that re-runs replaying cached accepted attempts reproduce the same books."""
+
+import json
+import pytest
+import src.config.output_filenames as output_filenames
+from src.state.run_sims import create_books
+from src.state.run_options import RunOptions
+from tests.simulation.sim_test_game import SimTestConfig, SimTestGameState
+from tests.simulation.test_deterministic_output import NUM_SIM_ARGS, BATCH_SIZE, run_books, read_outputs
+
+
+def run_cached_books(games_path, threads: int, config: SimTestConfig = None) -> dict:
+    """Simulate with the acceptance cache enabled, returning outputs (without the cache itself) and run metrics."""
+    config = config or SimTestConfig()
+    gamestate = SimTestGameState(config)
+    create_books(
+        gamestate, config, dict(NUM_SIM_ARGS), BATCH_SIZE, threads, True, False,
+        RunOptions(acceptance_cache=True, acceptance_min_repeats=1),
+    )  # fmt: skip
+    with open(games_path / "0_sim_test" / "library" / "simulation_metrics.json", "r", encoding="UTF-8") as f:
+        metrics = json.load(f)["betmodes"]
+    outputs = {name: content for name, content in read_outputs(str(games_path)).items() if "acceptance" not in name}
+    return outputs, metrics
+
+
+@pytest.mark.parametrize("threads", [1, 3])
+def test_replayed_books_match(tmp_path, monkeypatch, threads):
+    "A second run skips rejected attempts and writes the same outputs as an uncached run."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path / "reference"))
+    reference = run_books(str(tmp_path / "reference"), threads=1)
+
+    games_path = tmp_path / "cached"
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(games_path))
+    first_outputs, first_metrics = run_cached_books(games_path, threads=1)
+    second_outputs, second_metrics = run_cached_books(games_path, threads=threads)
+    assert first_outputs == second_outputs == reference
+
+    assert first_metrics["base"]["skipped_attempts"] == 0
+    assert second_metrics["base"]["skipped_attempts"] > 0
+    assert second_metrics["base"]["attempts"] == first_metrics["base"]["attempts"]
+    assert (games_path / "0_sim_test" / "library" / "acceptance_cache" / "acceptance_base.json").is_file()
+
+
+def test_config_change_invalidates_cache(tmp_path, monkeypatch):
+    "Changing the paytable discards cached attempts instead of replaying them."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path))
+    run_cached_books(tmp_path, threads=1)
+
+    config = SimTestConfig()
+    config.paytable[(5, "W")] = 25
+    _, metrics = run_cached_books(tmp_path, threads=1, config=config)
+    assert metrics["base"]["skipped_attempts"] == 0
+    _, metrics = run_cached_books(tmp_path, threads=1, config=config)
+    assert metrics["base"]["skipped_attempts"] > 0
@@ -0,0 +1,42 @@
+"""Test that bet-modes are simulated while earlier bet-modes are still being merged."""
+
+import os
+import json
+import time
+import threading
+import pytest
+import src.config.output_filenames as output_filenames
+import src.state.run_sims as run_sims
+from src.state.run_sims import create_books
+from tests.simulation.sim_test_game import SimTestConfig, SimTestGameState
+from tests.simulation.test_deterministic_output import NUM_SIM_ARGS, BATCH_SIZE
+
+
+@pytest.mark.parametrize("threads", [1, 3])
+def test_next_betmode_starts_during_merge(tmp_path, monkeypatch, threads):
+    "bonus is started before the base merge finishes, force.json still lists bet-modes in the requested order."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path))
+    timeline = []
+    output_lookup_and_force_files = run_sims.output_lookup_and_force_files
+    start_betmode_sims = run_sims.start_betmode_sims
+
+    def slow_merge(game_id, betmode, *args, **kwargs):
+        assert threading.current_thread() is not threading.main_thread()
+        time.sleep(0.5)
+        force_options = output_lookup_and_force_files(game_id, betmode, *args, **kwargs)
+        timeline.append(("merged", betmode))
+        return force_options
+
+    def recorded_start(gamestate, batching_size, game_id, betmode, **kwargs):
+        timeline.append(("started", betmode))
+        return start_betmode_sims(gamestate, batching_size, game_id, betmode, **kwargs)
+
+    monkeypatch.setattr(run_sims, "output_lookup_and_force_files", slow_merge)
+    monkeypatch.setattr(run_sims, "start_betmode_sims", recorded_start)
+    config = SimTestConfig()
+    num_sim_args = {"bonus": NUM_SIM_ARGS["bonus"], "base": NUM_SIM_ARGS["base"]}
+    create_books(SimTestGameState(config), config, num_sim_args, BATCH_SIZE, threads, True, False)
+
+    assert timeline.index(("started", "base")) < timeline.index(("merged", "bonus"))
+    with open(os.path.join(tmp_path, config.game_id, "library", "forces", "force.json"), "r", encoding="UTF-8") as f:
+        assert list(json.load(f)) == ["bonus", "base"]
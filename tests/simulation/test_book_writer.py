@@ -0,0 +1,73 @@
+"""Test books streamed as simulations finish, in the worker or in dedicated writer processes."""
+
+import json
+import pytest
+import zstandard as zstd
+import src.config.output_filenames as output_filenames
+from src.state.books import BookSummary
+from src.state.run_sims import create_books, assign_sim_criteria
+from src.state.run_options import RunOptions
+from tests.simulation.sim_test_game import SimTestConfig, SimTestGameState
+from tests.simulation.test_deterministic_output import NUM_SIM_ARGS, BATCH_SIZE, read_outputs
+
+
+def run_books(games_path: str, threads: int, compress: bool, regular_json: bool, book_writers: int = 0) -> tuple:
+    config = SimTestConfig()
+    config.output_regular_json = regular_json
+    gamestate = SimTestGameState(config)
+    options = RunOptions(book_writers=book_writers)
+    create_books(gamestate, config, dict(NUM_SIM_ARGS), BATCH_SIZE, threads, compress, False, options)
+    with open(gamestate.output_files.get_simulation_metrics_name(), "r", encoding="UTF-8") as f:
+        bytes_written = {betmode: mode["bytes_written"] for betmode, mode in json.load(f)["betmodes"].items()}
+    return read_outputs(games_path), bytes_written
+
+
+@pytest.mark.parametrize("compress,regular_json", [(True, False), (False, False), (False, True)])
+def test_streamed_books_match_in_process_writes(tmp_path, monkeypatch, compress, regular_json):
+    "Books, lookup tables, force and event files and the bytes written match a single-process run for any writers."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path / "reference"))
+    reference, reference_bytes = run_books(str(tmp_path / "reference"), 1, compress, regular_json)
+
+    for book_writers in (1, 2):
+        games_path = tmp_path / f"writers_{book_writers}"
+        monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(games_path))
+        outputs, bytes_written = run_books(str(games_path), 3, compress, regular_json, book_writers)
+        assert bytes_written == reference_bytes and all(num_bytes > 0 for num_bytes in bytes_written.values())
+        assert sorted(outputs) == sorted(reference)
+        for name, content in reference.items():
+            assert outputs[name] == content, f"{name} differs with {book_writers} book writers"
+
+
+class RecordingGameState(SimTestGameState):
+    """Test game which keeps a copy of every finished book, as the library dict used to."""
+
+    def __init__(self, config):
+        self.imprinted_books = []
+        super().__init__(config)
+
+    def imprint_wins(self):
+        super().imprint_wins()
+        self.imprinted_books.append(self.finished_book)
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_chunk_books_are_streamed_without_a_library(tmp_path, monkeypatch, compress):
+    "A chunk's book file holds every finished book in order, only their lookup table summaries are kept."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path))
+    config = SimTestConfig()
+    gamestate = RecordingGameState(config)
+    sim_allocation = assign_sim_criteria(gamestate, NUM_SIM_ARGS["base"], "base", False)
+    gamestate.run_sims([], "base", sim_allocation, 0, NUM_SIM_ARGS["base"], 0, compress)
+
+    assert gamestate.finished_book is None and not hasattr(gamestate, "library")
+    assert len(gamestate.book_summaries) == len(gamestate.imprinted_books) == NUM_SIM_ARGS["base"]
+    for summary, book in zip(gamestate.book_summaries.values(), gamestate.imprinted_books):
+        assert isinstance(summary, BookSummary)
+        assert summary.id == book["id"] and summary.payout_multiplier == book["payoutMultiplier"]
+
+    with open(gamestate.output_files.get_temp_multi_thread_name("base", 0, compress), "rb") as f:
+        data = f.read()
+    if compress:
+        data = zstd.ZstdDecompressor().decompressobj().decompress(data)
+    expected = "\n".join(json.dumps(book) for book in gamestate.imprinted_books) + "\n"
+    assert data.decode("UTF-8") == expected
@@ -0,0 +1,80 @@
+"""Test worker CPU placement plans and pinned create_books runs."""
+
+import os
+import json
+import pytest
+import src.config.output_filenames as output_filenames
+from src.state.run_sims import create_books
+from src.state.run_options import RunOptions
+from src.state.cpu_placement import parse_cpu_list, plan_worker_placement
+from tests.simulation.sim_test_game import SimTestConfig, SimTestGameState
+from tests.simulation.test_deterministic_output import NUM_SIM_ARGS, BATCH_SIZE
+
+NUMA_NODES = {0: [0, 1, 2, 3], 1: [4, 5, 6, 7]}
+
+
+def plan(threads, cpu_affinity="round_robin", **kwargs):
+    return plan_worker_placement(threads, cpu_affinity, available_cpus=list(range(8)), numa_nodes=NUMA_NODES, **kwargs)
+
+
+def test_parse_cpu_list():
+    assert parse_cpu_list("0-3,8,10-11\n") == [0, 1, 2, 3, 8, 10, 11]
+
+
+def test_round_robin_reserves_parent_cpu():
+    placement = plan(9, reserve_parent_cpu=True)
+    assert placement["parent"] == [0]
+    assert [cpus[0] for cpus in placement["workers"]] == [1, 2, 3, 4, 5, 6, 7, 1, 2]
+    assert placement["worker_numa_nodes"][:4] == [0, 0, 0, 1]
+
+
+def test_max_workers_per_numa_node():
+    placement = plan(4, max_workers_per_numa_node=2)
+    assert [cpus[0] for cpus in placement["workers"]] == [0, 1, 4, 5]
+    with pytest.raises(ValueError, match="do not fit"):
+        plan(5, max_workers_per_numa_node=2)
+
+
+def test_explicit_cpu_list():
+    assert [cpus[0] for cpus in plan(3, [6, 2])["workers"]] == [6, 2, 6]
+    with pytest.raises(ValueError, match="not available"):
+        plan(2, [0, 9])
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="CPU affinity is Linux only")
+def test_pinned_run_records_placement(tmp_path, monkeypatch):
+    "Workers are pinned round-robin over the available CPUs and the plan is written to the metrics."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path))
+    config = SimTestConfig()
+    affinity = os.sched_getaffinity(0)
+    options = RunOptions(cpu_affinity="round_robin")
+    create_books(SimTestGameState(config), config, dict(NUM_SIM_ARGS), BATCH_SIZE, 2, True, False, options)
+    assert os.sched_getaffinity(0) == affinity
+    with open(os.path.join(tmp_path, config.game_id, "library", "simulation_metrics.json"), "r", encoding="UTF-8") as f:
+        placement = json.load(f)["run"]["placement"]
+    assert placement["parent"] is None
+    assert len(placement["workers"]) == 2 and all(cpus[0] in affinity for cpus in placement["workers"])
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="CPU affinity is Linux only")
+def test_single_thread_run_pins_main_process(tmp_path, monkeypatch):
+    "With one thread the main process is pinned as the worker, options which need a worker pool warn."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path))
+    config = SimTestConfig()
+    affinity = os.sched_getaffinity(0)
+    cpu = max(affinity)
+    with pytest.warns(UserWarning, match="ignored with threads=1"):
+        create_books(
+            SimTestGameState(config),
+            config,
+            dict(NUM_SIM_ARGS),
+            BATCH_SIZE,
+            1,
+            True,
+            False,
+            RunOptions(cpu_affinity=[cpu], reserve_parent_cpu=True),
+        )
+    assert os.sched_getaffinity(0) == affinity
+    with open(os.path.join(tmp_path, config.game_id, "library", "simulation_metrics.json"), "r", encoding="UTF-8") as f:
+        placement = json.load(f)["run"]["placement"]
+    assert placement["parent"] is None and placement["workers"] == [[cpu]]
@@ -0,0 +1,99 @@
+"""Test criteria samplers re-using reel stops harvested from accepted books."""
+
+import os
+import json
+import shutil
+import pytest
+import zstandard as zstd
+import src.config.output_filenames as output_filenames
+from src.config.distributions import Distribution
+from src.state.run_sims import create_books
+from src.state.run_options import RunOptions
+from src.state.profiling import profile_single_sim
+from src.state.criteria_sampler import HarvestedStopSampler
+from tests.simulation.sim_test_game import SimTestConfig, SimTestGameState
+from tests.simulation.test_deterministic_output import NUM_SIM_ARGS, BATCH_SIZE, read_outputs
+
+
+class SamplerTestConfig(SimTestConfig):
+    """Test game whose zero-win criteria re-uses harvested base game reel stops."""
+
+    def __init__(self):
+        super().__init__()
+        for distribution in self.bet_modes[0].get_distributions():
+            if distribution.get_criteria() == "0":
+                distribution._sampler = HarvestedStopSampler(explore=0.2)
+
+
+def run_sampled_books(games_path, threads: int, slow_sims: int = 0) -> tuple:
+    config = SamplerTestConfig()
+    gamestate = SimTestGameState(config)
+    options = RunOptions(slow_sims=slow_sims)
+    create_books(gamestate, config, dict(NUM_SIM_ARGS), BATCH_SIZE, threads, True, False, options)
+    with open(os.path.join(games_path, config.game_id, "library", "books", "rejection_stats_base.json"), "rb") as f:
+        rejection_stats = json.load(f)["criteria"]
+    with open(gamestate.output_files.get_final_segmented_name("base"), "r", encoding="UTF-8") as f:
+        criteria = {int(row.split(",")[0]): row.split(",")[1] for row in f}
+    return gamestate, rejection_stats, criteria
+
+
+def read_books(gamestate: object, betmode: str) -> dict:
+    """Final compressed books of a bet-mode, by book id."""
+    with open(gamestate.output_files.get_final_book_name(betmode, True), "rb") as f:
+        data = zstd.ZstdDecompressor().decompressobj().decompress(f.read())
+    return {book["id"]: book for book in map(json.loads, data.decode("UTF-8").splitlines())}
+
+
+def test_harvested_stops_reduce_rejections(tmp_path, monkeypatch):
+    """
+    Without a harvest, books are unchanged. Later runs re-use the harvested stops, with fewer rejected attempts,
+    independent of the number of threads, and can be replayed under the profiler.
+    """
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path / "reference"))
+    config = SimTestConfig()
+    create_books(SimTestGameState(config), config, dict(NUM_SIM_ARGS), BATCH_SIZE, 1, True, False)
+    reference = read_outputs(str(tmp_path / "reference"))
+
+    games_path = tmp_path / "sampled"
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(games_path))
+    gamestate, first_stats, criteria = run_sampled_books(games_path, threads=1)
+    outputs = read_outputs(str(games_path))
+    for name, content in reference.items():
+        assert outputs[name] == content, f"{name} differs without a harvest"
+    with open(gamestate.output_files.get_stop_harvest_name("base"), "r", encoding="UTF-8") as f:
+        windows = json.load(f)["windows"]
+    assert list(windows) == ["0:basegame:BR0"] and len(windows["0:basegame:BR0"]) > 0
+
+    shutil.copytree(games_path, tmp_path / "sampled_threads")
+    _, second_stats, criteria = run_sampled_books(games_path, threads=1, slow_sims=1)
+    outputs = {
+        name: content
+        for name, content in read_outputs(str(games_path)).items()
+        if "harvest" not in name and "slow_sims" not in name
+    }
+    assert second_stats["0"]["mean_repeats"] < first_stats["0"]["mean_repeats"]
+    with open(gamestate.output_files.get_final_lookup_name("base"), "r", encoding="UTF-8") as f:
+        assert all(row.split(",")[2].strip() == "0" for row in f if criteria[int(row.split(",")[0])] == "0")
+
+    # The harvest was extended by the second run, replays propose from the harvest as that run loaded it.
+    with open(gamestate.output_files.get_slow_sims_name("base"), "r", encoding="UTF-8") as f:
+        harvest_sizes = json.load(f)["harvest_sizes"]
+    books = read_books(gamestate, "base")
+    for book_id in sorted(book_id for book_id, c in criteria.items() if c == "0")[:5]:
+        replay = SimTestGameState(SamplerTestConfig())
+        profile_single_sim(replay, "base", book_id, book_id, "0", top_n=5, harvest_sizes=harvest_sizes)
+        assert json.loads(json.dumps(replay.finished_book)) == books[book_id]
+
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path / "sampled_threads"))
+    run_sampled_books(tmp_path / "sampled_threads", threads=3)
+    threaded = read_outputs(str(tmp_path / "sampled_threads"))
+    for name, content in outputs.items():
+        assert threaded[name] == content, f"{name} differs with 3 threads"
+
+
+def test_samplers_require_fixed_payout():
+    "Samplers are only allowed on distributions whose books all have the same payout."
+    conditions = {"reel_weights": {"basegame": {"BR0": 1}}}
+    Distribution(criteria="0", quota=0.4, win_criteria=0.0, conditions=dict(conditions), sampler=HarvestedStopSampler())
+    with pytest.raises(AssertionError):
+        Distribution(criteria="basegame", quota=0.6, conditions=dict(conditions), sampler=HarvestedStopSampler())
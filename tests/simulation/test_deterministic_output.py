@@ -0,0 +1,48 @@
+"""Test that create_books output is byte-identical for any number of worker processes."""
+
+import os
+import pytest
+import src.config.output_filenames as output_filenames
+from src.state.run_sims import create_books
+from tests.simulation.sim_test_game import SimTestConfig, SimTestGameState
+
+NUM_SIM_ARGS = {"base": 600, "bonus": 130}
+BATCH_SIZE = 50
+
+
+def run_books(games_path: str, threads: int, compress: bool = True) -> dict:
+    """Simulate the test game into games_path, returning {relative filename: file bytes}."""
+    config = SimTestConfig()
+    gamestate = SimTestGameState(config)
+    create_books(gamestate, config, dict(NUM_SIM_ARGS), BATCH_SIZE, threads, compress, False)
+    return read_outputs(games_path)
+
+
+def read_outputs(games_path: str) -> dict:
+    """Return {relative filename: file bytes} for every file below games_path, excluding timing metrics."""
+    outputs = {}
+    for root, _, files in os.walk(games_path):
+        for filename in files:
+            if filename.startswith(("simulation_metrics", "rejection_stats")):
+                continue
+            path = os.path.join(root, filename)
+            with open(path, "rb") as f:
+                outputs[os.path.relpath(path, games_path)] = f.read()
+    return outputs
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_output_independent_of_threads(tmp_path, monkeypatch, compress):
+    "Books, lookup tables, force and event files match the single-process run."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path / "reference"))
+    reference = run_books(str(tmp_path / "reference"), threads=1, compress=compress)
+    assert any(name.endswith("force.json") for name in reference)
+    assert any("event_config_base" in name for name in reference)
+
+    for threads in (4, 16, 64):
+        games_path = tmp_path / f"threads_{threads}"
+        monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(games_path))
+        outputs = run_books(str(games_path), threads=threads, compress=compress)
+        assert sorted(outputs) == sorted(reference)
+        for name, content in reference.items():
+            assert outputs[name] == content, f"{name} differs with {threads} threads"
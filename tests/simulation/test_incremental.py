@@ -0,0 +1,46 @@
+"""Test that incremental create_books runs only re-simulate changed bet-modes."""
+
+import os
+import json
+import src.config.output_filenames as output_filenames
+from src.state.run_sims import create_books
+from src.state.run_options import RunOptions
+from tests.simulation.sim_test_game import SimTestConfig, SimTestGameState
+from tests.simulation.test_deterministic_output import NUM_SIM_ARGS, BATCH_SIZE, read_outputs
+
+
+def run_incremental(num_sim_args: dict) -> dict:
+    """Run create_books incrementally, returning the run details of the simulation metrics."""
+    config = SimTestConfig()
+    gamestate = SimTestGameState(config)
+    create_books(gamestate, config, dict(num_sim_args), BATCH_SIZE, 2, True, False, RunOptions(incremental=True))
+    with open(gamestate.output_files.get_simulation_metrics_name(), "r", encoding="UTF-8") as f:
+        return json.load(f)["run"]
+
+
+def test_unchanged_betmodes_are_skipped(tmp_path, monkeypatch):
+    "A repeated run skips every bet-mode, changing one bet-mode's simulation count only re-simulates that mode."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path))
+    assert run_incremental(NUM_SIM_ARGS)["skipped_betmodes"] == []
+    reference = read_outputs(str(tmp_path))
+
+    assert run_incremental(NUM_SIM_ARGS)["skipped_betmodes"] == ["base", "bonus"]
+    outputs = read_outputs(str(tmp_path))
+    for name, content in reference.items():
+        if not name.endswith("build_cache.json"):
+            assert outputs[name] == content, f"{name} changed by a skipped run"
+
+    assert run_incremental({**NUM_SIM_ARGS, "bonus": 150})["skipped_betmodes"] == ["base"]
+    with open(os.path.join(tmp_path, SimTestConfig().game_id, "library", "forces", "force.json"), "rb") as f:
+        assert json.loads(f.read()).keys() == {"base", "bonus"}
+
+
+def test_modified_output_is_rebuilt(tmp_path, monkeypatch):
+    "A bet-mode is simulated again if one of its outputs was changed since it was built."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path))
+    run_incremental(NUM_SIM_ARGS)
+    config = SimTestConfig()
+    gamestate = SimTestGameState(config)
+    with open(gamestate.output_files.get_final_lookup_name("base"), "a", encoding="UTF-8") as f:
+        f.write("0,1,0\n")
+    assert run_incremental(NUM_SIM_ARGS)["skipped_betmodes"] == ["bonus"]
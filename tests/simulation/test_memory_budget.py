@@ -0,0 +1,37 @@
+"""Test batch sizes chosen from a memory budget."""
+
+import os
+import json
+import pytest
+import src.config.output_filenames as output_filenames
+import src.state.memory_budget as memory_budget
+from src.state.run_sims import create_books
+from src.state.run_options import RunOptions
+from src.state.memory_budget import get_budget_batch_size
+from tests.simulation.sim_test_game import SimTestConfig, SimTestGameState
+from tests.simulation.test_deterministic_output import NUM_SIM_ARGS, BATCH_SIZE, run_books, read_outputs
+
+
+def test_budget_batch_size():
+    assert get_budget_batch_size(100, 4, 1e4, baseline_bytes=20e6) == 2000
+    with pytest.raises(ValueError, match="cannot hold one book"):
+        get_budget_batch_size(1, 4, 1e6)
+
+
+def test_memory_budget_run_matches_fixed_batches(tmp_path, monkeypatch):
+    "A small budget shrinks the calibrated batch sizes, outputs are unchanged."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path / "reference"))
+    reference = run_books(str(tmp_path / "reference"), threads=1)
+
+    games_path = tmp_path / "budget"
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(games_path))
+    monkeypatch.setattr(memory_budget, "get_process_memory", lambda pid: {})
+    config = SimTestConfig()
+    options = RunOptions(memory_budget_mb=0.02)
+    create_books(SimTestGameState(config), config, dict(NUM_SIM_ARGS), BATCH_SIZE, 2, True, False, options)
+    assert read_outputs(str(games_path)) == reference
+
+    with open(os.path.join(games_path, config.game_id, "library", "simulation_metrics.json"), "r", encoding="UTF-8") as f:
+        batch_sizes = json.load(f)["run"]["batch_sizes"]
+    assert sorted(batch_sizes) == sorted(NUM_SIM_ARGS)
+    assert all(0 < size < BATCH_SIZE for size in batch_sizes.values())
@@ -0,0 +1,44 @@
+"""Test pre-fork freezing of read-only game data and worker memory reporting."""
+
+import os
+import json
+import sys
+import src.config.output_filenames as output_filenames
+from src.state.run_sims import create_books
+from src.state.run_options import RunOptions
+from src.state.prefork import freeze_reelstrips
+from tests.simulation.sim_test_game import SimTestConfig, SimTestGameState
+from tests.simulation.test_deterministic_output import NUM_SIM_ARGS, BATCH_SIZE, run_books, read_outputs
+
+
+def test_freeze_reelstrips_interns_and_shares():
+    "Symbols are interned and reelstrips referenced twice stay a single object."
+    reelstrip = [["".join(["H", "1"]), "L1"]]
+    memo = {}
+    reels = freeze_reelstrips({"BR0": reelstrip}, memo)
+    padding_reels = freeze_reelstrips({"basegame": reelstrip}, memo)
+    assert reels["BR0"] == (("H1", "L1"),)
+    assert reels["BR0"][0][0] is sys.intern("H1")
+    assert padding_reels["basegame"] is reels["BR0"]
+
+
+def test_prefork_freeze_output_and_memory_metrics(tmp_path, monkeypatch):
+    "Outputs match an unfrozen run, the parent keeps its reels and memory of every worker is recorded."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path / "reference"))
+    reference = run_books(str(tmp_path / "reference"), threads=1)
+
+    games_path = tmp_path / "frozen"
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(games_path))
+    config = SimTestConfig()
+    reels, padding_reels = config.reels, config.padding_reels
+    options = RunOptions(prefork_freeze=True)
+    create_books(SimTestGameState(config), config, dict(NUM_SIM_ARGS), BATCH_SIZE, 2, True, False, options)
+    assert read_outputs(str(games_path)) == reference
+    assert config.reels is reels and config.padding_reels is padding_reels
+
+    with open(os.path.join(games_path, config.game_id, "library", "simulation_metrics.json"), "r", encoding="UTF-8") as f:
+        run_details = json.load(f)["run"]
+    assert run_details["prefork_freeze"] is True
+    assert sorted(run_details["worker_memory"]) == ["0", "1"]
+    for memory in run_details["worker_memory"].values():
+        assert memory["private"] > 0 and memory["shared"] > 0
@@ -0,0 +1,48 @@
+"""Test merged multi-process profiles written by create_books."""
+
+import os
+import pstats
+import pytest
+import src.config.output_filenames as output_filenames
+from src.state.run_sims import create_books
+from src.state.run_options import RunOptions
+from src.state.worker_pool import SimulationPool
+from tests.simulation.sim_test_game import SimTestConfig, SimTestGameState
+from tests.simulation.test_deterministic_output import NUM_SIM_ARGS, BATCH_SIZE
+
+
+SIMULATION_POOL_SHUTDOWN = SimulationPool.shutdown
+
+
+def terminating_shutdown(pool: SimulationPool) -> None:
+    "Terminate workers without letting them exit, as shutdown does with workers which do not stop in time."
+    for process in pool.processes:
+        process.terminate()
+        process.join()
+    SIMULATION_POOL_SHUTDOWN(pool)
+
+
+@pytest.mark.parametrize("threads,terminate", [(1, False), (3, False), (3, True)])
+def test_headless_profile_merges_all_processes(tmp_path, monkeypatch, threads, terminate):
+    "Each bet-mode profile includes every run_sims call, whichever process ran it, even if workers are terminated."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path))
+    if terminate:
+        monkeypatch.setattr(SimulationPool, "shutdown", terminating_shutdown)
+    config = SimTestConfig()
+    gamestate = SimTestGameState(config)
+    options = RunOptions(profile_headless=True, profile_top_n=5)
+    create_books(gamestate, config, dict(NUM_SIM_ARGS), BATCH_SIZE, threads, True, True, options)
+
+    expected_chunks = {"base": 12, "bonus": 3}
+    for betmode, num_chunks in expected_chunks.items():
+        profile_name = os.path.join(tmp_path, config.game_id, f"simulationProfile_{betmode}.prof")
+        stats = pstats.Stats(profile_name).stats
+        run_sims_calls = [stat[1] for (_, _, func), stat in stats.items() if func == "run_sims"]
+        assert run_sims_calls == [num_chunks]
+        merge_calls = [stat[1] for (_, _, func), stat in stats.items() if func == "output_lookup_and_force_files"]
+        assert merge_calls == [1]
+
+        with open(profile_name.replace(".prof", ".txt"), "r", encoding="UTF-8") as f:
+            report = f.read()
+        assert "Top 5 functions by cumulative time" in report
+        assert "Top 5 functions by internal time" in report
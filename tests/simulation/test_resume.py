@@ -0,0 +1,88 @@
+"""Test resuming an interrupted create_books run from the run manifest."""
+
+import os
+import json
+import pytest
+import src.config.output_filenames as output_filenames
+from src.state.run_sims import create_books
+from src.state.run_options import RunOptions
+from tests.simulation.sim_test_game import SimTestConfig, SimTestGameState
+from tests.simulation.test_deterministic_output import NUM_SIM_ARGS, BATCH_SIZE, run_books, read_outputs
+
+FAIL_CHUNK = 5
+
+
+class CountingGameState(SimTestGameState):
+    """Records which chunks are simulated, optionally failing on a given chunk."""
+
+    fail_chunk = None
+
+    def run_sims(self, betmode_copy_list, betmode, sim_allocation, sim_start, sim_end, chunk_index, **kwargs):
+        if betmode == "base" and chunk_index == self.fail_chunk:
+            raise RuntimeError("simulated crash")
+        self.chunks_run = getattr(self, "chunks_run", []) + [(betmode, chunk_index)]
+        super().run_sims(betmode_copy_list, betmode, sim_allocation, sim_start, sim_end, chunk_index, **kwargs)
+
+
+def interrupted_run() -> str:
+    """Single-process run failing part way through the base mode, returns the manifest path."""
+    config = SimTestConfig()
+    gamestate = CountingGameState(config)
+    gamestate.fail_chunk = FAIL_CHUNK
+    with pytest.raises(RuntimeError, match="simulated crash"):
+        create_books(gamestate, config, dict(NUM_SIM_ARGS), BATCH_SIZE, 1, True, False)
+    assert gamestate.chunks_run == [("base", idx) for idx in range(FAIL_CHUNK)]
+    return gamestate.output_files.get_run_manifest_name()
+
+
+def resume_run(threads: int = 1) -> list:
+    """Resume the interrupted run, returning chunks simulated by the parent process."""
+    config = SimTestConfig()
+    gamestate = CountingGameState(config)
+    create_books(gamestate, config, dict(NUM_SIM_ARGS), BATCH_SIZE, threads, True, False, RunOptions(resume=True))
+    return getattr(gamestate, "chunks_run", [])
+
+
+def test_resume_skips_completed_chunks(tmp_path, monkeypatch):
+    "Only unfinished chunks are simulated on resume, and outputs match an uninterrupted run."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path / "reference"))
+    reference = run_books(str(tmp_path / "reference"), threads=1)
+
+    games_path = tmp_path / "resumed"
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(games_path))
+    manifest_path = interrupted_run()
+    with open(manifest_path, "r", encoding="UTF-8") as f:
+        assert sorted(json.load(f)["modes"]["base"]["chunks"], key=int) == [str(i) for i in range(FAIL_CHUNK)]
+
+    chunks_run = resume_run()
+    assert ("base", 0) not in chunks_run
+    assert [idx for mode, idx in chunks_run if mode == "base"] == list(range(FAIL_CHUNK, 12))
+    assert not os.path.exists(os.path.dirname(manifest_path))
+    assert read_outputs(games_path) == reference
+
+
+def test_resume_reruns_modified_chunks(tmp_path, monkeypatch):
+    "Chunks whose temp files no longer match the recorded checksum are simulated again."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path / "reference"))
+    reference = run_books(str(tmp_path / "reference"), threads=1)
+
+    games_path = tmp_path / "resumed"
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(games_path))
+    manifest_path = interrupted_run()
+    temp_path = os.path.dirname(manifest_path)
+    with open(os.path.join(temp_path, "lookUpTable_base_2"), "a", encoding="UTF-8") as f:
+        f.write("corrupt\n")
+
+    chunks_run = resume_run(threads=2)
+    assert chunks_run == []  # all remaining chunks are run within the worker processes
+    assert read_outputs(games_path) == reference
+
+
+def test_no_resume_starts_fresh(tmp_path, monkeypatch):
+    "Without resume=True any existing manifest is discarded."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path))
+    interrupted_run()
+    config = SimTestConfig()
+    gamestate = CountingGameState(config)
+    create_books(gamestate, config, dict(NUM_SIM_ARGS), BATCH_SIZE, 1, True, False)
+    assert [idx for mode, idx in gamestate.chunks_run if mode == "base"] == list(range(12))
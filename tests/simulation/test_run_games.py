@@ -0,0 +1,80 @@
+"""Test that games simulated on a shared worker pool match separate create_books runs."""
+
+import os
+import json
+import threading
+import src.config.output_filenames as output_filenames
+from src.state.run_sims import create_books
+from src.state.run_games import run_games
+from tests.simulation.sim_test_game import SimTestConfig, SimTestGameState
+from tests.simulation.test_deterministic_output import NUM_SIM_ARGS, BATCH_SIZE, read_outputs
+
+GAME_IDS = ["0_sim_test_a", "0_sim_test_b"]
+
+
+def test_shared_pool_matches_separate_runs(tmp_path, monkeypatch):
+    "Books, lookup tables and force files of every game are unchanged, stage timings are reported for each game."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path / "reference"))
+    for game_id in GAME_IDS:
+        config = SimTestConfig(game_id)
+        create_books(SimTestGameState(config), config, dict(NUM_SIM_ARGS), BATCH_SIZE, 1, True, False)
+    reference = read_outputs(str(tmp_path / "reference"))
+
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path / "shared"))
+    gamestates = [SimTestGameState(SimTestConfig(game_id)) for game_id in GAME_IDS]
+    report_name = str(tmp_path / "report.json")
+    report = run_games(
+        gamestates,
+        {game_id: dict(NUM_SIM_ARGS) for game_id in GAME_IDS},
+        BATCH_SIZE,
+        cores=4,
+        run_configs=False,
+        report_name=report_name,
+    )
+    outputs = read_outputs(str(tmp_path / "shared"))
+    assert sorted(outputs) == sorted(reference)
+    for name, content in reference.items():
+        assert outputs[name] == content, f"{name} differs on the shared pool"
+
+    with open(report_name, "r", encoding="UTF-8") as f:
+        assert json.load(f) == report
+    assert report["threads"] == 3
+    for game_id in GAME_IDS:
+        assert sorted(report["games"][game_id]["betmodes"]) == ["base", "bonus"]
+        for betmode in report["games"][game_id]["betmodes"].values():
+            assert betmode["merge"]["start"] >= betmode["simulation"]["end"]
+        assert not os.path.exists(os.path.join(tmp_path, "shared", game_id, "library", "temp_multi_threaded_files"))
+
+
+def test_concurrent_merges_of_one_game(tmp_path, monkeypatch):
+    "Bet-modes of very different sizes merged on separate post workers do not share temp files."
+    num_sim_args = {"base": 1500, "bonus": 50}
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path / "reference"))
+    config = SimTestConfig()
+    create_books(SimTestGameState(config), config, dict(num_sim_args), BATCH_SIZE, 1, True, False)
+    reference = read_outputs(str(tmp_path / "reference"))
+
+    # Hold each merge's temp book output until both bet-modes are merging, so they always overlap.
+    merging = threading.Barrier(2, timeout=60)
+    remove = os.remove
+
+    def remove_after_both_merged(path, *args, **kwargs):
+        if os.path.basename(path).startswith("temp_book_output"):
+            merging.wait()
+        remove(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "remove", remove_after_both_merged)
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path / "shared"))
+    run_games(
+        [SimTestGameState(SimTestConfig())],
+        {config.game_id: dict(num_sim_args)},
+        BATCH_SIZE,
+        cores=4,
+        post_workers=2,
+        run_configs=False,
+        report_name=str(tmp_path / "report.json"),
+    )
+    outputs = read_outputs(str(tmp_path / "shared"))
+    assert sorted(outputs) == sorted(reference)
+    for name, content in reference.items():
+        assert outputs[name] == content, f"{name} differs with concurrent merges"
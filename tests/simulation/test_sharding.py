@@ -0,0 +1,74 @@
+"""Test multi-node sharded runs by simulating each shard in a separate process and merging."""
+
+import sys
+import subprocess
+import pytest
+import src.config.output_filenames as output_filenames
+from src.config.paths import PROJECT_PATH
+from src.state.run_sims import get_shard_chunks, merge_shards
+from tests.simulation.sim_test_game import SimTestConfig, SimTestGameState
+from tests.simulation.test_deterministic_output import NUM_SIM_ARGS, BATCH_SIZE, run_books, read_outputs
+
+SHARD_SCRIPT = """
+import sys
+import src.config.output_filenames as output_filenames
+output_filenames.PATH_TO_GAMES = sys.argv[1]
+from src.state.run_sims import create_books
+from src.state.run_options import RunOptions
+from tests.simulation.sim_test_game import SimTestConfig, SimTestGameState
+config = SimTestConfig()
+create_books(
+    SimTestGameState(config), config, {num_sim_args!r}, {batch_size}, 2, True, False,
+    RunOptions(shard_index=int(sys.argv[2]), shard_count=int(sys.argv[3])),
+)
+"""
+
+
+def run_shards(games_path: str, shard_indices: list, shard_count: int) -> None:
+    """Launch every shard as a concurrent, independent python process."""
+    script = SHARD_SCRIPT.format(num_sim_args=NUM_SIM_ARGS, batch_size=BATCH_SIZE)
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-c", script, games_path, str(shard_index), str(shard_count)],
+            cwd=PROJECT_PATH,
+            stdout=subprocess.DEVNULL,
+        )
+        for shard_index in shard_indices
+    ]
+    assert [process.wait() for process in processes] == [0] * len(processes)
+
+
+def final_outputs(games_path: str) -> dict:
+    return {name: data for name, data in read_outputs(games_path).items() if "temp_multi_threaded_files" not in name}
+
+
+@pytest.mark.parametrize("num_chunks, shard_count", [(12, 3), (3, 5), (1, 1), (1024, 7)])
+def test_shard_chunks_partition(num_chunks, shard_count):
+    "Shards own contiguous, non-overlapping chunk ranges covering every chunk."
+    owned = [list(get_shard_chunks(num_chunks, i, shard_count)) for i in range(shard_count)]
+    assert sum(owned, []) == list(range(num_chunks))
+    sizes = [len(chunks) for chunks in owned]
+    assert max(sizes) - min(sizes) <= 1
+
+
+def test_sharded_run_matches_single_node(tmp_path, monkeypatch):
+    "Merging separately simulated shards gives the same output as a single-node run."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path / "reference"))
+    reference = run_books(str(tmp_path / "reference"), threads=1)
+
+    games_path = str(tmp_path / "sharded")
+    run_shards(games_path, [0, 1, 2], shard_count=3)
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", games_path)
+    gamestate = SimTestGameState(SimTestConfig())
+    assert final_outputs(games_path) == {}
+    merge_shards(gamestate)
+    assert final_outputs(games_path) == reference
+
+
+def test_merge_requires_all_shards(tmp_path, monkeypatch):
+    "Merging raises if any chunk has not been simulated."
+    games_path = str(tmp_path)
+    run_shards(games_path, [0, 2], shard_count=3)
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", games_path)
+    with pytest.raises(RuntimeError, match="missing or incomplete"):
+        merge_shards(SimTestGameState(SimTestConfig()))
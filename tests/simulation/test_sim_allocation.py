@@ -0,0 +1,103 @@
+"""Test lazy criteria assignment and simulation splits."""
+
+from collections import Counter
+import pytest
+from src.config.betmode import BetMode
+from src.config.distributions import Distribution
+from src.state.sim_allocation import FeistelPermutation, SimAllocation, string_to_int
+from src.state.run_sims import get_sim_splits, get_fixed_sim_splits
+
+
+class BetModeGamestate:
+    """Minimal gamestate exposing a single betmode."""
+
+    def __init__(self, distributions):
+        self.betmode = BetMode(
+            name="base",
+            cost=1.0,
+            rtp=0.97,
+            max_win=5000,
+            auto_close_disabled=False,
+            is_feature=True,
+            is_buybonus=False,
+            distributions=distributions,
+        )
+
+    def get_betmode(self, mode_name):
+        return self.betmode
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 100, 1023, 1024, 1025, 4099])
+def test_permutation_is_bijective(size):
+    "Every index maps to a unique position within range."
+    permutation = FeistelPermutation(size, seed=3)
+    assert sorted(permutation[i] for i in range(size)) == list(range(size))
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1025, 4099])
+def test_permutation_inverse(size):
+    "index() maps every position back to the index permuted onto it."
+    permutation = FeistelPermutation(size, seed=5)
+    assert [permutation.index(permutation[i]) for i in range(size)] == list(range(size))
+
+
+def test_permutation_is_seeded():
+    "Same seed reproduces the permutation, different seeds shuffle differently."
+    first = [FeistelPermutation(500, seed=0)[i] for i in range(500)]
+    assert first == [FeistelPermutation(500, seed=0)[i] for i in range(500)]
+    assert first != [FeistelPermutation(500, seed=1)[i] for i in range(500)]
+    assert first != list(range(500))
+
+
+def test_allocation_matches_counts():
+    "Criteria counts are preserved by the lazy allocation."
+    counts = {"wincap": 3, "freegame": 120, "0": 400, "basegame": 477}
+    allocation = SimAllocation(counts)
+    assigned = Counter(allocation.get_criteria(sim) for sim in range(len(allocation)))
+    assert dict(assigned) == counts
+    assert [allocation.get_seed(sim) for sim in range(10)] == list(range(10))
+
+
+def test_allocation_sim_from_rank():
+    "get_sim() inverts locate() for every rank of every criteria."
+    allocation = SimAllocation({"wincap": 3, "freegame": 120, "0": 400}, shuffle_seed=2)
+    for sim in range(len(allocation)):
+        code, rank = allocation.locate(sim)
+        assert allocation.get_sim(allocation.criteria_table[code], rank) == sim
+    with pytest.raises(IndexError):
+        allocation.get_sim("wincap", 3)
+
+
+def test_allocation_criteria_seeds_unique():
+    "Fixed-amount seeds are offset by criteria and unique within each criteria."
+    allocation = SimAllocation({"wincap": 10, "0": 90}, criteria_seeds=True)
+    seeds = {}
+    for sim in range(len(allocation)):
+        seeds.setdefault(allocation.get_criteria(sim), []).append(allocation.get_seed(sim))
+    for criteria, criteria_seeds in seeds.items():
+        offset = string_to_int(criteria)
+        assert sorted(criteria_seeds) == list(range(offset, offset + len(criteria_seeds)))
+
+
+def test_sim_splits_sum_to_total():
+    "Quota and fixed-amount splits assign every simulation."
+    reel_weights = {"reel_weights": {"basegame": {"BR0": 1}}}
+    quota_gamestate = BetModeGamestate(
+        [
+            Distribution(criteria="wincap", quota=0.001, conditions=dict(reel_weights)),
+            Distribution(criteria="0", quota=0.4, conditions=dict(reel_weights)),
+            Distribution(criteria="basegame", quota=0.599, conditions=dict(reel_weights)),
+        ]
+    )
+    assert sum(get_sim_splits(quota_gamestate, 12345, "base").values()) == 12345
+
+    fixed_gamestate = BetModeGamestate(
+        [
+            Distribution(criteria="wincap", fixed_amt=50, conditions=dict(reel_weights)),
+            Distribution(criteria="0", quota=0.4, conditions=dict(reel_weights)),
+            Distribution(criteria="basegame", quota=0.6, conditions=dict(reel_weights)),
+        ]
+    )
+    splits = get_fixed_sim_splits(fixed_gamestate, 1001, "base")
+    assert splits["wincap"] == 50
+    assert sum(splits.values()) == 1001
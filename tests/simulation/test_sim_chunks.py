@@ -0,0 +1,65 @@
+"""Test remainder-aware splitting of simulations into chunks."""
+
+import pytest
+import src.config.output_filenames as output_filenames
+from src.state.run_sims import create_books, get_chunk_size, get_sim_chunks, MIN_CHUNK_SIZE, TARGET_NUM_CHUNKS
+from tests.simulation.sim_test_game import SimTestConfig, SimTestGameState
+from tests.simulation.test_deterministic_output import read_outputs
+
+
+@pytest.mark.parametrize(
+    "num_sims, batching_size",
+    [(1, 10), (99, 10), (1000, 1000), (1001, 100), (12345, 500), (100003, 50000), (7, 1)],
+)
+def test_chunks_cover_all_sims(num_sims, batching_size):
+    "Chunks are contiguous, cover every simulation and never exceed the batching size."
+    sim_chunks = get_sim_chunks(num_sims, batching_size)
+    assert sim_chunks[0][0] == 0 and sim_chunks[-1][1] == num_sims
+    for (_, end), (start, _) in zip(sim_chunks[:-1], sim_chunks[1:]):
+        assert end == start
+    sizes = [end - start for start, end in sim_chunks]
+    assert max(sizes) <= batching_size
+    assert max(sizes) - min(sizes) <= 1
+    assert sizes == sorted(sizes), "remainder should be given to the last chunks"
+
+
+@pytest.mark.parametrize(
+    "num_sims, batching_size, chunk_size",
+    [
+        (50, 1000, MIN_CHUNK_SIZE),
+        (MIN_CHUNK_SIZE * TARGET_NUM_CHUNKS, 10**6, MIN_CHUNK_SIZE),
+        (MIN_CHUNK_SIZE * TARGET_NUM_CHUNKS + 1, 10**6, MIN_CHUNK_SIZE + 1),
+        (10**6, 10**6, 977),
+        (10**6, 500, 500),
+        (50, 10, 10),
+        (0, 10, 10),
+    ],
+)
+def test_chunk_size_limits(num_sims, batching_size, chunk_size):
+    "Chunks hold at least MIN_CHUNK_SIZE sims, at most TARGET_NUM_CHUNKS are made unless the batching size caps them."
+    assert get_chunk_size(num_sims, batching_size) == chunk_size
+
+
+def test_chunk_boundaries_and_remainder():
+    "The remainder is given one simulation at a time to the last chunks."
+    assert [end - start for start, end in get_sim_chunks(1050, 100)] == [95] * 6 + [96] * 5
+    assert get_sim_chunks(250, 100) == [(0, 83), (83, 166), (166, 250)]
+    assert get_sim_chunks(300, 100) == [(0, 100), (100, 200), (200, 300)]
+    assert get_sim_chunks(7, 3) == [(0, 2), (2, 4), (4, 7)]
+    assert len(get_sim_chunks(10**7, 10**6)) == TARGET_NUM_CHUNKS
+    assert len(get_sim_chunks(10**7, 1000)) == 10**4
+
+
+def test_uneven_runs_independent_of_threads(tmp_path, monkeypatch):
+    "Simulation counts that divide neither the batching size nor the thread count give identical outputs."
+    num_sim_args = {"base": 607, "bonus": 131}
+    outputs = {}
+    for threads in [1, 4]:
+        games_path = str(tmp_path / f"threads_{threads}")
+        monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", games_path)
+        config = SimTestConfig()
+        create_books(SimTestGameState(config), config, dict(num_sim_args), 50, threads, True, False)
+        outputs[threads] = read_outputs(games_path)
+    assert sorted(outputs[4]) == sorted(outputs[1])
+    for name, content in outputs[1].items():
+        assert outputs[4][name] == content, f"{name} differs with 4 threads"
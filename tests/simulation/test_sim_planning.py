@@ -0,0 +1,65 @@
+"""Test simulation time projections and criteria size suggestions from a pilot run."""
+
+import json
+import src.config.output_filenames as output_filenames
+from src.state.run_sims import create_books, assign_sim_criteria
+from src.state.sim_planning import plan_simulations, get_criteria_pilot_sims
+from tests.simulation.sim_test_game import SimTestConfig, SimTestGameState
+from tests.simulation.test_deterministic_output import NUM_SIM_ARGS, BATCH_SIZE, run_books, read_outputs
+
+
+def test_pilot_sims_are_the_first_ranks_of_each_criteria(tmp_path, monkeypatch):
+    "Pilot simulations are those at the first ranks within each criteria block, without scanning all simulations."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path))
+    sim_allocation = assign_sim_criteria(SimTestGameState(SimTestConfig()), NUM_SIM_ARGS["base"], "base", False)
+    pilot = get_criteria_pilot_sims(sim_allocation, 5)
+    expected = {criteria: [] for criteria in sim_allocation.get_criteria_counts()}
+    for sim in range(len(sim_allocation)):
+        code, rank = sim_allocation.locate(sim)
+        if rank < 5:
+            expected[sim_allocation.criteria_table[code]].append(sim)
+    assert pilot == expected
+    assert all(len(sims) == 5 for sims in pilot.values())
+
+
+def test_plan_projects_time_and_suggests_criteria_sizes(tmp_path, monkeypatch):
+    "Every criteria is costed, suggestions reach the target precision or fit the budget, run outputs are unchanged."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path / "reference"))
+    reference = run_books(str(tmp_path / "reference"), threads=1)
+
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path / "planned"))
+    config = SimTestConfig()
+    gamestate = SimTestGameState(config)
+    plan = plan_simulations(gamestate, dict(NUM_SIM_ARGS), threads=2, pilot_sims=10, target_precision=0.05)
+    with open(gamestate.output_files.get_simulation_plan_name(), "r", encoding="UTF-8") as f:
+        assert json.load(f) == plan
+    base = plan["betmodes"]["base"]
+    counts = assign_sim_criteria(gamestate, NUM_SIM_ARGS["base"], "base", False).get_criteria_counts()
+    assert {criteria: details["sims"] for criteria, details in base["criteria"].items()} == counts
+    projected = [details["projected_seconds"] for details in base["criteria"].values()]
+    assert projected == sorted(projected, reverse=True) and all(seconds > 0 for seconds in projected)
+    assert base["criteria"]["0"]["attempts_per_book"] >= 1 and base["criteria"]["0"]["required_sims"] == 1
+    assert base["criteria"]["freegame"]["required_sims"] > 1
+    assert plan["suggestion_scale"] == 1
+    for details in base["criteria"].values():
+        assert details["suggested_precision"] is None or details["suggested_precision"] <= 0.05
+    assert abs(sum(details["suggested_quota"] for details in base["criteria"].values()) - 1) < 1e-4
+
+    budget_plan = plan_simulations(
+        gamestate,
+        dict(NUM_SIM_ARGS),
+        threads=2,
+        pilot_sims=10,
+        target_precision=0.005,
+        time_budget_seconds=plan["suggested_seconds"],
+        min_criteria_sims=3,
+    )
+    assert budget_plan["suggestion_scale"] < 1
+    freegame = budget_plan["betmodes"]["base"]["criteria"]["freegame"]
+    assert freegame["suggested_fixed_amt"] < freegame["required_sims"] and freegame["suggested_precision"] > 0.005
+    assert budget_plan["betmodes"]["base"]["criteria"]["0"]["suggested_fixed_amt"] == 3
+
+    create_books(gamestate, config, dict(NUM_SIM_ARGS), BATCH_SIZE, 1, True, False)
+    outputs = read_outputs(str(tmp_path / "planned"))
+    outputs.pop("0_sim_test/library/simulation_plan.json")
+    assert outputs == reference
@@ -0,0 +1,64 @@
+"""Test the slowest-simulation report and reproducing a slow simulation under the profiler."""
+
+import os
+import csv
+import json
+import time
+import pytest
+import src.config.output_filenames as output_filenames
+from src.state.run_sims import create_books
+from src.state.run_options import RunOptions
+from src.state.profiling import profile_slow_sim
+from tests.simulation.sim_test_game import SimTestConfig, SimTestGameState
+from tests.simulation.test_deterministic_output import NUM_SIM_ARGS, BATCH_SIZE
+
+SLOW_SIM = 123
+
+
+class SlowSimGameState(SimTestGameState):
+    """Test game in which one base simulation takes much longer than the others."""
+
+    def run_spin(self, sim, simulation_seed=None):
+        if self.betmode == "base" and sim == SLOW_SIM:
+            time.sleep(0.2)
+        super().run_spin(sim, simulation_seed)
+
+
+@pytest.mark.parametrize("threads", [1, 3])
+def test_slowest_sims_are_reported_and_reproduced(tmp_path, monkeypatch, threads):
+    "The slow simulation is reported first, and re-running it reproduces the book written by the run."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path))
+    config = SimTestConfig()
+    gamestate = SlowSimGameState(config)
+    create_books(gamestate, config, dict(NUM_SIM_ARGS), BATCH_SIZE, threads, True, False, RunOptions(slow_sims=5))
+
+    for betmode, num_sims in NUM_SIM_ARGS.items():
+        with open(gamestate.output_files.get_slow_sims_name(betmode), "r", encoding="UTF-8") as f:
+            report = json.load(f)
+        assert sum(bucket["sims"] for bucket in report["sim_seconds"]) == num_sims
+        assert len(report["slowest"]) == 5
+        seconds = [slow_sim["seconds"] for slow_sim in report["slowest"]]
+        assert seconds == sorted(seconds, reverse=True)
+    with open(gamestate.output_files.get_slow_sims_name("base"), "r", encoding="UTF-8") as f:
+        slowest = json.load(f)["slowest"][0]
+    assert slowest["sim"] == SLOW_SIM and slowest["seconds"] >= 0.2
+    assert slowest["attempts"] >= 1
+
+    with open(gamestate.output_files.get_final_lookup_name("base"), "r", encoding="UTF-8") as f:
+        payouts = {int(row[0]): int(row[2]) for row in csv.reader(f)}
+    replay = SlowSimGameState(config)
+    profile_slow_sim(replay, "base", headless=True, top_n=5)
+    assert replay.repeat_count == slowest["attempts"]
+    assert replay.book_summaries[SLOW_SIM + 1].payout_multiplier == payouts[SLOW_SIM + 1]
+    assert os.path.isfile(replay.output_files.get_profile_name(f"base_sim_{SLOW_SIM}", ".prof"))
+    with open(replay.output_files.get_profile_name(f"base_sim_{SLOW_SIM}", ".txt"), "r", encoding="UTF-8") as f:
+        assert f.readline().startswith(f"base simulation {SLOW_SIM} ")
+
+
+def test_no_report_by_default(tmp_path, monkeypatch):
+    "Without slow_sims, no wall time report is written."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path))
+    config = SimTestConfig()
+    gamestate = SimTestGameState(config)
+    create_books(gamestate, config, dict(NUM_SIM_ARGS), BATCH_SIZE, 1, True, False)
+    assert not os.path.exists(gamestate.output_files.get_slow_sims_name("base"))
@@ -0,0 +1,28 @@
+"""Test stats-only runs, which skip events and books but keep lookup tables and force records."""
+
+import pytest
+import src.config.output_filenames as output_filenames
+from src.state.run_sims import create_books
+from src.state.run_options import RunOptions
+from tests.simulation.sim_test_game import SimTestConfig, SimTestGameState
+from tests.simulation.test_deterministic_output import NUM_SIM_ARGS, BATCH_SIZE, run_books, read_outputs
+
+
+@pytest.mark.parametrize("threads", [1, 3])
+def test_stats_mode_matches_book_outputs(tmp_path, monkeypatch, threads):
+    "Lookup tables and force records are identical to a full run, and no books or events are written."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path / "reference"))
+    reference = run_books(str(tmp_path / "reference"), threads=1)
+
+    games_path = tmp_path / "stats"
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(games_path))
+    config = SimTestConfig()
+    create_books(
+        SimTestGameState(config), config, dict(NUM_SIM_ARGS), BATCH_SIZE, threads, True, False, RunOptions(mode="stats")
+    )
+    outputs = read_outputs(str(games_path))
+
+    assert not any("books_" in name or "event_config" in name for name in outputs)
+    assert sorted(outputs) == sorted(name for name in reference if "books_" not in name and "event_config" not in name)
+    for name, content in outputs.items():
+        assert content == reference[name], f"{name} differs in stats mode"
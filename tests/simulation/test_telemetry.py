@@ -0,0 +1,137 @@
+"""Test worker progress counters and the metrics written by create_books."""
+
+import json
+import time
+import pytest
+import src.config.output_filenames as output_filenames
+from src.calculations.board import Board
+from src.events import events
+from src.state.phase_timers import PhaseTimers
+from src.state.run_sims import create_books
+from src.state.run_options import RunOptions
+from src.state.telemetry import ProgressCounters, ProgressTracker
+from tests.simulation.sim_test_game import SimTestConfig, SimTestGameState
+from tests.simulation.test_deterministic_output import NUM_SIM_ARGS, BATCH_SIZE, run_books
+
+reveal_event_original = events.reveal_event
+
+
+@pytest.mark.parametrize("threads", [1, 3])
+def test_metrics_count_every_sim(tmp_path, monkeypatch, threads):
+    "Counters published by workers add up to the requested simulations, books and criteria quotas."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path))
+    run_books(str(tmp_path), threads=threads)
+    with open(tmp_path / "0_sim_test" / "library" / "simulation_metrics.json", "r", encoding="UTF-8") as f:
+        metrics = json.load(f)
+
+    assert metrics["run"]["threads"] == threads
+    assert sum(metrics["worker_sims"].values()) == sum(NUM_SIM_ARGS.values())
+    for betmode, num_sims in NUM_SIM_ARGS.items():
+        summary = metrics["betmodes"][betmode]
+        assert summary["sims"] == summary["num_sims"] == summary["books"] == num_sims
+        assert summary["attempts"] >= num_sims
+        assert summary["bytes_written"] > 0
+        for details in summary["criteria"].values():
+            assert details["sims"] == details["target"]
+            assert details["attempts"] >= details["sims"]
+    # The zero-win criteria rejects any winning spin, so requires more spins than simulations
+    assert metrics["betmodes"]["base"]["criteria"]["0"]["attempts"] > metrics["betmodes"]["base"]["criteria"]["0"]["sims"]
+
+
+def test_stalled_worker_warning(capsys):
+    "A busy worker which stops reporting is flagged once, finishing its task clears the warning."
+    tracker = ProgressTracker(render_interval=0.0, stall_timeout=0.01)
+    tracker.start_mode("base", 10, {"basegame": 10})
+    published = []
+    counters = ProgressCounters("base", published.append)
+    for _ in range(4):
+        counters.record_sim("basegame", 1)
+    counters.flush()
+    for update in published:
+        tracker.update(2, update)
+    time.sleep(0.02)
+    tracker.tick()
+    tracker.tick()
+    output = capsys.readouterr().out
+    assert "[base] 4/10 sims" in output
+    assert output.count("worker 2 has not reported") == 1
+
+    tracker.task_finished(2)
+    time.sleep(0.02)
+    tracker.tick()
+    assert "has not reported" not in capsys.readouterr().out
+
+
+def test_phase_timing_covers_lifecycle(tmp_path, monkeypatch, capsys):
+    "Phase totals from every worker are merged per bet-mode, and the timers are removed afterwards."
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path))
+    draw_board = Board.draw_board
+    config = SimTestConfig()
+    create_books(
+        SimTestGameState(config), config, dict(NUM_SIM_ARGS), BATCH_SIZE, 3, True, False, RunOptions(phase_timing=True)
+    )
+    assert Board.draw_board is draw_board
+    assert events.reveal_event is reveal_event_original
+
+    with open(tmp_path / "0_sim_test" / "library" / "simulation_metrics.json", "r", encoding="UTF-8") as f:
+        phases = json.load(f)["betmodes"]["base"]["phases"]
+    for phase in ["Board.draw_board", "Board.create_board_reelstrips", "Lines.get_lines", "Book.add_event"]:
+        assert phases[phase]["calls"] > 0
+        assert 0 <= phases[phase]["self_seconds"] <= phases[phase]["total_seconds"] + 1e-9
+    assert phases["GeneralGameState.imprint_wins"]["calls"] == NUM_SIM_ARGS["base"]
+    assert phases["events.reveal_event"]["calls"] > 0
+    assert phases["untimed"]["calls"] is None
+    assert "phase breakdown" in capsys.readouterr().out
+
+
+def test_nested_phase_self_time():
+    "Time in an inner phase is excluded from the outer phase's self time."
+
+    class Nested:
+        def outer(self):
+            time.sleep(0.01)
+            self.inner()
+
+        def inner(self):
+            time.sleep(0.02)
+
+    timers = PhaseTimers()
+    timers.install([(Nested, "outer"), (Nested, "inner")])
+    try:
+        Nested().outer()
+    finally:
+        timers.uninstall()
+    phases = timers.collect()
+    assert phases["Nested.outer"]["calls"] == phases["Nested.inner"]["calls"] == 1
+    assert phases["Nested.outer"]["total_seconds"] >= 0.03
+    assert 0.01 <= phases["Nested.outer"]["self_seconds"] < 0.02
+    assert "timed" not in Nested.outer.__code__.co_name
+
+
+def test_rejection_report(tmp_path, monkeypatch):
+    "Repeat-loop statistics per criteria are written next to the books and do not depend on thread count."
+    reports = []
+    for threads in (1, 3):
+        games_path = tmp_path / f"threads_{threads}"
+        monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(games_path))
+        run_books(str(games_path), threads=threads)
+        with open(games_path / "0_sim_test" / "library" / "books" / "rejection_stats_base.json", "r", encoding="UTF-8") as f:
+            reports.append(json.load(f)["criteria"])
+
+    report = reports[0]
+    assert {c: r["accepted_sims"] for c, r in report.items()} == {"freegame": 60, "0": 240, "basegame": 300}
+    assert next(iter(report)) == "0", "criteria with the most rejected time are listed first"
+    assert report["0"]["mean_repeats"] > 0 and report["0"]["rejected_seconds"] > 0
+    assert report["basegame"]["max_repeats"] == 0 and report["basegame"]["rejected_seconds"] == 0
+    for stats in report.values():
+        assert sum(stats["repeat_histogram"].values()) == stats["accepted_sims"]
+        assert stats["p99_repeats"] <= stats["max_repeats"]
+        repeats = sum(int(r) * count for r, count in stats["repeat_histogram"].items())
+        assert stats["total_attempts"] == stats["accepted_sims"] + repeats
+
+    timing_keys = ["rejected_seconds", "accepted_seconds", "rejected_time_share"]
+    for criteria, stats in reports[0].items():
+        other = reports[1][criteria]
+        assert {k: v for k, v in stats.items() if k not in timing_keys} == {
+            k: v for k, v in other.items() if k not in timing_keys
+        }
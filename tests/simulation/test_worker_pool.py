@@ -0,0 +1,72 @@
+"""Test the persistent simulation worker pool with a minimal game."""
+
+import os
+import time
+import pytest
+from src.state.worker_pool import SimulationPool
+
+
+class PoolTestConfig:
+    game_id = "pool_test"
+
+
+class PoolTestGameState:
+    """Game whose run_sims returns its task's value, fails on "error" and exits the worker on "exit"."""
+
+    def __init__(self):
+        self.config = PoolTestConfig()
+        self.publish_progress = None
+
+    def run_sims(self, betmode_copy_list: list, betmode: str, value: int, action: str = None, delay: float = 0.0):
+        time.sleep(delay)
+        if action == "error":
+            raise ValueError(f"simulation {value} failed")
+        if action == "exit":
+            os._exit(3)
+        betmode_copy_list.append((betmode, value))
+
+
+def make_pool(threads: int) -> SimulationPool:
+    pool = SimulationPool(PoolTestGameState(), threads, poll_interval=0.1)
+    pool.start()
+    return pool
+
+
+def test_run_tasks_returns_results_in_submission_order():
+    "Earlier tasks finish last, results still follow submission order with a bounded number of queued tasks."
+    pool = make_pool(3)
+    try:
+        all_run_args = [
+            {"game_id": "pool_test", "betmode": "base", "value": value, "delay": 0.02 * (8 - value)}
+            for value in range(8)
+        ]
+        finished = []
+        results = pool.run_tasks(all_run_args, max_in_flight=2, on_result=lambda run_args, _: finished.append(run_args))
+    finally:
+        pool.shutdown()
+    assert results == [[("base", value)] for value in range(8)]
+    assert sorted(run_args["value"] for run_args in finished) == list(range(8))
+    assert len(pool.pending) == 0
+
+
+def test_worker_failure_raises():
+    "An exception in run_sims is raised in the parent with the worker's traceback."
+    pool = make_pool(2)
+    try:
+        pool.submit({"game_id": "pool_test", "betmode": "base", "value": 0})
+        pool.submit({"game_id": "pool_test", "betmode": "base", "value": 1, "action": "error"})
+        with pytest.raises(RuntimeError, match="simulation 1 failed"):
+            pool.wait_all()
+    finally:
+        pool.shutdown()
+
+
+def test_unexpected_worker_exit_raises():
+    "A worker which dies without reporting its task is detected while waiting for results."
+    pool = make_pool(1)
+    try:
+        pool.submit({"game_id": "pool_test", "betmode": "base", "value": 0, "action": "exit"})
+        with pytest.raises(RuntimeError, match="exited unexpectedly"):
+            pool.wait_all()
+    finally:
+        pool.shutdown()
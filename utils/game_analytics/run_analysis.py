@@ -5,13 +5,49 @@ Args:
 
 """
 
+import os
 from typing import List, Dict
+from src.state.build_cache import BuildCache
+from src.state.fingerprint import canonical, get_code_fingerprint, ENGINE_SOURCE_PATH, UTILS_SOURCE_PATH
 from utils.game_analytics.retrieve_game_information import GameInformation
 from utils.game_analytics.print_all_results import PrintJSON, PrintXLSX
 
 
-def create_stat_sheet(game: str, custom_keys: List[Dict] = None):
-    """Function executed from run file."""
+def create_stat_sheet(game: str, custom_keys: List[Dict] = None, incremental: bool = False):
+    """
+    Function executed from run file.
+    incremental=True skips the analysis if custom_keys, game and engine code (including utils), lookup tables, force
+    files and configs are unchanged.
+    """
+    build_cache, fingerprint = None, None
+    if incremental:
+        build_cache = BuildCache(game.output_files.get_build_cache_name())
+        build_cache.load()
+        fingerprint = build_cache.get_inputs_fingerprint(
+            get_code_fingerprint(game, [ENGINE_SOURCE_PATH, UTILS_SOURCE_PATH]) + canonical(custom_keys),
+            get_analysis_input_files(game),
+        )
+        if build_cache.is_current("analysis", fingerprint):
+            print("Skipping analysis - inputs and outputs are unchanged.")
+            return
     game_obj = GameInformation(game, custom_keys=custom_keys)
     PrintJSON(game_obj)
-    PrintXLSX(game_obj)
+    stat_sheet = PrintXLSX(game_obj)
+    if build_cache is not None:
+        output_files = [os.path.join(game_obj.libraryPath, "statistics_summary.json"), stat_sheet.stat_file_name]
+        build_cache.record("analysis", fingerprint, output_files)
+        build_cache.save()
+
+
+def get_analysis_input_files(gamestate: object) -> list:
+    """Every file in the lookup table, publish, force and config directories read by the analysis."""
+    input_files = []
+    for path in [
+        gamestate.output_files.lookup_path,
+        gamestate.output_files.final_lookup_path,
+        gamestate.output_files.force_path,
+        gamestate.output_files.config_path,
+    ]:
+        if os.path.isdir(path):
+            input_files += [os.path.join(path, f) for f in os.listdir(path) if os.path.isfile(os.path.join(path, f))]
+    return sorted(set(input_files))
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Combine shard directories from a multi-node create_books() run into final books, lookup tables and force files.
+Usage: python utils/merge_shards.py games/<game_id> [shard_dir ...]
+Shard directories default to every shard_* folder within the game's library/temp_multi_threaded_files.
+"""
+
+import sys
+from pathlib import Path
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python utils/merge_shards.py games/<game_id> [shard_dir ...]")
+        sys.exit(1)
+
+    game_dir = Path(sys.argv[1]).resolve()
+    if not (game_dir / "gamestate.py").is_file():
+        print(f"Error: {game_dir} does not contain a gamestate.py")
+        sys.exit(1)
+    sys.path.insert(0, str(game_dir))
+
+    # pylint: disable=import-error,import-outside-toplevel
+    from game_config import GameConfig
+    from gamestate import GameState
+    from src.state.run_sims import merge_shards
+
+    config = GameConfig()
+    gamestate = GameState(config)
+    shard_paths = [str(Path(p).resolve()) for p in sys.argv[2:]] or None
+    merge_shards(gamestate, shard_paths)
+
+
+if __name__ == "__main__":
+    main()
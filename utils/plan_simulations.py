@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Project the simulation time of a game from a short pilot run of every criteria, and optionally suggest criteria
+sizes reaching a target precision within a time budget. The plan is written to library/simulation_plan.json.
+Usage: python utils/plan_simulations.py 0_0_lines [--num-sims 100000] [--threads 16] [--target-precision 0.01]
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from src.state.run_games import load_game
+from src.state.sim_planning import PILOT_SIMS, MAX_PILOT_SECONDS, plan_simulations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Project simulation time per criteria from a pilot run.")
+    parser.add_argument("game_id", help="Game folder within games/, e.g. 0_0_lines")
+    parser.add_argument("--num-sims", type=int, default=int(1e5), help="Planned simulations of every bet-mode")
+    parser.add_argument("--threads", type=int, default=os.cpu_count(), help="Simulation workers of the planned run")
+    parser.add_argument("--pilot-sims", type=int, default=PILOT_SIMS, help="Pilot simulations of every criteria")
+    parser.add_argument(
+        "--max-pilot-seconds", type=float, default=MAX_PILOT_SECONDS, help="Pilot time limit of every criteria"
+    )
+    parser.add_argument("--target-precision", type=float, default=None, help="Relative error of criteria payouts")
+    parser.add_argument("--time-budget", type=float, default=None, help="Simulation time budget in seconds")
+    parser.add_argument("--min-criteria-sims", type=int, default=1, help="Smallest suggested criteria size")
+    arguments = parser.parse_args()
+
+    gamestate = load_game(arguments.game_id)
+    plan_simulations(
+        gamestate,
+        {bm.get_name(): arguments.num_sims for bm in gamestate.config.bet_modes},
+        arguments.threads,
+        pilot_sims=arguments.pilot_sims,
+        max_pilot_seconds=arguments.max_pilot_seconds,
+        target_precision=arguments.target_precision,
+        time_budget_seconds=arguments.time_budget,
+        min_criteria_sims=arguments.min_criteria_sims,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Simulate several games on one shared worker pool, with merges, configs and analysis of finished games running while
+later games are still simulating. A consolidated timing report is written to games/run_games_report.json.
+Usage: python utils/run_games.py 0_0_cluster 0_0_lines [--cores 16] [--num-sims 10000] [--optimize] [--analysis]
+"""
+
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from src.state.run_games import load_game, run_games
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate several games on one shared worker pool.")
+    parser.add_argument("game_ids", nargs="+", help="Game folders within games/, e.g. 0_0_lines")
+    parser.add_argument("--cores", type=int, default=os.cpu_count(), help="Total cores used by the run")
+    parser.add_argument("--num-sims", type=int, default=int(1e4), help="Simulations of every bet-mode")
+    parser.add_argument("--batch-size", type=int, default=50000, help="Largest number of books per chunk")
+    parser.add_argument("--no-compression", action="store_true", help="Write uncompressed books")
+    parser.add_argument("--post-workers", type=int, default=2, help="Threads running merges, configs and analysis")
+    parser.add_argument("--optimize", action="store_true", help="Run the optimization of every game")
+    parser.add_argument("--rust-threads", type=int, default=None, help="Optimization threads, default --cores")
+    parser.add_argument("--analysis", action="store_true", help="Write statistics summaries (needs optimized games)")
+    parser.add_argument("--custom-keys", default=None, help='Analysis keys as JSON, e.g. \'[{"symbol": "scatter"}]\'')
+    parser.add_argument("--format-checks", action="store_true", help="Run the RGS format checks of every game")
+    parser.add_argument("--report", default=None, help="Timing report filename")
+    arguments = parser.parse_args()
+
+    gamestates = [
+        load_game(game_id, load_optimization=arguments.optimize or arguments.analysis)
+        for game_id in arguments.game_ids
+    ]
+    num_sim_args = {
+        gamestate.config.game_id: {bm.get_name(): arguments.num_sims for bm in gamestate.config.bet_modes}
+        for gamestate in gamestates
+    }
+    run_games(
+        gamestates,
+        num_sim_args,
+        arguments.batch_size,
+        arguments.cores,
+        compress=not arguments.no_compression,
+        post_workers=arguments.post_workers,
+        run_optimization=arguments.optimize,
+        rust_threads=arguments.rust_threads,
+        run_analysis=arguments.analysis,
+        custom_keys=(
+            None
+            if arguments.custom_keys is None
+            else {game_id: json.loads(arguments.custom_keys) for game_id in num_sim_args}
+        ),
+        run_format_checks=arguments.format_checks,
+        report_name=arguments.report,
+    )
+
+
+if __name__ == "__main__":
+    main()